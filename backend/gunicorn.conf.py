@@ -0,0 +1,24 @@
+"""
+Konfigurasi gunicorn (dibaca otomatis dari working directory /app).
+
+PROMETHEUS_MULTIPROC_DIR (monitor/metrics.py): metric setiap worker ditulis
+ke file di direktori ini dan GET /metrics menjumlahkan semua worker. Isi
+direktori dikosongkan saat master start (sisa run sebelumnya / manage.py
+migrate), worker yang keluar ditandai mati agar gauge-nya tidak ikut dihitung.
+"""
+
+import os
+import shutil
+
+
+def on_starting(server):
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Site, RectifierData
+from .models import ModuleState, Site, RectifierData, SiteLatest
 
 
 @admin.register(Site)
@@ -40,4 +40,33 @@ class RectifierDataAdmin(admin.ModelAdmin):
     
     def has_change_permission(self, request, obj=None):
         # Read-only
-        return False
\ No newline at end of file
+        return False
+
+
+@admin.register(SiteLatest)
+class SiteLatestAdmin(admin.ModelAdmin):
+    list_display = ['site', 'timestamp', 'vdc_output', 'load_current',
+                    'temperature', 'status_realtime', 'created_at']
+    list_filter = ['status_realtime']
+    search_fields = ['site__site_code', 'site__site_name']
+
+    def has_add_permission(self, request):
+        # Di-maintain oleh MQTT listener
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ModuleState)
+class ModuleStateAdmin(admin.ModelAdmin):
+    list_display = ['site', 'module_id', 'status', 'value', 'since', 'until']
+    list_filter = ['status']
+    search_fields = ['site__site_code', 'site__site_name', 'module_id']
+
+    def has_add_permission(self, request):
+        # Di-maintain oleh MQTT listener
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,232 @@
+"""
+Arsip columnar (Parquet + zstd) RectifierData sebelum dihapus retensi.
+
+Tulis:
+  archive_day(site, day) membaca 1 hari (UTC) data 1 site dengan
+  .iterator(chunk_size) - server-side cursor di PostgreSQL - dan menulis per
+  chunk lewat ParquetWriter, sehingga memory tetap flat. Setiap file dicatat
+  di tabel ArchiveFile (site, hari, rentang timestamp, jumlah baris).
+
+Baca:
+  read_rows(site, start, end) membuka file yang overlap dengan rentang lewat
+  memory-map dan hanya men-decode baris dalam rentang tersebut. Dipakai oleh
+  SiteViewSet.history untuk rentang yang sudah tidak ada di tabel live.
+
+pyarrow adalah dependency opsional; tanpa pyarrow arsip dilewati.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from .models import SITE_METADATA_FIELDS, ArchiveFile, RectifierData
+from .partitions import DAY_MS, day_start_ms
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+# Kolom yang diarsip: semua kolom RectifierData kecuali FK site (sudah ada di path/index)
+ARCHIVE_FIELDS = [
+    f for f in RectifierData._meta.concrete_fields if f.name != 'site'
+]
+ARCHIVE_COLUMNS = [f.attname for f in ARCHIVE_FIELDS]
+
+
+class ArchiveUnavailable(RuntimeError):
+    pass
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ArchiveUnavailable('pyarrow belum terinstall (pip install pyarrow)')
+
+
+def _arrow_type(field):
+    if isinstance(field, models.FloatField):
+        return pa.float64()
+    if isinstance(field, (models.BigIntegerField, models.IntegerField, models.AutoField)):
+        return pa.int64()
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp('us', tz='UTC')
+    # CharField, JSONField (disimpan sebagai JSON string)
+    return pa.string()
+
+
+def archive_schema():
+    _require_pyarrow()
+    return pa.schema([pa.field(f.attname, _arrow_type(f)) for f in ARCHIVE_FIELDS])
+
+
+def archive_path(site, day):
+    root = Path(settings.ARCHIVE_ROOT)
+    return root / site.site_code / f'{day:%Y}' / f'{site.site_code}_{day:%Y%m%d}.parquet'
+
+
+def _to_batch(rows, schema):
+    columns = list(zip(*rows))
+    arrays = []
+    for field, values in zip(ARCHIVE_FIELDS, columns):
+        if isinstance(field, models.JSONField):
+            values = [json.dumps(v) if v is not None else None for v in values]
+        arrays.append(pa.array(values, type=_arrow_type(field)))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _archived_table(archive, schema):
+    """Isi file arsip yang sudah ada dengan kolom archive_schema() (None jika belum ada)"""
+    if archive is None or not os.path.exists(archive.path):
+        return None
+    # File lama masih punya kolom metadata site per baris
+    return pq.read_table(archive.path).select(schema.names).cast(schema)
+
+
+def archive_day(site, day, chunk_size=None, force=False):
+    """
+    Arsipkan data 1 site untuk 1 hari UTC. Return ArchiveFile, atau None
+    jika tidak ada yang perlu ditulis.
+
+    Hari yang sudah punya file tidak ditulis ulang, kecuali ada baris live
+    yang belum ada di file (id), mis. sample terlambat (LATE) yang masuk
+    setelah arsip ditulis atau setelah cleanup_old_data menghapus hari itu.
+    Baris tersebut digabung dengan isi file lama, jadi cleanup berikutnya
+    tidak menghapus baris yang belum pernah diarsip. force=True menulis ulang
+    walaupun tidak ada baris baru.
+    """
+    _require_pyarrow()
+    chunk_size = chunk_size or settings.ARCHIVE_CHUNK_SIZE
+    start = day_start_ms(day)
+    queryset = (
+        RectifierData.objects
+        .filter(site=site, timestamp__gte=start, timestamp__lt=start + DAY_MS)
+        .order_by('timestamp')
+        .values_list(*ARCHIVE_COLUMNS)
+    )
+
+    path = archive_path(site, day)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.parquet.tmp')
+
+    schema = archive_schema()
+    existing = ArchiveFile.objects.filter(site=site, day=day).first()
+    archived = _archived_table(existing, schema)
+    if archived is not None:
+        return _merge_day(site, day, queryset, archived, tmp_path, path, force)
+
+    ts_index = ARCHIVE_COLUMNS.index('timestamp')
+    writer = None
+    row_count = 0
+    first_ts = last_ts = None
+
+    def write(chunk):
+        nonlocal writer, row_count, first_ts, last_ts
+        if writer is None:
+            writer = pq.ParquetWriter(tmp_path, schema, compression=settings.ARCHIVE_COMPRESSION)
+        writer.write_batch(_to_batch(chunk, schema))
+        if first_ts is None:
+            first_ts = chunk[0][ts_index]
+        last_ts = chunk[-1][ts_index]
+        row_count += len(chunk)
+
+    chunk = []
+    try:
+        for row in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                write(chunk)
+                chunk = []
+        if chunk:
+            write(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if row_count == 0:
+        return None
+    return _save(site, day, tmp_path, path, first_ts, last_ts, row_count)
+
+
+def _merge_day(site, day, queryset, archived, tmp_path, path, force):
+    """Gabung baris live yang belum ada di file arsip (1 site-hari, muat di memory)"""
+    archived_ids = set(archived.column('id').to_pylist())
+    id_index = ARCHIVE_COLUMNS.index('id')
+    new_rows = [row for row in queryset.iterator() if row[id_index] not in archived_ids]
+    if not new_rows and not force:
+        return None
+
+    schema = archived.schema
+    table = archived
+    if new_rows:
+        table = pa.concat_tables([archived, pa.Table.from_batches([_to_batch(new_rows, schema)])])
+    table = table.sort_by('timestamp')
+    pq.write_table(table, tmp_path, compression=settings.ARCHIVE_COMPRESSION)
+    timestamps = table.column('timestamp')
+    logger.info(f"Archive {site.site_code} {day}: {len(new_rows)} late row(s) merged")
+    return _save(site, day, tmp_path, path, timestamps[0].as_py(), timestamps[-1].as_py(), table.num_rows)
+
+
+def _save(site, day, tmp_path, path, first_ts, last_ts, row_count):
+    os.replace(tmp_path, path)
+    archive, _ = ArchiveFile.objects.update_or_create(
+        site=site,
+        day=day,
+        defaults={
+            'path': str(path),
+            'start_ts': first_ts,
+            'end_ts': last_ts,
+            'row_count': row_count,
+            'size_bytes': path.stat().st_size,
+        },
+    )
+    return archive
+
+
+def read_rows(site, start, end, limit=None):
+    """
+    Baca baris arsip site dengan start <= timestamp < end, urut terbaru dulu.
+    Format tiap row sama dengan output RectifierDataSerializer.
+    """
+    _require_pyarrow()
+    files = (
+        ArchiveFile.objects
+        .filter(site=site, end_ts__gte=start, start_ts__lt=end)
+        .order_by('-start_ts')
+    )
+
+    rows = []
+    for archive in files:
+        table = pq.read_table(
+            archive.path,
+            memory_map=True,
+            filters=[('timestamp', '>=', start), ('timestamp', '<', end)],
+        )
+        part = table.to_pylist()
+        part.reverse()
+        rows.extend(part)
+        if limit is not None and len(rows) >= limit:
+            rows = rows[:limit]
+            break
+
+    return [
+        {
+            'id': row.pop('id'),
+            'site_code': site.site_code,
+            **row,
+            # Metadata site dari Site (file lama masih punya kolom ini per baris)
+            **{name: getattr(site, name) for name in SITE_METADATA_FIELDS},
+            'modules_status': json.loads(row['modules_status']) if row.get('modules_status') else [],
+            'created_at': timezone.localtime(row['created_at']).isoformat() if row.get('created_at') else None,
+            'site': site.id,
+        }
+        for row in rows
+    ]
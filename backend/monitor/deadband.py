@@ -0,0 +1,175 @@
+"""
+Deadband / change-only storage untuk RectifierData.
+
+Sebagian besar kolom (door_cabinet, battery_stolen, status, modules_status,
+battery_bank_*_soh, ...) sama persis dari sample 3 detik ke sample
+berikutnya, tapi tetap ditulis ~45 kolom setiap kali. Dengan
+INGEST_STORAGE_MODE=deadband, baris hanya disimpan jika:
+  - belum ada baris tersimpan untuk site tersebut (sejak listener start)
+  - ada field numerik yang bergerak lebih dari threshold-nya (INGEST_DEADBAND,
+    dibandingkan dengan baris TERSIMPAN terakhir, bukan sample sebelumnya,
+    agar perubahan pelan tetap tertangkap)
+  - ada field non-numerik / None yang berubah
+  - INGEST_HEARTBEAT_SECONDS sudah lewat sejak baris tersimpan terakhir
+  - sample terlambat (timestamp < baris tersimpan terakhir)
+
+SiteLatest dan rollup tetap di-update dari SEMUA sample (lihat
+IngestPipeline._write), sehingga dashboard dan avg/min/max rollup tidak
+berubah. Catatan: rebuild_rollups membangun ulang dari baris tersimpan saja.
+
+History membaca data ini step-wise: ?step=<ms> pada /api/sites/{code}/history/
+mengisi grid waktu dengan nilai baris tersimpan terakhir (forward_fill).
+/api/rectifier/ (list + export) tetap mengembalikan baris tersimpan apa
+adanya; response-nya ditandai dengan mark_storage() (header X-Storage-Mode)
+yang menunjuk ke history?step.
+
+INGEST_DEADBAND: "field=threshold,..." menimpa DEADBAND_DEFAULTS, mis.
+    INGEST_DEADBAND="vdc_output=0.2,temperature=1"
+Field numerik yang tidak disebut memakai threshold 0 (setiap perubahan disimpan).
+"""
+
+from operator import attrgetter
+
+from django.conf import settings
+
+from .decoder import FIELD_SPECS
+
+STORAGE_MODES = ('full', 'deadband')
+
+# Threshold default (satuan field masing-masing)
+DEADBAND_DEFAULTS = {
+    'vdc_output': 0.1,
+    'load_current': 0.5,
+    'load_power': 25.0,
+    'rectifier_current': 0.5,
+    'total_power': 25.0,
+    'battery_current': 0.5,
+    'temperature': 0.5,
+    'humidity': 1.0,
+    'soc_avg': 1.0,
+}
+
+_COMPARED = list(FIELD_SPECS)
+_NUMERIC = {
+    name for name, spec in FIELD_SPECS.items()
+    if spec.types in ((float,), (int,))
+}
+_values_of = attrgetter(*_COMPARED)
+
+
+def parse_deadband(value):
+    """'vdc_output=0.2,temperature=1' -> dict threshold (digabung dengan default)"""
+    thresholds = dict(DEADBAND_DEFAULTS)
+    for item in (value or '').split(','):
+        if not item.strip():
+            continue
+        name, _, threshold = item.partition('=')
+        name = name.strip()
+        if name not in _NUMERIC:
+            raise ValueError(f'INGEST_DEADBAND: {name!r} is not a numeric RectifierData field')
+        thresholds[name] = float(threshold)
+    return thresholds
+
+
+def storage_enabled():
+    """INGEST_STORAGE_MODE: full (default, simpan setiap sample) | deadband"""
+    mode = settings.INGEST_STORAGE_MODE
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"INGEST_STORAGE_MODE must be one of {', '.join(STORAGE_MODES)}")
+    return mode == 'deadband'
+
+
+STORAGE_HINT = (
+    'Rows are stored change-only (deadband); gaps mean unchanged values. '
+    'Use /api/sites/{site_code}/history/?from=<ms>&step=<ms> for a regular time grid.'
+)
+
+
+def mark_storage(response):
+    """Tandai response list/export RectifierData jika data disimpan change-only"""
+    if storage_enabled():
+        response['X-Storage-Mode'] = 'deadband'
+        response['X-Storage-Hint'] = STORAGE_HINT
+    return response
+
+
+def hold_ms():
+    """Batas forward-fill: nilai lebih tua dari ini dianggap gap (toleransi 1 heartbeat terlewat)"""
+    return 2 * settings.INGEST_HEARTBEAT_SECONDS * 1000
+
+
+class DeadbandFilter:
+    """
+    State per site = (timestamp, nilai field) dari baris tersimpan terakhir.
+
+    select() tidak mengubah state; panggil commit() setelah transaksi insert
+    berhasil agar batch yang gagal/di-retry tidak meninggalkan state palsu.
+    """
+
+    def __init__(self, thresholds=None, heartbeat_seconds=None):
+        if thresholds is None:
+            thresholds = parse_deadband(settings.INGEST_DEADBAND)
+        if heartbeat_seconds is None:
+            heartbeat_seconds = settings.INGEST_HEARTBEAT_SECONDS
+        self.heartbeat = heartbeat_seconds * 1000
+        self._checks = [
+            (index, thresholds.get(name, 0.0) if name in _NUMERIC else None)
+            for index, name in enumerate(_COMPARED)
+        ]
+        self._last = {}
+
+    def _changed(self, previous, values):
+        for index, threshold in self._checks:
+            old = previous[index]
+            new = values[index]
+            if old == new:
+                continue
+            if threshold is None or old is None or new is None:
+                return True
+            if abs(new - old) > threshold:
+                return True
+        return False
+
+    def select(self, rows):
+        """-> (baris yang perlu disimpan, state baru untuk commit())"""
+        pending = {}
+        keep = []
+        for row in rows:
+            values = _values_of(row)
+            last = pending.get(row.site_id) or self._last.get(row.site_id)
+            if (
+                last is None
+                or row.timestamp < last[0]
+                or row.timestamp - last[0] >= self.heartbeat
+                or self._changed(last[1], values)
+            ):
+                keep.append(row)
+                if last is None or row.timestamp >= last[0]:
+                    pending[row.site_id] = (row.timestamp, values)
+        return keep, pending
+
+    def commit(self, pending):
+        self._last.update(pending)
+
+
+def forward_fill(rows, start, end, step, time_index, hold=None):
+    """
+    Tuple rows (urut timestamp naik, termasuk 1 baris sebelum start) -> 1 tuple
+    per titik grid start, start+step, ... < end dengan nilai baris terakhir
+    <= titik tersebut. Titik tanpa baris dalam `hold` ms dilewati (gap).
+    """
+    hold = hold_ms() if hold is None else hold
+    filled = []
+    rows = iter(rows)
+    current = None
+    upcoming = next(rows, None)
+    for point in range(start, end, step):
+        while upcoming is not None and upcoming[time_index] <= point:
+            current = upcoming
+            upcoming = next(rows, None)
+        if current is None or point - current[time_index] > hold:
+            continue
+        row = list(current)
+        row[time_index] = point
+        filled.append(tuple(row))
+    return filled
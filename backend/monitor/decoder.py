@@ -0,0 +1,200 @@
+"""
+Decoder payload MQTT -> kolom RectifierData, dibangun sekali dari _meta model.
+
+Sebelumnya on_message memanggil payload.get() ~50x dengan default yang ditulis
+ulang manual (duplikat default di TelemetryFields). Sekarang:
+  - daftar field, default, tipe, nullable dan max_length diambil dari
+    RectifierData._meta saat import (metadata site seperti site_name/ladder
+    bukan kolom telemetri lagi, dibaca dari payload oleh SiteCache)
+  - JSON di-decode langsung dari bytes dengan orjson jika terinstall
+    (fallback json stdlib)
+  - tipe divalidasi dalam 1 pass, kolom integer dicek terhadap range
+    database (connection.ops.integer_field_range); payload yang tidak valid
+    menghasilkan PayloadError (dihitung sebagai 'rejected' di IngestStats), bukan gagal
+    saat bulk insert dan menggagalkan 1 batch penuh
+
+Cara pakai:
+    timestamp, fields = decode_message(msg.payload)
+    row = RectifierData(site=site, timestamp=timestamp, **fields)
+"""
+
+import json
+
+from django.db import connection, models
+
+from .models import RectifierData
+
+try:
+    import orjson
+except ImportError:  # orjson optional, fallback ke json stdlib
+    orjson = None
+
+# Kolom yang bukan dari payload
+_SKIP = {'id', 'site', 'timestamp', 'created_at'}
+
+
+class PayloadError(ValueError):
+    """Payload ditolak (JSON rusak atau tipe field tidak valid)"""
+
+
+def loads(raw):
+    """bytes/str JSON -> object (orjson jika ada)"""
+    try:
+        if orjson is not None:
+            return orjson.loads(raw)
+        return json.loads(raw)
+    except ValueError as e:
+        raise PayloadError(f'invalid JSON: {e}')
+
+
+def _to_float(value):
+    if isinstance(value, float):
+        return value
+    if isinstance(value, bool):
+        raise TypeError
+    if isinstance(value, (int, str)):
+        return float(value)
+    raise TypeError
+
+
+def _to_int(value):
+    if isinstance(value, bool):
+        raise TypeError
+    if isinstance(value, int):
+        return value
+    if isinstance(value, (float, str)):
+        return int(float(value))
+    raise TypeError
+
+
+def _to_str(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise TypeError
+
+
+def _to_json(value):
+    if isinstance(value, (list, dict)):
+        return value
+    raise TypeError
+
+
+# Error konversi: OverflowError dari int(float('inf')) / int(float('1e400'))
+_CONVERT_ERRORS = (TypeError, ValueError, OverflowError)
+
+
+def _converter(field):
+    """-> (tipe yang diterima apa adanya, fungsi konversi untuk tipe lain)"""
+    if isinstance(field, models.FloatField):
+        return (float,), _to_float
+    if isinstance(field, models.IntegerField):
+        return (int,), _to_int
+    if isinstance(field, models.JSONField):
+        return (list, dict), _to_json
+    return (str,), _to_str
+
+
+def _int_range(field, ops):
+    """(min, max) kolom integer di database ini, None jika tidak dibatasi (SQLite)"""
+    if not isinstance(field, models.IntegerField):
+        return None
+    low, high = ops.integer_field_range(field.get_internal_type())
+    if low is None and high is None:
+        return None
+    return low, high
+
+
+def _in_range(value, bounds):
+    low, high = bounds
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
+class FieldSpec:
+    __slots__ = ('name', 'types', 'convert', 'null', 'max_length', 'range')
+
+    def __init__(self, field, ops):
+        self.name = field.attname
+        self.types, self.convert = _converter(field)
+        self.null = field.null
+        self.max_length = field.max_length
+        # 1 nilai di luar range menggagalkan COPY / INSERT 1 batch penuh di PostgreSQL
+        self.range = _int_range(field, ops)
+
+
+_FIELDS = [
+    field for field in RectifierData._meta.concrete_fields
+    if field.name not in _SKIP
+]
+
+
+def build_field_specs(ops=None):
+    """{attname: FieldSpec} untuk backend database `ops` (default: connection default)"""
+    ops = ops or connection.ops
+    return {field.attname: FieldSpec(field, ops) for field in _FIELDS}
+
+
+FIELD_SPECS = build_field_specs()
+TIMESTAMP_RANGE = _int_range(RectifierData._meta.get_field('timestamp'), connection.ops)
+
+# Default model; default callable (mis. JSONField default=list) dipanggil per baris
+_DEFAULTS = {
+    field.attname: field.get_default()
+    for field in _FIELDS
+    if not (field.has_default() and callable(field.default))
+}
+_DEFAULT_FACTORIES = [
+    (field.attname, field.default)
+    for field in _FIELDS
+    if field.has_default() and callable(field.default)
+]
+
+
+def decode_fields(payload):
+    """
+    dict payload -> (timestamp, kwargs kolom telemetri). Field yang tidak ada
+    memakai default model; raise PayloadError jika tipe tidak valid.
+    Key payload yang tidak dikenal diabaikan.
+    """
+    if not isinstance(payload, dict):
+        raise PayloadError(f'payload must be an object, got {type(payload).__name__}')
+
+    try:
+        timestamp = _to_int(payload.get('ts', 0))
+    except _CONVERT_ERRORS:
+        raise PayloadError(f"ts: expected epoch milliseconds, got {payload.get('ts')!r}")
+    if TIMESTAMP_RANGE is not None and not _in_range(timestamp, TIMESTAMP_RANGE):
+        raise PayloadError(f'ts: {timestamp} out of range')
+
+    fields = _DEFAULTS.copy()
+    for name, factory in _DEFAULT_FACTORIES:
+        fields[name] = factory()
+
+    # 1 pass atas key payload (bukan ~50x payload.get)
+    for name, value in payload.items():
+        spec = FIELD_SPECS.get(name)
+        if spec is None:
+            continue
+        if value is None:
+            if not spec.null:
+                raise PayloadError(f'{name}: null not allowed')
+        elif type(value) not in spec.types:
+            try:
+                value = spec.convert(value)
+            except _CONVERT_ERRORS:
+                raise PayloadError(f'{name}: invalid value {value!r}')
+        if spec.range is not None and value is not None and not _in_range(value, spec.range):
+            raise PayloadError(f'{name}: {value} out of range {spec.range[0]}..{spec.range[1]}')
+        if spec.max_length is not None and value is not None and len(value) > spec.max_length:
+            raise PayloadError(f'{name}: longer than {spec.max_length} characters')
+        fields[name] = value
+
+    return timestamp, fields
+
+
+def decode_message(raw):
+    """bytes MQTT -> (timestamp, kwargs kolom telemetri, payload dict)"""
+    payload = loads(raw)
+    timestamp, fields = decode_fields(payload)
+    return timestamp, fields, payload
@@ -0,0 +1,141 @@
+"""
+Deduplikasi reading RectifierData per (site, timestamp).
+
+MQTT QoS 1 menjamin "at least once": setelah reconnect broker / device
+mengirim ulang pesan yang sama, dan sebelumnya setiap kiriman ulang menjadi
+baris baru (rollup ikut menghitung dua kali). Sekarang ada 3 lapis:
+
+  1. RecentWindowFilter (in-memory, di listener): INGEST_DEDUP_WINDOW
+     timestamp terakhir per site. Duplikat dibuang sebelum masuk queue,
+     tanpa query DB.
+  2. drop_existing() (di writer, per batch): duplikat di dalam batch dan
+     baris yang sudah ada di DB (mis. setelah listener restart) dibuang
+     sebelum insert. Lookup per pasangan (site, timestamp), bukan
+     site IN (...) AND timestamp IN (...) yang mengambil cross product; biasanya
+     1 query, dipecah per chunk agar bind parameter tidak melewati batas
+     database (SQLite 999).
+  3. UniqueConstraint(site, timestamp) di RectifierData sebagai jaminan akhir.
+
+Sample terlambat (timestamp < terbaru yang pernah dilihat site tersebut) tetap
+disimpan untuk history/rollup, tetapi tidak menimpa SiteLatest (lihat
+snapshots.upsert_latest) dan tidak di-publish ke live stream.
+"""
+
+from collections import deque
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+from .models import RectifierData
+from .snapshots import MAX_QUERY_PARAMS
+
+NEW = 'new'
+LATE = 'late'
+DUPLICATE = 'duplicate'
+
+
+class _SiteWindow:
+    __slots__ = ('seen', 'order', 'newest')
+
+    def __init__(self):
+        self.seen = set()
+        self.order = deque()
+        self.newest = None
+
+
+class RecentWindowFilter:
+    """
+    Ingat N timestamp terakhir per site (set + deque, O(1) per pesan).
+
+    Hanya dipakai dari 1 thread/task (on_message paho atau router asyncio),
+    jadi tidak memakai lock.
+    """
+
+    def __init__(self, window=None):
+        self.window = window if window is not None else settings.INGEST_DEDUP_WINDOW
+        self._sites = {}
+
+    def check(self, site_code, timestamp):
+        """-> NEW | LATE | DUPLICATE, dan catat timestamp jika bukan duplikat"""
+        if self.window <= 0:
+            return NEW
+        state = self._sites.get(site_code)
+        if state is None:
+            state = self._sites[site_code] = _SiteWindow()
+        elif timestamp in state.seen:
+            return DUPLICATE
+
+        state.seen.add(timestamp)
+        state.order.append(timestamp)
+        if len(state.order) > self.window:
+            state.seen.discard(state.order.popleft())
+
+        if state.newest is not None and timestamp < state.newest:
+            return LATE
+        state.newest = timestamp
+        return NEW
+
+
+def _unique(rows):
+    unique = {}
+    for row in rows:
+        unique.setdefault((row.site_id, row.timestamp), row)
+    return unique
+
+
+def _existing_conditions(unique):
+    """Q (site_id=.. AND timestamp IN (..)) OR ... per chunk <= batas bind parameter"""
+    by_site = {}
+    for site_id, timestamp in unique:
+        by_site.setdefault(site_id, []).append(timestamp)
+
+    limit = min(connection.features.max_query_params or MAX_QUERY_PARAMS, MAX_QUERY_PARAMS)
+    condition, params = Q(), 0
+    for site_id, timestamps in by_site.items():
+        for start in range(0, len(timestamps), limit - 1):
+            part = timestamps[start:start + limit - 1]
+            if params + 1 + len(part) > limit:
+                yield condition
+                condition, params = Q(), 0
+            condition |= Q(site_id=site_id, timestamp__in=part)
+            params += 1 + len(part)
+    if params:
+        yield condition
+
+
+def drop_existing(rows):
+    """
+    Buang duplikat di dalam batch dan baris yang (site, timestamp)-nya sudah
+    ada di DB. Return list baris yang perlu di-insert (urutan tetap).
+    """
+    unique = _unique(rows)
+    if not unique:
+        return []
+
+    existing = set()
+    for condition in _existing_conditions(unique):
+        existing.update(RectifierData.objects.filter(condition).values_list('site_id', 'timestamp'))
+    return [row for key, row in unique.items() if key not in existing]
+
+
+# Pasangan (site_id, timestamp) sebagai 2 array paralel: 2 parameter berapapun ukuran batch
+EXISTING_SQL = (
+    f'SELECT site_id, "timestamp" FROM "{RectifierData._meta.db_table}" '
+    f'WHERE (site_id, "timestamp") IN (SELECT * FROM unnest(%s::bigint[], %s::bigint[]))'
+)
+
+
+async def drop_existing_async(conn, rows):
+    """drop_existing() untuk connection psycopg async (mqtt_listener_async.py)"""
+    unique = _unique(rows)
+    if not unique:
+        return []
+
+    async with conn.cursor() as cursor:
+        await cursor.execute(EXISTING_SQL, (
+            [site_id for site_id, _ in unique],
+            [timestamp for _, timestamp in unique],
+        ))
+        existing = set(await cursor.fetchall())
+    return [row for key, row in unique.items() if key not in existing]
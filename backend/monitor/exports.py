@@ -0,0 +1,83 @@
+"""
+Export streaming RectifierData (NDJSON / CSV) untuk operator.
+
+Baris dibaca dengan .iterator(chunk_size) (server-side cursor di PostgreSQL)
+dan ditulis per chunk ke StreamingHttpResponse, jadi memory worker tetap flat
+walaupun yang diexport 1 hari penuh atau lebih.
+
+Di ASGI, Django akan membaca habis iterator sync ke list sebelum dikirim;
+karena itu di ASGI iterator dibungkus menjadi async iterator yang menarik
+1 chunk per sync_to_async (thread yang sama, jadi cursor DB tetap valid).
+"""
+
+import csv
+import io
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def _chunked(rows, size):
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def ndjson_chunks(projection, rows, size):
+    for chunk in _chunked(rows, size):
+        yield ''.join(json.dumps(item) + '\n' for item in projection.encode(chunk))
+
+
+def csv_chunks(projection, rows, size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(projection.fields)
+    for chunk in _chunked(rows, size):
+        for item in projection.encode(chunk):
+            writer.writerow([
+                json.dumps(value) if isinstance(value, (list, dict)) else value
+                for value in item.values()
+            ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+async def _async_chunks(chunks):
+    done = object()
+    pull = sync_to_async(next, thread_sensitive=True)
+    try:
+        while True:
+            chunk = await pull(chunks, done)
+            if chunk is done:
+                return
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close, thread_sensitive=True)()
+
+
+def export_response(request, projection, queryset, export_format, filename):
+    """queryset RectifierData (sudah difilter) -> StreamingHttpResponse urut timestamp naik"""
+    size = settings.EXPORT_CHUNK_SIZE
+    rows = projection.values(queryset.order_by('timestamp', 'id')).iterator(chunk_size=size)
+    encode = csv_chunks if export_format == 'csv' else ndjson_chunks
+    chunks = encode(projection, rows, size)
+
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        chunks = _async_chunks(chunks)
+
+    response = StreamingHttpResponse(chunks, content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,99 @@
+"""
+Ringkasan fleet (semua site aktif) untuk halaman map: /api/fleet/summary/.
+
+Sebelumnya frontend mengambil /api/sites/ (paginated 20) halaman per halaman
+dan menghitung sendiri. Sekarang dihitung di server dari snapshot SiteLatest
+(sudah 1 row per site, jadi tidak perlu DISTINCT ON / window function) dalam
+1 query:
+
+    SELECT region, status_realtime, COUNT(*), MIN/MAX/SUM/COUNT(vdc), ...
+    FROM monitor_site LEFT JOIN monitor_sitelatest ...
+    WHERE is_active GROUP BY region, status_realtime
+
+Hasil group (region x status, jumlahnya kecil) digabung di Python. Response
+di-cache FLEET_SUMMARY_TTL detik bersama ETag-nya, sehingga request dengan
+If-None-Match yang cocok dijawab 304 tanpa query DB.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Min, Sum
+from django.utils import timezone
+
+from .models import Site
+
+CACHE_KEY = 'fleet:summary'
+UNKNOWN_STATUS = 'Unknown'
+
+# Field SiteLatest yang diringkas min/avg/max
+SUMMARY_FIELDS = ('vdc_output', 'temperature')
+
+
+def _stats(groups, name):
+    count = sum(group[f'{name}_count'] for group in groups)
+    if not count:
+        return {'min': None, 'avg': None, 'max': None}
+    return {
+        'min': min(group[f'{name}_min'] for group in groups if group[f'{name}_count']),
+        'avg': round(sum(group[f'{name}_sum'] or 0 for group in groups) / count, 3),
+        'max': max(group[f'{name}_max'] for group in groups if group[f'{name}_count']),
+    }
+
+
+def compute_summary():
+    """Agregat fleet dari Site + SiteLatest (1 query GROUP BY region, status)"""
+    aggregates = {}
+    for name in SUMMARY_FIELDS:
+        aggregates[f'{name}_min'] = Min(f'latest__{name}')
+        aggregates[f'{name}_max'] = Max(f'latest__{name}')
+        aggregates[f'{name}_sum'] = Sum(f'latest__{name}')
+        aggregates[f'{name}_count'] = Count(f'latest__{name}')
+
+    groups = list(
+        Site.objects.filter(is_active=True)
+        .values('region', 'latest__status_realtime')
+        .annotate(sites=Count('id'), **aggregates)
+        .order_by()
+    )
+
+    status_counts = {}
+    regions = {}
+    for group in groups:
+        status = group['latest__status_realtime'] or UNKNOWN_STATUS
+        status_counts[status] = status_counts.get(status, 0) + group['sites']
+        region = regions.setdefault(group['region'], {'groups': [], 'status': {}})
+        region['groups'].append(group)
+        region['status'][status] = region['status'].get(status, 0) + group['sites']
+
+    return {
+        'total_sites': sum(group['sites'] for group in groups),
+        'status': status_counts,
+        **{name: _stats(groups, name) for name in SUMMARY_FIELDS},
+        'regions': [
+            {
+                'region': name,
+                'sites': sum(group['sites'] for group in region['groups']),
+                'status': region['status'],
+                **{field: _stats(region['groups'], field) for field in SUMMARY_FIELDS},
+            }
+            for name, region in sorted(regions.items())
+        ],
+        'generated_at': timezone.now().isoformat(),
+    }
+
+
+def cached_summary():
+    """-> (data, etag); dihitung ulang paling sering 1x per FLEET_SUMMARY_TTL"""
+    cached = cache.get(CACHE_KEY)
+    if cached is not None:
+        return cached
+
+    data = compute_summary()
+    # ETag dari isi agregat saja (generated_at berubah setiap hitung ulang)
+    body = json.dumps({k: v for k, v in data.items() if k != 'generated_at'}, sort_keys=True)
+    etag = '"{}"'.format(hashlib.md5(body.encode()).hexdigest())
+    cache.set(CACHE_KEY, (data, etag), settings.FLEET_SUMMARY_TTL)
+    return data, etag
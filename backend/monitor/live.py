@@ -0,0 +1,210 @@
+"""
+Live telemetry fan-out untuk endpoint server-push (SSE).
+
+Alur:
+  MQTT listener --(publish)--> channel --(LiveHub, 1 per proses ASGI)--> N browser
+
+Channel:
+  - REDIS_URL di-set: listener melakukan PUBLISH event ke LIVE_CHANNEL setelah
+    setiap flush, hub subscribe ke channel tersebut (tanpa query DB sama sekali).
+  - tanpa Redis: hub mem-poll tabel SiteLatest sekali per LIVE_POLL_INTERVAL
+    (1 query kecil per proses, bukan per browser).
+
+Jumlah browser yang terhubung tidak lagi menambah beban DB. Kedua channel
+hanya membawa site aktif (site__is_active, sama seperti snapshot awal).
+
+Feeder gagal (Redis putus, query poll error): dicoba lagi dengan backoff
+selama masih ada subscriber, lalu event sejak posisi terakhir yang sudah
+dikirim diambil ulang dari SiteLatest, jadi client yang sedang terhubung
+tidak kehilangan update.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from .models import SiteLatest
+from .serializers import DashboardDataSerializer
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+except ImportError:  # Redis optional, fallback ke polling SiteLatest
+    redis = None
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+SUMMARY = '*'
+# Backoff restart feeder: 1s, 2s, 4s, ... maks
+RETRY_MAX_SECONDS = 30
+
+
+def build_event(obj):
+    """
+    Event live dari RectifierData atau SiteLatest (obj.site harus sudah di-load).
+    'dashboard' = format DashboardDataSerializer, 'summary' = field latest_*
+    yang sama dengan SiteListSerializer.
+    """
+    return {
+        'site_code': obj.site.site_code,
+        'timestamp': obj.timestamp,
+        'dashboard': DashboardDataSerializer(obj).data,
+        'summary': {
+            'site_code': obj.site.site_code,
+            'latest_vdc': obj.vdc_output,
+            'latest_load': obj.load_current,
+            'latest_temp': obj.temperature,
+            'latest_status': obj.status_realtime,
+            'last_update': obj.created_at.isoformat(),
+        },
+    }
+
+
+_publisher = None
+
+
+def publish(rows):
+    """Dipanggil listener setelah flush: publish row terbaru per site ke Redis (jika ada)"""
+    global _publisher
+    if not settings.REDIS_URL or redis is None:
+        return 0
+
+    newest = {}
+    for row in rows:
+        # Sama dengan filter site__is_active jalur poll / latest_events
+        if not row.site.is_active:
+            continue
+        current = newest.get(row.site_id)
+        if current is None or row.timestamp > current.timestamp:
+            newest[row.site_id] = row
+
+    try:
+        if _publisher is None:
+            _publisher = redis.Redis.from_url(settings.REDIS_URL)
+        pipe = _publisher.pipeline(transaction=False)
+        for row in newest.values():
+            pipe.publish(settings.LIVE_CHANNEL, json.dumps(build_event(row)))
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"✗ Live publish failed: {e}")
+        _publisher = None
+        return 0
+    return len(newest)
+
+
+def latest_events(site_code=None):
+    """Snapshot awal untuk client yang baru connect (1 query)"""
+    queryset = SiteLatest.objects.select_related('site').filter(site__is_active=True)
+    if site_code is not None:
+        queryset = queryset.filter(site__site_code=site_code)
+    return [build_event(snapshot) for snapshot in queryset]
+
+
+def _changed_since(since):
+    queryset = (
+        SiteLatest.objects.select_related('site')
+        .filter(site__is_active=True, created_at__gte=since)
+    )
+    return [build_event(snapshot) for snapshot in queryset]
+
+
+class LiveHub:
+    """Fan-out in-process: 1 feeder task, banyak asyncio.Queue subscriber"""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._last_timestamp = {}
+        self._feeder = None
+        # Semua perubahan SiteLatest sebelum waktu ini sudah di-dispatch
+        self._since = None
+
+    def subscribe(self, key):
+        """key = site_code, atau SUMMARY untuk semua site"""
+        queue = asyncio.Queue(maxsize=settings.LIVE_QUEUE_SIZE)
+        self._subscribers.setdefault(key, set()).add(queue)
+        if self._feeder is None or self._feeder.done():
+            self._feeder = asyncio.ensure_future(self._feed())
+        return queue
+
+    def unsubscribe(self, key, queue):
+        queues = self._subscribers.get(key)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[key]
+
+    def dispatch(self, event):
+        site_code = event['site_code']
+        if event['timestamp'] <= self._last_timestamp.get(site_code, -1):
+            return
+        self._last_timestamp[site_code] = event['timestamp']
+
+        for key in (site_code, SUMMARY):
+            for queue in self._subscribers.get(key, ()):
+                if queue.full():
+                    # Client lambat: buang event tertua, yang terbaru lebih penting
+                    queue.get_nowait()
+                queue.put_nowait(event)
+
+    async def _feed(self):
+        self._since = timezone.now()
+        delay = 1.0
+        while self._subscribers:
+            started = time.monotonic()
+            try:
+                if settings.REDIS_URL and aioredis is not None:
+                    await self._feed_redis()
+                else:
+                    await self._feed_poll()
+                return
+            except Exception as e:
+                if time.monotonic() - started > RETRY_MAX_SECONDS:
+                    delay = 1.0
+                logger.error(f"✗ Live feeder failed: {e}, restarting in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RETRY_MAX_SECONDS)
+
+    async def _catch_up(self):
+        """Dispatch SiteLatest yang berubah sejak self._since"""
+        now = timezone.now()
+        # Overlap supaya row yang flush-nya terlambat tetap terambil;
+        # duplikat disaring oleh dispatch() lewat _last_timestamp.
+        overlap = timedelta(seconds=settings.LIVE_POLL_OVERLAP)
+        for event in await sync_to_async(_changed_since)(self._since - overlap):
+            self.dispatch(event)
+        self._since = now
+
+    async def _feed_poll(self):
+        while self._subscribers:
+            await asyncio.sleep(settings.LIVE_POLL_INTERVAL)
+            await self._catch_up()
+
+    async def _feed_redis(self):
+        client = aioredis.Redis.from_url(settings.REDIS_URL)
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(settings.LIVE_CHANNEL)
+            # Event yang terlewat selama feeder mati / belum subscribe
+            await self._catch_up()
+            while self._subscribers:
+                now = timezone.now()
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is not None:
+                    self.dispatch(json.loads(message['data']))
+                self._since = now
+        finally:
+            try:
+                await pubsub.unsubscribe(settings.LIVE_CHANNEL)
+                await client.close()
+            except Exception as e:
+                logger.warning(f"✗ Live feeder cleanup failed: {e}")
+
+
+live_hub = LiveHub()
@@ -0,0 +1,139 @@
+"""
+Broker MQTT in-process untuk testing listener tanpa Mosquitto/EMQX.
+
+LocalClient meniru subset paho mqtt.Client yang dipakai listener
+(on_connect, on_message, connect, subscribe, publish, loop_forever,
+disconnect), sehingga worker listener bisa dijalankan di thread terhadap
+LocalBroker. Mendukung wildcard + / # dan shared subscription
+$share/<group>/<filter> dengan strategi:
+- round_robin : seperti Mosquitto (pesan dibagi bergiliran)
+- hash_topic  : seperti EMQX hash_topic (1 topic selalu ke subscriber yang sama)
+
+Cara pakai:
+    broker = LocalBroker(share_strategy='hash_topic')
+    client = broker.client('worker-0')
+    client.on_message = on_message
+    client.connect()
+    client.subscribe('$share/rectifier/rectifier/+/data')
+    threading.Thread(target=client.loop_forever).start()
+    broker.publish('rectifier/JKT/data', b'{...}')
+"""
+
+import itertools
+import queue
+import threading
+import zlib
+
+from paho.mqtt.client import topic_matches_sub
+
+SHARE_STRATEGIES = ('round_robin', 'hash_topic')
+
+_DISCONNECT = object()
+
+
+class LocalMessage:
+    def __init__(self, topic, payload, qos=0, retain=False):
+        self.topic = topic
+        self.payload = payload
+        self.qos = qos
+        self.retain = retain
+
+
+class LocalBroker:
+    def __init__(self, share_strategy='round_robin'):
+        if share_strategy not in SHARE_STRATEGIES:
+            raise ValueError(f"Unknown share strategy {share_strategy!r}")
+        self.share_strategy = share_strategy
+        self._lock = threading.Lock()
+        self._subscriptions = []   # [(client, filter)]
+        self._groups = {}          # (group, filter) -> [client]
+        self._cursors = {}         # (group, filter) -> itertools.count
+        self.published = 0
+
+    def client(self, client_id=''):
+        return LocalClient(self, client_id)
+
+    def subscribe(self, client, topic):
+        with self._lock:
+            if topic.startswith('$share/'):
+                _, group, topic_filter = topic.split('/', 2)
+                members = self._groups.setdefault((group, topic_filter), [])
+                if client not in members:
+                    members.append(client)
+                self._cursors.setdefault((group, topic_filter), itertools.count())
+            elif (client, topic) not in self._subscriptions:
+                self._subscriptions.append((client, topic))
+
+    def remove(self, client):
+        with self._lock:
+            self._subscriptions = [(c, t) for c, t in self._subscriptions if c is not client]
+            for members in self._groups.values():
+                if client in members:
+                    members.remove(client)
+
+    def publish(self, topic, payload, qos=0, retain=False):
+        """Kirim ke semua subscriber yang match. Return jumlah client tujuan."""
+        if isinstance(payload, str):
+            payload = payload.encode()
+        message = LocalMessage(topic, payload, qos, retain)
+
+        with self._lock:
+            targets = [c for c, f in self._subscriptions if topic_matches_sub(f, topic)]
+            for key, members in self._groups.items():
+                if not members or not topic_matches_sub(key[1], topic):
+                    continue
+                if self.share_strategy == 'hash_topic':
+                    target = members[zlib.crc32(topic.encode()) % len(members)]
+                else:
+                    target = members[next(self._cursors[key]) % len(members)]
+                if target not in targets:
+                    targets.append(target)
+            self.published += 1
+
+        for client in targets:
+            client._deliver(message)
+        return len(targets)
+
+
+class LocalClient:
+    """Subset API paho mqtt.Client di atas LocalBroker"""
+
+    def __init__(self, broker, client_id=''):
+        self.broker = broker
+        self.client_id = client_id
+        self.on_connect = None
+        self.on_message = None
+        self.received = 0
+        self._queue = queue.Queue()
+
+    def username_pw_set(self, username, password=None):
+        pass
+
+    def connect(self, host=None, port=None, keepalive=60):
+        if self.on_connect is not None:
+            self.on_connect(self, None, {}, 0)
+        return 0
+
+    def subscribe(self, topic, qos=0):
+        self.broker.subscribe(self, topic)
+        return 0, 1
+
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        return self.broker.publish(topic, payload or b'', qos, retain)
+
+    def _deliver(self, message):
+        self._queue.put(message)
+
+    def loop_forever(self):
+        while True:
+            message = self._queue.get()
+            if message is _DISCONNECT:
+                return
+            self.received += 1
+            if self.on_message is not None:
+                self.on_message(self, None, message)
+
+    def disconnect(self):
+        """Berhenti menerima pesan baru; pesan yang sudah di queue tetap diproses"""
+        self.broker.remove(self)
+        self._queue.put(_DISCONNECT)
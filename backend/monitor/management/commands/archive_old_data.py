@@ -0,0 +1,71 @@
+"""
+Management command: archive_old_data
+-------------------------------------
+Ekspor RectifierData per site per hari (UTC) ke file Parquet (zstd) sebelum
+dihapus oleh cleanup_old_data. Hari yang sudah punya ArchiveFile hanya
+ditulis ulang jika ada baris live yang belum ada di file (sample terlambat),
+baris tersebut digabung dengan isi file (lihat archive.archive_day).
+
+Cara pakai:
+    python manage.py archive_old_data              # semua hari penuh > 1 hari lalu
+    python manage.py archive_old_data --days 3
+    python manage.py archive_old_data --site JKT --force
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from monitor import archive
+from monitor.models import RectifierData, Site
+from monitor.partitions import day_of
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Arsipkan RectifierData lama ke Parquet (1 file per site per hari)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=1,
+                            help='Arsipkan hari penuh yang lebih lama dari N hari (default: 1)')
+        parser.add_argument('--site', help='Hanya site_code ini')
+        parser.add_argument('--force', action='store_true',
+                            help='Tulis ulang file yang sudah ada walaupun tidak ada baris baru')
+
+    def handle(self, *args, **options):
+        if archive.pa is None:
+            raise CommandError('pyarrow belum terinstall (pip install pyarrow)')
+
+        cutoff_day = (datetime.now(dt_timezone.utc) - timedelta(days=options['days'])).date()
+        sites = Site.objects.all()
+        if options['site']:
+            sites = sites.filter(site_code=options['site'])
+
+        total_files = 0
+        total_rows = 0
+        for site in sites:
+            oldest = (
+                RectifierData.objects.filter(site=site)
+                .order_by('timestamp').values_list('timestamp', flat=True).first()
+            )
+            if oldest is None:
+                continue
+
+            day = day_of(oldest)
+            while day < cutoff_day:
+                archived = archive.archive_day(site, day, force=options['force'])
+                if archived is not None:
+                    total_files += 1
+                    total_rows += archived.row_count
+                    self.stdout.write(
+                        f"  + {site.site_code} {day}: {archived.row_count:,} baris, "
+                        f"{archived.size_bytes / 1024:,.1f} KiB"
+                    )
+                day += timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"[SELESAI] {total_files} file arsip, {total_rows:,} baris (sebelum {cutoff_day})."
+        ))
+        logger.info("archive_old_data: %d file(s), %d rows before %s", total_files, total_rows, cutoff_day)
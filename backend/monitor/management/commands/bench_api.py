@@ -0,0 +1,151 @@
+"""
+Management command: bench_api
+-----------------------------
+Benchmark end-to-end endpoint API (URL routing, middleware, view, serializer,
+render) dengan data seed: --sites site x --days hari RectifierData per
+--interval detik, plus SiteLatest dan rollup seperti hasil listener.
+
+Setiap endpoint di-request --requests kali (site bergiliran) dan dilaporkan
+latency p50/p95/p99/max serta jumlah query SQL maksimum (informasi saja;
+budget query per endpoint dijaga test monitor/tests/test_query_budgets.py
+dengan assertNumQueries). Response cache dikosongkan sebelum setiap request,
+jadi yang diukur selalu jalur DB.
+
+Semua data dibuat di dalam transaksi yang di-rollback di akhir, jadi aman
+dijalankan di database development.
+
+Cara pakai:
+    python manage.py bench_api
+    python manage.py bench_api --sites 200 --days 7 --interval 300 --requests 100
+"""
+
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from monitor.decoder import decode_fields
+from monitor.management.commands.bench_ingest import sample_payload
+from monitor.models import RectifierData, Site
+from monitor.rollups import apply_rows
+from monitor.snapshots import upsert_latest
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile dari list yang sudah urut"""
+    index = max(0, min(len(values) - 1, int(round(pct / 100 * len(values))) - 1))
+    return values[index]
+
+
+class Command(BaseCommand):
+    help = "Benchmark latency + jumlah query endpoint API"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sites', type=int, default=20)
+        parser.add_argument('--days', type=float, default=1)
+        parser.add_argument('--interval', type=int, default=60,
+                            help='Detik antar reading per site (default: 60)')
+        parser.add_argument('--requests', type=int, default=30,
+                            help='Jumlah request per endpoint (default: 30)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def seed(self, sites, days, interval, rng):
+        """Return (site_codes, timestamp terbaru, id beberapa RectifierData)"""
+        step = interval * 1000
+        end = int(time.time() * 1000) // step * step
+        count = max(1, int(days * 86400 // interval))
+
+        created = Site.objects.bulk_create([
+            Site(site_code=f'__BENCH{index:04d}', site_name=f'Benchmark {index}',
+                 region='Benchmark', latitude=0, longitude=0)
+            for index in range(sites)
+        ])
+        newest = []
+        for site in created:
+            rows = []
+            for ts in range(end - (count - 1) * step, end + 1, step):
+                timestamp, fields = decode_fields(sample_payload(rng, ts))
+                rows.append(RectifierData(site=site, timestamp=timestamp, **fields))
+            RectifierData.objects.bulk_create(rows, batch_size=1000)
+            apply_rows(rows)
+            newest.append(rows[-1])
+        upsert_latest(newest)
+
+        ids = list(
+            RectifierData.objects.filter(site__in=created)
+            .order_by('?').values_list('id', flat=True)[:100]
+        )
+        return [site.site_code for site in created], end, ids
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        repeat = options['requests']
+
+        results = []
+        with transaction.atomic():
+            start = time.perf_counter()
+            codes, end, ids = self.seed(options['sites'], options['days'], options['interval'], rng)
+            total_rows = RectifierData.objects.filter(site__site_code__in=codes).count()
+            self.stdout.write(
+                f"database={connection.vendor} sites={len(codes)} rows={total_rows:,} "
+                f"(seed {time.perf_counter() - start:.1f}s)"
+            )
+
+            since = end - 6 * 3600 * 1000
+            cases = [
+                ('sites.list', lambda i: '/api/sites/'),
+                ('sites.dashboard', lambda i: f'/api/sites/{codes[i % len(codes)]}/dashboard/'),
+                ('sites.latest', lambda i: f'/api/sites/{codes[i % len(codes)]}/latest/'),
+                ('sites.history', lambda i: f'/api/sites/{codes[i % len(codes)]}/history/?limit=1000'),
+                ('sites.history.1h',
+                 lambda i: f'/api/sites/{codes[i % len(codes)]}/history/?resolution=1h&from={since}'),
+                ('sites.history.step',
+                 lambda i: f'/api/sites/{codes[i % len(codes)]}/history/?from={since}&step=60000&limit=360'),
+                ('rectifier.list', lambda i: '/api/rectifier/?limit=100'),
+                ('rectifier.list.site', lambda i: f'/api/rectifier/?site_code={codes[i % len(codes)]}&limit=500'),
+                ('rectifier.retrieve', lambda i: f'/api/rectifier/{ids[i % len(ids)]}/'),
+            ]
+
+            # Cache lokal terpisah + tanpa Redis: setiap request melewati jalur DB
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                REDIS_URL='',
+                RESPONSE_CACHE_VERSION_TTL=0,
+                CACHES={'default': {
+                    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                    'LOCATION': 'bench-api',
+                }},
+            ):
+                client = Client()
+                for name, url in cases:
+                    latencies = []
+                    max_queries = 0
+                    for i in range(repeat):
+                        caches['default'].clear()
+                        with CaptureQueriesContext(connection) as queries:
+                            began = time.perf_counter()
+                            response = client.get(url(i))
+                            elapsed = time.perf_counter() - began
+                        if response.status_code != 200:
+                            raise CommandError(f"{name}: GET {url(i)} -> {response.status_code}")
+                        latencies.append(elapsed * 1000)
+                        max_queries = max(max_queries, len(queries))
+                    latencies.sort()
+                    results.append((name, latencies, max_queries))
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"{'endpoint':<22} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'queries':>8}"
+        )
+        for name, latencies, max_queries in results:
+            self.stdout.write(
+                f"{name:<22} {percentile(latencies, 50):>9.2f} {percentile(latencies, 95):>9.2f} "
+                f"{percentile(latencies, 99):>9.2f} {latencies[-1]:>9.2f} {max_queries:>8}"
+            )
+        self.stdout.write(self.style.SUCCESS("[SELESAI] Benchmark API selesai."))
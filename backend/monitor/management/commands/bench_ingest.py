@@ -0,0 +1,104 @@
+"""
+Management command: bench_ingest
+---------------------------------
+Bandingkan throughput insert RectifierData (rows/detik) di database lokal:
+  - create      : 1 INSERT per baris (perilaku listener lama)
+  - bulk_create : INSERT multi-row per batch (fallback IngestPipeline)
+  - copy        : COPY ... FROM STDIN (PostgreSQL + psycopg 3)
+
+Semua baris dibuat di dalam transaksi yang di-rollback di akhir, jadi aman
+dijalankan di database development.
+
+Cara pakai:
+    python manage.py bench_ingest
+    python manage.py bench_ingest --rows 20000 --batch-size 1000
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from monitor.decoder import decode_fields
+from monitor.models import RectifierData, Site
+from monitor.pgcopy import copy_available, copy_rows
+
+
+def sample_payload(rng, ts):
+    return {
+        'ts': ts,
+        'vdc_output': round(rng.uniform(52, 54), 2),
+        'load_current': round(rng.uniform(40, 80), 2),
+        'load_power': round(rng.uniform(2000, 4000), 1),
+        'temperature': round(rng.uniform(25, 35), 1),
+        'humidity': round(rng.uniform(50, 80), 1),
+        'battery_bank_1_voltage': 53.2,
+        'battery_bank_1_soc': rng.randint(80, 100),
+        'status_realtime': 'Normal',
+        'modules_status': [{'id': i, 'status': 'Normal', 'value': '-'} for i in range(1, 5)],
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark insert RectifierData: create vs bulk_create vs COPY (rows/detik)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000)
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Ukuran batch bulk_create / COPY (default: 500, sama dengan INGEST_BATCH_SIZE)')
+        parser.add_argument('--create-rows', type=int, default=1000,
+                            help='Jumlah baris untuk case create (lambat)')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        batch_size = options['batch_size']
+        rng = random.Random(42)
+
+        with transaction.atomic():
+            site = Site.objects.create(
+                site_code='__BENCH__', site_name='Benchmark', latitude=0, longitude=0
+            )
+            payloads = [sample_payload(rng, i * 3000) for i in range(rows)]
+
+            def build(count):
+                rows = []
+                for payload in payloads[:count]:
+                    timestamp, fields = decode_fields(payload)
+                    rows.append(RectifierData(site=site, timestamp=timestamp, **fields))
+                return rows
+
+            def run_create(batch):
+                for row in batch:
+                    row.save(force_insert=True)
+
+            def run_bulk(batch):
+                for start in range(0, len(batch), batch_size):
+                    RectifierData.objects.bulk_create(batch[start:start + batch_size])
+
+            def run_copy(batch):
+                for start in range(0, len(batch), batch_size):
+                    copy_rows(batch[start:start + batch_size])
+
+            cases = [
+                ('create', min(options['create_rows'], rows), run_create),
+                ('bulk_create', rows, run_bulk),
+            ]
+            if copy_available():
+                cases.append(('copy', rows, run_copy))
+
+            self.stdout.write(f"database={connection.vendor} rows={rows} batch_size={batch_size}")
+            self.stdout.write(f"{'case':<14} {'rows':>8} {'rows/s':>12} {'ms':>10}")
+            for name, count, run in cases:
+                batch = build(count)
+                sid = transaction.savepoint()
+                start = time.perf_counter()
+                run(batch)
+                elapsed = time.perf_counter() - start
+                transaction.savepoint_rollback(sid)
+                self.stdout.write(f"{name:<14} {count:>8} {count / elapsed:>12,.0f} {elapsed * 1000:>10.1f}")
+
+            if not copy_available():
+                self.stdout.write(self.style.WARNING('copy skipped: needs PostgreSQL + psycopg 3'))
+
+            transaction.set_rollback(True)
@@ -0,0 +1,78 @@
+"""
+Management command: bench_serializers
+--------------------------------------
+Bandingkan throughput (rows/detik) encode list RectifierData:
+  - RectifierDataSerializer (seperti sebelumnya, tanpa select_related)
+  - RectifierDataSerializer + select_related('site')
+  - RectifierDataProjection (values_list + encoder manual)
+  - RectifierDataProjection dengan ?fields= subset
+
+Data benchmark dibuat di dalam transaksi yang di-rollback di akhir, jadi
+aman dijalankan di database development.
+
+Cara pakai:
+    python manage.py bench_serializers
+    python manage.py bench_serializers --rows 5000 --repeat 5
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from monitor.models import RectifierData, Site
+from monitor.serializers import RectifierDataProjection, RectifierDataSerializer
+
+
+class Command(BaseCommand):
+    help = "Benchmark RectifierDataSerializer vs RectifierDataProjection (rows/detik)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000,
+                            help='Jumlah baris per request (default: 1000, sama dengan limit history)')
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        repeat = options['repeat']
+
+        with transaction.atomic():
+            site = Site.objects.create(
+                site_code='__BENCH__', site_name='Benchmark', latitude=0, longitude=0
+            )
+            RectifierData.objects.bulk_create(
+                [
+                    RectifierData(site=site, timestamp=i * 3000, vdc_output=53.5, load_current=60.2,
+                                  modules_status=[{'id': 1, 'status': 'Normal', 'value': '-'}])
+                    for i in range(rows)
+                ],
+                batch_size=1000,
+            )
+            base = RectifierData.objects.filter(site=site).order_by('-timestamp')
+
+            cases = [
+                ('serializer', lambda: RectifierDataSerializer(base[:rows], many=True).data),
+                ('serializer+select_related',
+                 lambda: RectifierDataSerializer(base.select_related('site')[:rows], many=True).data),
+                ('projection', lambda: RectifierDataProjection().project(base[:rows])),
+                ('projection fields=timestamp,vdc_output',
+                 lambda: RectifierDataProjection(['timestamp', 'vdc_output']).project(base[:rows])),
+            ]
+
+            self.stdout.write(f"{'case':<40} {'rows/s':>12} {'ms':>9} {'queries':>8}")
+            renderer = JSONRenderer()
+            for name, build in cases:
+                best = None
+                for _ in range(repeat):
+                    with CaptureQueriesContext(connection) as queries:
+                        start = time.perf_counter()
+                        renderer.render(build())
+                        elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                self.stdout.write(
+                    f"{name:<40} {rows / best:>12,.0f} {best * 1000:>9.1f} {len(queries):>8}"
+                )
+
+            transaction.set_rollback(True)
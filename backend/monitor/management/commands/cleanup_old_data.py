@@ -3,20 +3,36 @@ Management command: cleanup_old_data
 -------------------------------------
 Menghapus semua baris RectifierData yang usianya lebih dari RETAIN_DAYS hari.
 Default: simpan hanya data 1 hari terakhir.
+Rollup (RectifierRollup) dipangkas terpisah sesuai ROLLUP_RETENTION_DAYS.
+
+Jika tabel sudah partitioned (manage_partitions --convert, PostgreSQL),
+retensi dilakukan dengan DETACH + DROP partisi harian yang seluruhnya lebih
+lama dari cutoff (berdasarkan kolom timestamp). Selain itu (SQLite / tabel
+biasa) fallback ke batch delete per id.
+
+Dengan --archive (atau ARCHIVE_BEFORE_CLEANUP=True) data diekspor dulu
+lewat archive_old_data, dan cutoff dibulatkan ke awal hari UTC supaya yang
+dihapus hanya hari-hari yang sudah utuh di arsip. Baris yang masuk setelah
+arsip mulai ditulis tidak dihapus; archive_old_data berikutnya menggabungkan
+baris terlambat seperti itu ke file hari yang bersangkutan.
 
 Cara pakai:
     python manage.py cleanup_old_data              # hapus > 1 hari
     python manage.py cleanup_old_data --days 3     # hapus > 3 hari
     python manage.py cleanup_old_data --dry-run    # preview tanpa hapus
+    python manage.py cleanup_old_data --archive    # arsip Parquet dulu, lalu hapus
 """
 
 import logging
-from datetime import timedelta
+from datetime import timedelta, timezone as dt_timezone
 
+from django.conf import settings
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
-from monitor.models import RectifierData
+from monitor import partitions
+from monitor.models import RectifierData, RectifierRollup
 
 logger = logging.getLogger(__name__)
 
@@ -36,12 +52,37 @@ class Command(BaseCommand):
             action='store_true',
             help='Hanya tampilkan jumlah yang akan dihapus, tanpa benar-benar menghapus',
         )
+        parser.add_argument(
+            '--archive',
+            action='store_true',
+            help='Arsipkan data ke Parquet (archive_old_data) sebelum dihapus',
+        )
 
     def handle(self, *args, **options):
         retain_days = options['days']
         dry_run = options['dry_run']
 
         cutoff_time = timezone.now() - timedelta(days=retain_days)
+        old_rows = {'created_at__lt': cutoff_time}
+
+        if options['archive'] or settings.ARCHIVE_BEFORE_CLEANUP:
+            cutoff_time = cutoff_time.astimezone(dt_timezone.utc).replace(
+                hour=0, minute=0, second=0, microsecond=0
+            )
+            # Arsip dibagi per hari berdasarkan timestamp, jadi hapus dengan kunci yang sama
+            old_rows = {'timestamp__lt': int(cutoff_time.timestamp() * 1000)}
+            # Baris yang masuk setelah arsip mulai ditulis (sample terlambat untuk
+            # hari lama) belum tentu ada di arsip: disimpan sampai run berikutnya
+            old_rows['created_at__lt'] = timezone.now()
+            if not dry_run:
+                # Error di sini menghentikan cleanup: data tidak dihapus tanpa arsip
+                call_command('archive_old_data', days=retain_days, stdout=self.stdout)
+
+        self.cleanup_rollups(dry_run)
+
+        if partitions.is_partitioned():
+            self.drop_partitions(cutoff_time, retain_days, dry_run)
+            return
 
         self.stdout.write(
             f"[cleanup_old_data] Cutoff: {cutoff_time.strftime('%Y-%m-%d %H:%M:%S')} UTC\n"
@@ -49,7 +90,7 @@ class Command(BaseCommand):
         )
 
         # Hitung berapa banyak yang akan dihapus
-        qs = RectifierData.objects.filter(created_at__lt=cutoff_time)
+        qs = RectifierData.objects.filter(**old_rows)
         count = qs.count()
 
         if count == 0:
@@ -71,7 +112,7 @@ class Command(BaseCommand):
         while True:
             # Ambil ID batch pertama lalu hapus berdasarkan ID
             batch_ids = list(
-                RectifierData.objects.filter(created_at__lt=cutoff_time)
+                RectifierData.objects.filter(**old_rows)
                 .values_list('id', flat=True)[:BATCH_SIZE]
             )
             if not batch_ids:
@@ -85,3 +126,36 @@ class Command(BaseCommand):
             f"[SELESAI] Total {total_deleted:,} baris data lama berhasil dihapus."
         ))
         logger.info("cleanup_old_data: deleted %d rows older than %d day(s)", total_deleted, retain_days)
+
+    def cleanup_rollups(self, dry_run):
+        """Hapus bucket rollup yang melewati ROLLUP_RETENTION_DAYS per resolution"""
+        now = timezone.now()
+        for resolution, days in settings.ROLLUP_RETENTION_DAYS.items():
+            if days is None:
+                continue
+            cutoff_ms = int((now - timedelta(days=days)).timestamp() * 1000)
+            qs = RectifierRollup.objects.filter(resolution=resolution, bucket__lt=cutoff_ms)
+            if dry_run:
+                self.stdout.write(f"[DRY RUN] rollup {resolution}: {qs.count():,} bucket > {days} hari")
+                continue
+            deleted, _ = qs.delete()
+            if deleted:
+                self.stdout.write(f"  ... rollup {resolution}: terhapus {deleted:,} bucket > {days} hari")
+
+    def drop_partitions(self, cutoff_time, retain_days, dry_run):
+        """Retensi mode partitioned: drop partisi harian utuh"""
+        cutoff_ms = int(cutoff_time.timestamp() * 1000)
+        dropped = partitions.drop_partitions_before(cutoff_ms, dry_run=dry_run)
+
+        for name, estimate in dropped:
+            prefix = "[DRY RUN] " if dry_run else "  ... "
+            self.stdout.write(f"{prefix}drop {name} (~{estimate:,} baris)")
+
+        if dry_run:
+            return
+
+        leftover = partitions.delete_default_before(cutoff_ms)
+        self.stdout.write(self.style.SUCCESS(
+            f"[SELESAI] {len(dropped)} partisi di-drop, {leftover:,} baris dihapus dari partisi default."
+        ))
+        logger.info("cleanup_old_data: dropped %d partition(s) older than %d day(s)", len(dropped), retain_days)
@@ -0,0 +1,75 @@
+"""
+Management command: manage_partitions
+--------------------------------------
+Kelola partisi harian RectifierData (PostgreSQL saja, lihat monitor/partitions.py).
+
+Cara pakai:
+    python manage.py manage_partitions --convert     # 1x: ubah ke partitioned table
+    python manage.py manage_partitions --ahead 7     # buat partisi 7 hari ke depan
+    python manage.py manage_partitions --status      # daftar partisi + estimasi baris
+
+Aman dijalankan di SQLite / tabel yang belum dikonversi (no-op).
+
+--convert: rename tabel + pembuatan partitioned table memegang lock
+eksklusif, jadi hentikan listener (atau jalankan dengan INGEST_SPOOL_DIR
+agar flush yang gagal di-spool dan diputar ulang setelah konversi) dan
+jalankan saat traffic API rendah. Data lama lalu disalin per hari UTC dalam
+transaksi terpisah; jika terputus, jalankan --convert lagi untuk
+melanjutkan (baris yang sudah tersalin dilewati). Selama penyalinan history
+lama belum lengkap di API.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from monitor import partitions
+
+
+class Command(BaseCommand):
+    help = "Buat / tampilkan partisi harian RectifierData (PostgreSQL)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, default=7,
+                            help='Jumlah hari ke depan yang dibuatkan partisi (default: 7)')
+        parser.add_argument('--convert', action='store_true',
+                            help='Konversi tabel RectifierData menjadi partitioned table '
+                                 '(hentikan / spool listener dulu; ulangi untuk melanjutkan salinan)')
+        parser.add_argument('--days-back', type=int, default=31,
+                            help='Saat --convert: partisi untuk data N hari terakhir (default: 31)')
+        parser.add_argument('--no-copy', action='store_true',
+                            help='Saat --convert: jangan salin data lama (tabel _legacy disimpan, '
+                                 'disalin oleh --convert berikutnya)')
+        parser.add_argument('--status', action='store_true',
+                            help='Tampilkan daftar partisi')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write("Partitioning hanya untuk PostgreSQL - dilewati.")
+            return
+
+        if options['convert']:
+            try:
+                converted = partitions.convert_to_partitioned(
+                    days_ahead=options['ahead'],
+                    days_back=options['days_back'],
+                    copy_data=not options['no_copy'],
+                )
+            except RuntimeError as e:
+                raise CommandError(str(e))
+            if converted:
+                self.stdout.write(self.style.SUCCESS("✓ RectifierData sekarang partitioned per hari."))
+            else:
+                self.stdout.write("RectifierData sudah partitioned.")
+
+        if not partitions.is_partitioned():
+            self.stdout.write("RectifierData belum partitioned (jalankan --convert). Tidak ada yang dibuat.")
+            return
+
+        created = partitions.ensure_partitions(days_ahead=options['ahead'])
+        for name in created:
+            self.stdout.write(f"  + {name}")
+        self.stdout.write(self.style.SUCCESS(f"[SELESAI] {len(created)} partisi baru dibuat."))
+
+        if options['status']:
+            for name, day, rows in partitions.partition_stats():
+                self.stdout.write(f"  {name}  {day}  ~{rows:,} baris")
@@ -0,0 +1,82 @@
+"""
+Management command: rebuild_rollups
+-----------------------------------
+Hitung ulang RectifierRollup dari data mentah RectifierData, misalnya untuk
+backfill setelah migrasi atau setelah listener mati.
+
+Rentang dimulai dari awal jam (bucket 1h), sehingga semua tier yang
+tersentuh dihitung ulang dari nol.
+
+Retensi data mentah jauh lebih pendek dari retensi rollup (15m/1h), jadi
+bucket yang lebih tua dari RectifierData tertua tidak bisa dibangun ulang.
+Awal rentang dipotong ke bucket 1h pertama yang seluruhnya masih punya data
+mentah; bucket sebelum itu tidak dihapus.
+
+Cara pakai:
+    python manage.py rebuild_rollups                  # 1 hari terakhir
+    python manage.py rebuild_rollups --hours 6
+    python manage.py rebuild_rollups --site JKT
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Min
+
+from monitor.models import ROLLUP_RESOLUTIONS, RectifierData, RectifierRollup
+from monitor.rollups import apply_rows, bucket_start
+
+
+class Command(BaseCommand):
+    help = "Hitung ulang rollup 1m/15m/1h dari RectifierData"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24,
+                            help='Rentang data mentah yang dihitung ulang (default: 24)')
+        parser.add_argument('--site', help='Hanya site_code ini')
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        now_ms = int(time.time() * 1000)
+        since = bucket_start(now_ms - options['hours'] * ROLLUP_RESOLUTIONS['1h'], '1h')
+
+        rows = RectifierData.objects.all()
+        rollups = RectifierRollup.objects.all()
+        if options['site']:
+            rows = rows.filter(site__site_code=options['site'])
+            rollups = rollups.filter(site__site_code=options['site'])
+
+        oldest = rows.aggregate(oldest=Min('timestamp'))['oldest']
+        if oldest is None:
+            raise CommandError("Tidak ada data mentah RectifierData, rollup tidak diubah")
+        # Bucket 1h yang berisi baris tertua mungkin sudah sebagian dihapus retensi: mulai dari bucket berikutnya
+        width = ROLLUP_RESOLUTIONS['1h']
+        first_complete = -(-oldest // width) * width
+        if since < first_complete:
+            self.stdout.write(self.style.WARNING(
+                f"Data mentah tertua {oldest}: rentang dipotong ke {first_complete} "
+                f"(rollup sebelumnya dipertahankan)"
+            ))
+            since = first_complete
+
+        rows = rows.filter(timestamp__gte=since)
+        rollups = rollups.filter(bucket__gte=since)
+
+        with transaction.atomic():
+            deleted, _ = rollups.delete()
+            self.stdout.write(f"Dihapus {deleted:,} bucket lama sejak {since}")
+
+            total = 0
+            chunk = []
+            for row in rows.order_by('timestamp').iterator(chunk_size=options['chunk_size']):
+                chunk.append(row)
+                if len(chunk) >= options['chunk_size']:
+                    apply_rows(chunk)
+                    total += len(chunk)
+                    chunk = []
+            if chunk:
+                apply_rows(chunk)
+                total += len(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f"[SELESAI] {total:,} baris di-rollup ulang."))
@@ -0,0 +1,137 @@
+"""
+Management command: replay_mqtt
+-------------------------------
+Putar ulang rekaman MQTT (mqtt_listener_multisite.py --record, format di
+monitor/recording.py) langsung ke on_message listener tanpa broker:
+decode -> dedup -> SiteCache -> IngestPipeline -> DB, sama seperti produksi.
+
+Kecepatan mengikuti jarak waktu tiba asli dibagi --speed, atau secepat
+mungkin dengan --speed max. Di akhir dilaporkan:
+  - ingest   : pesan/detik yang masuk lewat on_message
+  - DB time  : total waktu flush writer per pesan
+  - end-to-end rows/detik sampai queue selesai di-drain
+
+Reading (site, ts) yang sudah ada di DB dibuang dedup; pakai --retime untuk
+menggeser "ts" payload ke waktu sekarang agar replay bisa diulang di DB yang
+sama (payload ditulis ulang sebelum timer mulai).
+
+Cara pakai:
+    python manage.py replay_mqtt capture.rec              # kecepatan asli (1x)
+    python manage.py replay_mqtt capture.rec --speed 10
+    python manage.py replay_mqtt capture.rec --speed max --retime
+"""
+
+import json
+import logging
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from monitor.ingestion import IngestPipeline
+from monitor.local_broker import LocalMessage
+from monitor.recording import RecordFormatError, read_frames
+from monitor.site_cache import site_cache
+
+
+def parse_speed(value):
+    """'max' -> None, '10' / '10x' -> 10.0"""
+    if value == 'max':
+        return None
+    try:
+        speed = float(value.rstrip('x'))
+    except ValueError:
+        speed = 0
+    if speed <= 0:
+        raise CommandError(f"--speed must be a positive number or 'max', got {value!r}")
+    return speed
+
+
+def retime(frames):
+    """Geser ts payload JSON sehingga frame pertama = sekarang (jarak antar frame tetap)"""
+    if not frames:
+        return frames
+    shift_ms = int(time.time() * 1000) - frames[0][0] // 1000
+    shifted = []
+    for arrival_us, topic, payload in frames:
+        try:
+            data = json.loads(payload)
+            data['ts'] = int(data['ts']) + shift_ms
+            payload = json.dumps(data).encode()
+        except (ValueError, TypeError, KeyError):
+            pass  # payload rusak tetap diputar apa adanya (dihitung rejected)
+        shifted.append((arrival_us, topic, payload))
+    return shifted
+
+
+class Command(BaseCommand):
+    help = "Replay rekaman MQTT ke pipeline ingest listener (tanpa broker)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File rekaman (--record listener)')
+        parser.add_argument('--speed', default='1',
+                            help="Faktor kecepatan (1, 10, 10x) atau 'max' (default: 1)")
+        parser.add_argument('--limit', type=int, help='Hanya N pesan pertama')
+        parser.add_argument('--retime', action='store_true',
+                            help='Geser ts payload ke waktu sekarang (replay ulang di DB yang sama)')
+
+    def handle(self, *args, **options):
+        # Import di sini: modul listener membuat pipeline global saat di-import
+        import mqtt_listener_multisite as listener
+
+        speed = parse_speed(options['speed'])
+        try:
+            frames = []
+            for frame in read_frames(options['path']):
+                if options['limit'] is not None and len(frames) >= options['limit']:
+                    break
+                frames.append(frame)
+        except (OSError, RecordFormatError) as e:
+            raise CommandError(str(e))
+        if not frames:
+            raise CommandError(f"{options['path']}: no messages recorded")
+        if options['retime']:
+            frames = retime(frames)
+
+        span = (frames[-1][0] - frames[0][0]) / 1e6
+        self.stdout.write(
+            f"Replay {len(frames):,} pesan (rekaman {span:.1f}s) "
+            f"speed={'max' if speed is None else f'{speed:g}x'}"
+        )
+
+        if options['verbosity'] < 2:
+            listener.logger.setLevel(logging.WARNING)
+        pipeline = listener.pipeline = IngestPipeline(name='replay')
+        site_cache.warm()
+        pipeline.start()
+
+        first_arrival = frames[0][0]
+        start = time.perf_counter()
+        for arrival_us, topic, payload in frames:
+            if speed is not None:
+                delay = start + (arrival_us - first_arrival) / 1e6 / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            listener.on_message(None, None, LocalMessage(topic, payload))
+        fed = time.perf_counter() - start
+
+        pipeline.stop(timeout=300)
+        elapsed = time.perf_counter() - start
+        stats = pipeline.stats
+        snapshot = stats.snapshot()
+
+        count = len(frames)
+        self.stdout.write(f"  ingest     : {count / fed:,.1f} pesan/detik ({fed:.2f}s)")
+        self.stdout.write(
+            f"  DB time    : {stats.total_flush_ms:,.1f}ms total, "
+            f"{stats.total_flush_ms * 1000 / count:,.1f}µs/pesan "
+            f"({stats.flushes} flush, avg {snapshot['avg_flush_ms']}ms)"
+        )
+        self.stdout.write(
+            f"  end-to-end : {stats.stored / elapsed:,.1f} rows/detik "
+            f"({stats.stored:,} rows dalam {elapsed:.2f}s)"
+        )
+        self.stdout.write(
+            f"  rejected={stats.rejected} duplicates={stats.duplicates} late={stats.late} "
+            f"suppressed={stats.suppressed} dropped={stats.dropped} failed={stats.failed}"
+        )
+        self.stdout.write(self.style.SUCCESS("[SELESAI] Replay selesai."))
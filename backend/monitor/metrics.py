@@ -0,0 +1,214 @@
+"""
+Instrumentation Prometheus (prometheus_client).
+
+Metric didefinisikan sekali di modul ini dan dicatat dari:
+  - IngestStats (monitor/ingestion.py): pesan diterima/ditolak/tersimpan per
+    site, event dedup/deadband/drop, latency decode, latency flush DB, lag
+    ingest (now - ts payload) dan kedalaman queue. Dipakai listener sync
+    maupun async.
+  - MetricsMiddleware: latency dan jumlah query SQL per view Django.
+
+Diekspos di:
+  - Django  : GET /metrics (metrics_view, lihat rectifier_monitor/urls.py)
+  - Listener: HTTP server kecil di LISTENER_METRICS_PORT (+ index worker,
+    jadi setiap worker listener di-scrape terpisah)
+
+Gunicorn dengan beberapa worker: set PROMETHEUS_MULTIPROC_DIR (lihat
+gunicorn.conf.py dan docker-compose.yml). Setiap worker menulis metric ke
+file di direktori tersebut dan /metrics menjumlahkan semua worker, sehingga
+counter tidak "mundur" tergantung worker mana yang menjawab scrape. Tanpa
+variabel itu registry per proses (dev / runserver).
+
+Nama metric memakai prefix rectifier_, label site hanya untuk counter (bukan
+histogram) agar jumlah series tetap kecil.
+
+LogSampler menggantikan log INFO per pesan di listener: semua pesan di-log
+jika level DEBUG aktif, selain itu hanya 1 dari INGEST_LOG_SAMPLE pesan.
+"""
+
+import contextvars
+import logging
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+
+# Direktori multiprocess harus ada sebelum metric pertama dibuat (juga untuk
+# manage.py migrate yang berjalan sebelum gunicorn)
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+if MULTIPROC_DIR:
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+    multiprocess,
+)
+from prometheus_client import start_http_server as _start_http_server  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# ---------------------------------------------------------------------------
+# Ingest (listener)
+# ---------------------------------------------------------------------------
+
+INGEST_RECEIVED = Counter(
+    'rectifier_ingest_messages_received_total', 'Pesan MQTT diterima listener', ['site'])
+INGEST_REJECTED = Counter(
+    'rectifier_ingest_messages_rejected_total', 'Payload ditolak decoder', ['site'])
+INGEST_STORED = Counter(
+    'rectifier_ingest_rows_stored_total', 'Baris RectifierData tersimpan', ['site'])
+INGEST_EVENTS = Counter(
+    'rectifier_ingest_events_total',
+    'Pesan/baris per event: skipped, duplicates, late, suppressed, dropped, failed, '
+    'spooled, spool_full, unspooled', ['event'])
+INGEST_DECODE_SECONDS = Histogram(
+    'rectifier_ingest_decode_seconds', 'Waktu decode + validasi 1 payload',
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01))
+INGEST_FLUSH_SECONDS = Histogram(
+    'rectifier_ingest_flush_seconds', 'Waktu 1 flush writer ke DB (insert + SiteLatest + rollup)',
+    buckets=LATENCY_BUCKETS)
+INGEST_FLUSH_ROWS = Histogram(
+    'rectifier_ingest_flush_rows', 'Jumlah baris per flush',
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2500, 5000))
+INGEST_LAG_SECONDS = Histogram(
+    'rectifier_ingest_lag_seconds', 'Waktu flush dikurangi ts payload',
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600))
+# Gauge listener (set_function); livesum: di proses web multiprocess tidak muncul per pid
+INGEST_QUEUE_DEPTH = Gauge(
+    'rectifier_ingest_queue_depth', 'Baris menunggu di queue writer', multiprocess_mode='livesum')
+SPOOL_BYTES = Gauge(
+    'rectifier_spool_bytes', 'Ukuran spool lokal saat DB tidak tersedia (monitor/spool.py)',
+    multiprocess_mode='livesum')
+SPOOL_MESSAGES = Gauge(
+    'rectifier_spool_messages', 'Pesan di spool yang belum diputar ulang ke DB',
+    multiprocess_mode='livesum')
+SPOOL_SEGMENTS = Gauge(
+    'rectifier_spool_segments', 'Jumlah segment file spool', multiprocess_mode='livesum')
+
+# ---------------------------------------------------------------------------
+# HTTP (Django)
+# ---------------------------------------------------------------------------
+
+HTTP_REQUEST_SECONDS = Histogram(
+    'rectifier_http_request_duration_seconds', 'Latency request Django per view',
+    ['view', 'method', 'status'], buckets=LATENCY_BUCKETS)
+HTTP_REQUEST_QUERIES = Histogram(
+    'rectifier_http_request_queries', 'Jumlah query SQL per request', ['view'],
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100))
+
+# Counter query request yang sedang berjalan. ContextVar (bukan thread-local):
+# di ASGI view sync berjalan di thread lain lewat sync_to_async, context ikut disalin.
+_request_queries = contextvars.ContextVar('rectifier_request_queries', default=None)
+
+
+def _count_query(execute, sql, params, many, context):
+    counter = _request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+@receiver(connection_created)
+def _install_query_counter(sender, connection, **kwargs):
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+# Koneksi yang sudah terbuka sebelum modul ini di-import (mis. test runner)
+for _connection in connections.all(initialized_only=True):
+    _install_query_counter(None, _connection)
+
+
+class MetricsMiddleware:
+    """Latency + jumlah query per view; sync dan async (tanpa hop sync<->async di ASGI)"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = [0]
+        token = _request_queries.set(counter)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self._observe(request, response, time.perf_counter() - start, counter[0])
+        return response
+
+    async def __acall__(self, request):
+        counter = [0]
+        token = _request_queries.set(counter)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self._observe(request, response, time.perf_counter() - start, counter[0])
+        return response
+
+    @staticmethod
+    def _observe(request, response, elapsed, queries):
+        match = request.resolver_match
+        view = (match.view_name or match._func_path) if match is not None else 'unmatched'
+        HTTP_REQUEST_SECONDS.labels(view, request.method, response.status_code).observe(elapsed)
+        HTTP_REQUEST_QUERIES.labels(view).observe(queries)
+
+
+def render():
+    """Text exposition semua metric (dijumlahkan dari semua worker di mode multiprocess)"""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def metrics_view(request):
+    return HttpResponse(render(), content_type=CONTENT_TYPE_LATEST)
+
+
+def start_http_server(port, host='0.0.0.0'):
+    """GET /metrics di thread daemon (listener). Return True jika server jalan (port 0 / gagal bind -> False)."""
+    if not port:
+        return False
+    try:
+        _start_http_server(port, addr=host)
+    except OSError as e:
+        logger.warning(f"✗ Metrics server not started on port {port}: {e}")
+        return False
+    logger.info(f"✓ Metrics available at http://{host}:{port}/metrics")
+    return True
+
+
+class LogSampler:
+    """
+    hit() -> True jika pesan ini perlu di-log: selalu saat logger level DEBUG,
+    selain itu 1 dari setiap `every` pesan (0 = tidak pernah).
+    """
+
+    def __init__(self, logger, every):
+        self.logger = logger
+        self.every = every
+        self._count = 0
+
+    def hit(self):
+        if self.logger.isEnabledFor(logging.DEBUG):
+            return True
+        if self.every <= 0:
+            return False
+        self._count += 1
+        return self._count % self.every == 0
@@ -0,0 +1,104 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def backfill_site_latest(apps, schema_editor):
+    """Isi SiteLatest dari baris RectifierData terbaru setiap site"""
+    Site = apps.get_model('monitor', 'Site')
+    SiteLatest = apps.get_model('monitor', 'SiteLatest')
+    RectifierData = apps.get_model('monitor', 'RectifierData')
+
+    exclude = {'id', 'site', 'timestamp', 'created_at'}
+    columns = [
+        f.attname for f in RectifierData._meta.concrete_fields
+        if f.name not in exclude
+    ]
+
+    for site_id in Site.objects.values_list('id', flat=True).iterator():
+        row = (
+            RectifierData.objects.filter(site_id=site_id)
+            .order_by('-timestamp').first()
+        )
+        if row is None:
+            continue
+        SiteLatest.objects.update_or_create(
+            site_id=site_id,
+            defaults={
+                'timestamp': row.timestamp,
+                'reading_id': row.id,
+                'created_at': row.created_at,
+                **{name: getattr(row, name) for name in columns},
+            },
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0002_alter_rectifierdata_battery_bank_1_current_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteLatest',
+            fields=[
+                ('site_name', models.CharField(default='', max_length=255)),
+                ('project_id', models.CharField(default='', max_length=255)),
+                ('ladder', models.CharField(default='', max_length=100)),
+                ('sla', models.CharField(default='', max_length=100)),
+                ('status_realtime', models.CharField(db_index=True, default='Normal', max_length=50)),
+                ('status_ladder', models.CharField(default='Normal', max_length=50)),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+                ('door_cabinet', models.CharField(default='Close', max_length=20)),
+                ('battery_stolen', models.CharField(default='Close', max_length=20)),
+                ('temperature', models.FloatField(blank=True, default=0, null=True)),
+                ('humidity', models.FloatField(blank=True, default=0, null=True)),
+                ('vac_input_l1', models.FloatField(default=0)),
+                ('vac_input_l2', models.FloatField(default=0)),
+                ('vac_input_l3', models.FloatField(blank=True, null=True)),
+                ('vdc_output', models.FloatField(default=0)),
+                ('battery_current', models.FloatField(blank=True, default=0, null=True)),
+                ('iac_input_l1', models.FloatField(blank=True, null=True)),
+                ('iac_input_l2', models.FloatField(blank=True, null=True)),
+                ('iac_input_l3', models.FloatField(blank=True, null=True)),
+                ('load_current', models.FloatField(blank=True, default=0, null=True)),
+                ('load_power', models.FloatField(blank=True, default=0, null=True)),
+                ('pac_load_l1', models.FloatField(blank=True, default=0, null=True)),
+                ('pac_load_l2', models.FloatField(blank=True, default=0, null=True)),
+                ('pac_load_l3', models.FloatField(blank=True, default=0, null=True)),
+                ('rectifier_current', models.FloatField(blank=True, default=0, null=True)),
+                ('total_power', models.FloatField(blank=True, default=0, null=True)),
+                ('battery_bank_1_voltage', models.FloatField(blank=True, default=0, null=True)),
+                ('battery_bank_1_current', models.FloatField(blank=True, default=0, null=True)),
+                ('battery_bank_1_soc', models.FloatField(blank=True, default=100, null=True)),
+                ('battery_bank_1_soh', models.FloatField(blank=True, default=100, null=True)),
+                ('battery_bank_2_voltage', models.FloatField(blank=True, default=0, null=True)),
+                ('battery_bank_2_current', models.FloatField(blank=True, default=0, null=True)),
+                ('battery_bank_2_soc', models.FloatField(blank=True, default=100, null=True)),
+                ('battery_bank_2_soh', models.FloatField(blank=True, default=100, null=True)),
+                ('battery_bank_3_voltage', models.FloatField(blank=True, default=0, null=True)),
+                ('battery_bank_3_current', models.FloatField(blank=True, default=0, null=True)),
+                ('battery_bank_3_soc', models.FloatField(blank=True, default=100, null=True)),
+                ('battery_bank_3_soh', models.FloatField(blank=True, default=100, null=True)),
+                ('backup_duration', models.IntegerField(blank=True, null=True)),
+                ('time_remaining', models.IntegerField(blank=True, null=True)),
+                ('battery_status', models.CharField(default='Standby', max_length=50)),
+                ('start_backup', models.CharField(default='No data', max_length=100)),
+                ('soc_avg', models.FloatField(blank=True, default=100, null=True)),
+                ('modules_status', models.JSONField(blank=True, default=list)),
+                ('site', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='latest', serialize=False, to='monitor.site')),
+                ('timestamp', models.BigIntegerField()),
+                ('reading_id', models.BigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'site latest data',
+                'verbose_name_plural': 'site latest data',
+            },
+        ),
+        migrations.RunPython(backfill_site_latest, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0003_sitelatest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RectifierRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('1m', '1m'), ('15m', '15m'), ('1h', '1h')], max_length=4)),
+                ('bucket', models.BigIntegerField()),
+                ('sample_count', models.IntegerField(default=0)),
+                ('last_timestamp', models.BigIntegerField(default=0)),
+                ('vdc_output_min', models.FloatField(blank=True, null=True)),
+                ('vdc_output_max', models.FloatField(blank=True, null=True)),
+                ('vdc_output_sum', models.FloatField(blank=True, null=True)),
+                ('vdc_output_count', models.IntegerField(default=0)),
+                ('vdc_output_last', models.FloatField(blank=True, null=True)),
+                ('load_current_min', models.FloatField(blank=True, null=True)),
+                ('load_current_max', models.FloatField(blank=True, null=True)),
+                ('load_current_sum', models.FloatField(blank=True, null=True)),
+                ('load_current_count', models.IntegerField(default=0)),
+                ('load_current_last', models.FloatField(blank=True, null=True)),
+                ('load_power_min', models.FloatField(blank=True, null=True)),
+                ('load_power_max', models.FloatField(blank=True, null=True)),
+                ('load_power_sum', models.FloatField(blank=True, null=True)),
+                ('load_power_count', models.IntegerField(default=0)),
+                ('load_power_last', models.FloatField(blank=True, null=True)),
+                ('rectifier_current_min', models.FloatField(blank=True, null=True)),
+                ('rectifier_current_max', models.FloatField(blank=True, null=True)),
+                ('rectifier_current_sum', models.FloatField(blank=True, null=True)),
+                ('rectifier_current_count', models.IntegerField(default=0)),
+                ('rectifier_current_last', models.FloatField(blank=True, null=True)),
+                ('total_power_min', models.FloatField(blank=True, null=True)),
+                ('total_power_max', models.FloatField(blank=True, null=True)),
+                ('total_power_sum', models.FloatField(blank=True, null=True)),
+                ('total_power_count', models.IntegerField(default=0)),
+                ('total_power_last', models.FloatField(blank=True, null=True)),
+                ('battery_current_min', models.FloatField(blank=True, null=True)),
+                ('battery_current_max', models.FloatField(blank=True, null=True)),
+                ('battery_current_sum', models.FloatField(blank=True, null=True)),
+                ('battery_current_count', models.IntegerField(default=0)),
+                ('battery_current_last', models.FloatField(blank=True, null=True)),
+                ('temperature_min', models.FloatField(blank=True, null=True)),
+                ('temperature_max', models.FloatField(blank=True, null=True)),
+                ('temperature_sum', models.FloatField(blank=True, null=True)),
+                ('temperature_count', models.IntegerField(default=0)),
+                ('temperature_last', models.FloatField(blank=True, null=True)),
+                ('humidity_min', models.FloatField(blank=True, null=True)),
+                ('humidity_max', models.FloatField(blank=True, null=True)),
+                ('humidity_sum', models.FloatField(blank=True, null=True)),
+                ('humidity_count', models.IntegerField(default=0)),
+                ('humidity_last', models.FloatField(blank=True, null=True)),
+                ('battery_bank_1_soc_min', models.FloatField(blank=True, null=True)),
+                ('battery_bank_1_soc_max', models.FloatField(blank=True, null=True)),
+                ('battery_bank_1_soc_sum', models.FloatField(blank=True, null=True)),
+                ('battery_bank_1_soc_count', models.IntegerField(default=0)),
+                ('battery_bank_1_soc_last', models.FloatField(blank=True, null=True)),
+                ('battery_bank_2_soc_min', models.FloatField(blank=True, null=True)),
+                ('battery_bank_2_soc_max', models.FloatField(blank=True, null=True)),
+                ('battery_bank_2_soc_sum', models.FloatField(blank=True, null=True)),
+                ('battery_bank_2_soc_count', models.IntegerField(default=0)),
+                ('battery_bank_2_soc_last', models.FloatField(blank=True, null=True)),
+                ('battery_bank_3_soc_min', models.FloatField(blank=True, null=True)),
+                ('battery_bank_3_soc_max', models.FloatField(blank=True, null=True)),
+                ('battery_bank_3_soc_sum', models.FloatField(blank=True, null=True)),
+                ('battery_bank_3_soc_count', models.IntegerField(default=0)),
+                ('battery_bank_3_soc_last', models.FloatField(blank=True, null=True)),
+                ('soc_avg_min', models.FloatField(blank=True, null=True)),
+                ('soc_avg_max', models.FloatField(blank=True, null=True)),
+                ('soc_avg_sum', models.FloatField(blank=True, null=True)),
+                ('soc_avg_count', models.IntegerField(default=0)),
+                ('soc_avg_last', models.FloatField(blank=True, null=True)),
+                ('site', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='monitor.site')),
+            ],
+            options={
+                'ordering': ['-bucket'],
+                'indexes': [models.Index(fields=['resolution', 'bucket'], name='monitor_rec_resolut_e2ccb3_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='rectifierrollup',
+            constraint=models.UniqueConstraint(fields=('site', 'resolution', 'bucket'), name='unique_rollup_bucket'),
+        ),
+    ]
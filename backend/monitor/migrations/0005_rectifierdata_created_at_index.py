@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0004_rectifierrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rectifierdata',
+            index=models.Index(fields=['created_at'], name='monitor_rec_created_981003_idx'),
+        ),
+    ]
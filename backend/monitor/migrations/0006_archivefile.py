@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0005_rectifierdata_created_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('path', models.CharField(max_length=500)),
+                ('start_ts', models.BigIntegerField()),
+                ('end_ts', models.BigIntegerField()),
+                ('row_count', models.IntegerField(default=0)),
+                ('size_bytes', models.BigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('site', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archive_files', to='monitor.site')),
+            ],
+            options={
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['site', 'start_ts', 'end_ts'], name='monitor_arc_site_id_4310f3_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='archivefile',
+            constraint=models.UniqueConstraint(fields=('site', 'day'), name='unique_archive_site_day'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:05
+
+from django.db import migrations, models
+
+DELETE_CHUNK = 10000
+
+
+def delete_duplicate_readings(apps, schema_editor):
+    """
+    Hapus baris RectifierData dengan (site, timestamp) dobel, simpan id terkecil
+    (yang pertama diterima). Setelah migrasi, jalankan rebuild_rollups agar
+    rollup tidak lagi menghitung duplikat.
+    """
+    RectifierData = apps.get_model('monitor', 'RectifierData')
+    SiteLatest = apps.get_model('monitor', 'SiteLatest')
+    qn = schema_editor.connection.ops.quote_name
+    table = qn(RectifierData._meta.db_table)
+    timestamp = qn('timestamp')
+
+    with schema_editor.connection.cursor() as cursor:
+        while True:
+            cursor.execute(
+                f'DELETE FROM {table} WHERE id IN ('
+                f'  SELECT d.id FROM {table} d JOIN ('
+                f'    SELECT site_id, {timestamp}, MIN(id) AS keep_id FROM {table}'
+                f'    GROUP BY site_id, {timestamp} HAVING COUNT(*) > 1'
+                f'  ) g ON d.site_id = g.site_id AND d.{timestamp} = g.{timestamp} AND d.id <> g.keep_id'
+                f'  LIMIT {DELETE_CHUNK}'
+                f')'
+            )
+            if cursor.rowcount < DELETE_CHUNK:
+                break
+
+    # reading_id snapshot bisa menunjuk baris yang baru dihapus
+    for snapshot in SiteLatest.objects.all():
+        keep_id = (
+            RectifierData.objects.filter(site_id=snapshot.site_id, timestamp=snapshot.timestamp)
+            .order_by('id').values_list('id', flat=True).first()
+        )
+        if keep_id is not None and keep_id != snapshot.reading_id:
+            SiteLatest.objects.filter(pk=snapshot.pk).update(reading_id=keep_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0006_archivefile'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_readings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='rectifierdata',
+            constraint=models.UniqueConstraint(fields=('site', 'timestamp'), name='unique_reading_site_timestamp'),
+        ),
+    ]
@@ -0,0 +1,125 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:07
+
+from django.db import migrations
+
+METADATA_FIELDS = ('site_name', 'project_id', 'ladder', 'sla', 'latitude', 'longitude')
+CHUNK_SIZE = 500
+
+
+def copy_metadata_to_site(apps, schema_editor):
+    """
+    Isi kolom Site yang masih kosong dari metadata snapshot SiteLatest
+    (= payload terbaru), per CHUNK_SIZE site. Nilai Site yang sudah diisi
+    (seed_sites / admin) tidak ditimpa. site_name dianggap kosong jika sama
+    dengan site_code (site dibuat otomatis oleh listener).
+    """
+    Site = apps.get_model('monitor', 'Site')
+    SiteLatest = apps.get_model('monitor', 'SiteLatest')
+
+    last_site_id = 0
+    while True:
+        chunk = list(
+            SiteLatest.objects.select_related('site')
+            .filter(site_id__gt=last_site_id)
+            .order_by('site_id')[:CHUNK_SIZE]
+        )
+        if not chunk:
+            break
+        last_site_id = chunk[-1].site_id
+
+        changed = []
+        for snapshot in chunk:
+            site = snapshot.site
+            updated = False
+            for name in METADATA_FIELDS:
+                value = getattr(snapshot, name)
+                current = getattr(site, name)
+                empty = not current or (name == 'site_name' and current == site.site_code)
+                if empty and value and value != current:
+                    setattr(site, name, value)
+                    updated = True
+            if updated:
+                changed.append(site)
+        if changed:
+            Site.objects.bulk_update(changed, METADATA_FIELDS)
+
+
+def copy_metadata_from_site(apps, schema_editor):
+    """
+    Reverse: kolom metadata RectifierData/SiteLatest sudah dibuat ulang
+    (RemoveField dibalik, isi default), back-fill dari Site. Nilai lama per
+    baris tidak tersimpan lagi, jadi semua baris 1 site mendapat nilai Site
+    saat ini (1 UPDATE per tabel per site).
+    """
+    Site = apps.get_model('monitor', 'Site')
+    models = [apps.get_model('monitor', 'RectifierData'), apps.get_model('monitor', 'SiteLatest')]
+
+    last_site_id = 0
+    while True:
+        chunk = list(Site.objects.filter(id__gt=last_site_id).order_by('id')[:CHUNK_SIZE])
+        if not chunk:
+            break
+        last_site_id = chunk[-1].id
+        for site in chunk:
+            values = {name: getattr(site, name) for name in METADATA_FIELDS}
+            for model in models:
+                model.objects.filter(site_id=site.id).update(**values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0007_rectifierdata_unique_site_timestamp'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_metadata_to_site, copy_metadata_from_site),
+        migrations.RemoveField(
+            model_name='rectifierdata',
+            name='ladder',
+        ),
+        migrations.RemoveField(
+            model_name='rectifierdata',
+            name='latitude',
+        ),
+        migrations.RemoveField(
+            model_name='rectifierdata',
+            name='longitude',
+        ),
+        migrations.RemoveField(
+            model_name='rectifierdata',
+            name='project_id',
+        ),
+        migrations.RemoveField(
+            model_name='rectifierdata',
+            name='site_name',
+        ),
+        migrations.RemoveField(
+            model_name='rectifierdata',
+            name='sla',
+        ),
+        migrations.RemoveField(
+            model_name='sitelatest',
+            name='ladder',
+        ),
+        migrations.RemoveField(
+            model_name='sitelatest',
+            name='latitude',
+        ),
+        migrations.RemoveField(
+            model_name='sitelatest',
+            name='longitude',
+        ),
+        migrations.RemoveField(
+            model_name='sitelatest',
+            name='project_id',
+        ),
+        migrations.RemoveField(
+            model_name='sitelatest',
+            name='site_name',
+        ),
+        migrations.RemoveField(
+            model_name='sitelatest',
+            name='sla',
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_current_states(apps, schema_editor):
+    """
+    State awal dari modules_status snapshot SiteLatest (since = timestamp
+    snapshot, karena riwayat sebelumnya tidak direkonstruksi)
+    """
+    SiteLatest = apps.get_model('monitor', 'SiteLatest')
+    ModuleState = apps.get_model('monitor', 'ModuleState')
+
+    states = []
+    for site_id, timestamp, modules in (
+        SiteLatest.objects.values_list('site_id', 'timestamp', 'modules_status').iterator()
+    ):
+        for module in modules or ():
+            if not isinstance(module, dict) or module.get('id') is None:
+                continue
+            states.append(ModuleState(
+                site_id=site_id,
+                module_id=str(module['id'])[:50],
+                status=str(module.get('status', ''))[:50],
+                value=str(module.get('value') or '')[:100],
+                since=timestamp,
+            ))
+    ModuleState.objects.bulk_create(states, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0008_move_site_metadata_to_site'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModuleState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('module_id', models.CharField(max_length=50)),
+                ('status', models.CharField(max_length=50)),
+                ('value', models.CharField(blank=True, default='', max_length=100)),
+                ('since', models.BigIntegerField()),
+                ('until', models.BigIntegerField(blank=True, null=True)),
+                ('site', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='module_states', to='monitor.site')),
+            ],
+            options={
+                'ordering': ['-since'],
+                'indexes': [models.Index(condition=models.Q(('until__isnull', True)), fields=['status', '-since'], name='module_state_current_idx'), models.Index(fields=['site', 'module_id', '-since'], name='monitor_mod_site_id_2e8261_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='modulestate',
+            constraint=models.UniqueConstraint(condition=models.Q(('until__isnull', True)), fields=('site', 'module_id'), name='unique_open_module_state'),
+        ),
+        migrations.RunPython(backfill_current_states, migrations.RunPython.noop),
+    ]
@@ -39,35 +39,38 @@ class Site(models.Model):
         """Get latest rectifier data for this site"""
         return self.rectifier_data.first()
     
+    def get_latest_snapshot(self):
+        """Get snapshot SiteLatest (None jika site belum pernah kirim data)"""
+        try:
+            return self.latest
+        except SiteLatest.DoesNotExist:
+            return None
+    
     def get_status(self):
         """Get current status based on latest data"""
-        latest = self.get_latest_data()
+        latest = self.get_latest_snapshot()
         if not latest:
             return 'Unknown'
         return latest.status_realtime
 
 
-class RectifierData(models.Model):
-    """Data rectifier per site"""
-    site = models.ForeignKey(
-        Site, 
-        on_delete=models.CASCADE, 
-        related_name='rectifier_data'
-    )
-    timestamp = models.BigIntegerField(db_index=True)
+# Metadata site yang juga dikirim di payload MQTT. Dulu disalin ke setiap
+# baris telemetri; sekarang hanya di Site, mengikuti payload terbaru
+# (SiteCache.resolve). Output API tetap sama lewat serializer source='site.*'.
+SITE_METADATA_FIELDS = ('site_name', 'project_id', 'ladder', 'sla', 'latitude', 'longitude')
+
+
+class TelemetryFields(models.Model):
+    """
+    Kolom telemetri rectifier, dipakai bersama oleh RectifierData dan SiteLatest.
+    Metadata site (site_name, project_id, ladder, sla, latitude, longitude)
+    hanya disimpan di Site (lihat SITE_METADATA_FIELDS).
+    """
     
-    # Site Info (denormalized untuk query cepat)
-    site_name = models.CharField(max_length=255, default='')
-    project_id = models.CharField(max_length=255, default='')
-    ladder = models.CharField(max_length=100, default='')
-    sla = models.CharField(max_length=100, default='')
+    # Status
     status_realtime = models.CharField(max_length=50, default='Normal', db_index=True)
     status_ladder = models.CharField(max_length=50, default='Normal')
     
-    # Location (denormalized)
-    latitude = models.FloatField(null=True, blank=True)
-    longitude = models.FloatField(null=True, blank=True)
-    
     # Environment Status
     door_cabinet = models.CharField(max_length=20, default='Close')
     battery_stolen = models.CharField(max_length=20, default='Close')
@@ -116,16 +119,201 @@ class RectifierData(models.Model):
     
     # Module Status
     modules_status = models.JSONField(default=list, blank=True)
-    
+
+    class Meta:
+        abstract = True
+
+
+class RectifierData(TelemetryFields):
+    """Data rectifier per site"""
+    site = models.ForeignKey(
+        Site, 
+        on_delete=models.CASCADE, 
+        related_name='rectifier_data'
+    )
+    timestamp = models.BigIntegerField(db_index=True)
     created_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
         ordering = ['-timestamp']
+        constraints = [
+            # 1 reading per site per timestamp (redelivery QoS1 dibuang, lihat monitor/dedup.py)
+            models.UniqueConstraint(fields=['site', 'timestamp'], name='unique_reading_site_timestamp'),
+        ]
         indexes = [
             models.Index(fields=['site', '-timestamp']),
             models.Index(fields=['-timestamp']),
             models.Index(fields=['status_realtime']),
+            # Dipakai cleanup_old_data (batch delete) di mode non-partitioned
+            models.Index(fields=['created_at']),
         ]
     
     def __str__(self):
         return f"{self.site.site_code} - {self.timestamp}"
+
+
+class SiteLatest(TelemetryFields):
+    """
+    Snapshot data terbaru per site (1 row per site).
+
+    Di-upsert oleh MQTT listener setiap flush, hanya jika timestamp baru lebih
+    besar dari yang tersimpan. Endpoint list/dashboard/latest membaca tabel ini
+    dengan 1 join, sehingga biayanya tidak bergantung pada ukuran RectifierData.
+    """
+    site = models.OneToOneField(
+        Site,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='latest'
+    )
+    timestamp = models.BigIntegerField()
+    reading_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'site latest data'
+        verbose_name_plural = 'site latest data'
+
+    def __str__(self):
+        return f"{self.site.site_code} latest - {self.timestamp}"
+
+
+# Field numerik yang di-rollup dan resolusi bucket (ms)
+ROLLUP_FIELDS = [
+    'vdc_output', 'load_current', 'load_power', 'rectifier_current',
+    'total_power', 'battery_current', 'temperature', 'humidity',
+    'battery_bank_1_soc', 'battery_bank_2_soc', 'battery_bank_3_soc',
+    'soc_avg',
+]
+ROLLUP_AGGREGATES = ['min', 'max', 'sum', 'count', 'last']
+ROLLUP_RESOLUTIONS = {
+    '1m': 60 * 1000,
+    '15m': 15 * 60 * 1000,
+    '1h': 60 * 60 * 1000,
+}
+
+
+class RectifierRollup(models.Model):
+    """
+    Agregat time-bucket per site (1 menit / 15 menit / 1 jam).
+
+    Untuk setiap field di ROLLUP_FIELDS disimpan kolom {field}_min, _max,
+    _sum, _count dan _last; avg = sum / count. Dibangun incremental oleh
+    IngestPipeline (monitor/rollups.py) dan tidak ikut dihapus oleh
+    cleanup_old_data bersama data mentah.
+    """
+    site = models.ForeignKey(
+        Site,
+        on_delete=models.CASCADE,
+        related_name='rollups'
+    )
+    resolution = models.CharField(
+        max_length=4,
+        choices=[(name, name) for name in ROLLUP_RESOLUTIONS]
+    )
+    bucket = models.BigIntegerField()
+    sample_count = models.IntegerField(default=0)
+    last_timestamp = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-bucket']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['site', 'resolution', 'bucket'],
+                name='unique_rollup_bucket',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['resolution', 'bucket']),
+        ]
+
+    def __str__(self):
+        return f"{self.site.site_code} {self.resolution} - {self.bucket}"
+
+
+for _field in ROLLUP_FIELDS:
+    for _agg in ROLLUP_AGGREGATES:
+        RectifierRollup.add_to_class(
+            f'{_field}_{_agg}',
+            models.IntegerField(default=0) if _agg == 'count'
+            else models.FloatField(null=True, blank=True)
+        )
+del _field, _agg
+
+
+class ArchiveFile(models.Model):
+    """
+    Index file arsip columnar (Parquet) RectifierData: 1 file per site per hari.
+    Ditulis oleh `archive_old_data` sebelum cleanup_old_data menghapus data.
+    """
+    site = models.ForeignKey(
+        Site,
+        on_delete=models.CASCADE,
+        related_name='archive_files'
+    )
+    day = models.DateField()
+    path = models.CharField(max_length=500)
+    start_ts = models.BigIntegerField()
+    end_ts = models.BigIntegerField()
+    row_count = models.IntegerField(default=0)
+    size_bytes = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(fields=['site', 'day'], name='unique_archive_site_day'),
+        ]
+        indexes = [
+            models.Index(fields=['site', 'start_ts', 'end_ts']),
+        ]
+
+    def __str__(self):
+        return f"{self.site.site_code} {self.day} ({self.row_count} rows)"
+
+
+# Status modul yang dianggap fault oleh endpoint /api/modules/faults/
+MODULE_FAULT_STATUSES = ('Fault', 'Protect')
+
+
+class ModuleState(models.Model):
+    """
+    Time series status modul rectifier, hanya transisi: 1 row per periode
+    (site, module_id, status). until=None = status saat ini.
+
+    Ditulis oleh IngestPipeline (monitor/module_states.py) dari
+    modules_status payload; modules_status di RectifierData tetap disimpan
+    untuk dashboard. Partial index (until IS NULL) membuat query fleet-wide
+    "modul mana yang sedang Fault" tidak perlu scan tabel telemetri.
+    """
+    site = models.ForeignKey(
+        Site,
+        on_delete=models.CASCADE,
+        related_name='module_states'
+    )
+    module_id = models.CharField(max_length=50)
+    status = models.CharField(max_length=50)
+    value = models.CharField(max_length=100, blank=True, default='')
+    since = models.BigIntegerField()
+    until = models.BigIntegerField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-since']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['site', 'module_id'],
+                condition=models.Q(until__isnull=True),
+                name='unique_open_module_state',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['status', '-since'],
+                condition=models.Q(until__isnull=True),
+                name='module_state_current_idx',
+            ),
+            models.Index(fields=['site', 'module_id', '-since']),
+        ]
+
+    def __str__(self):
+        return f"{self.site.site_code} module {self.module_id} {self.status} since {self.since}"
@@ -0,0 +1,80 @@
+"""
+Maintain tabel ModuleState (transisi status modul) saat ingest.
+
+apply_modules() dipanggil oleh IngestPipeline di transaksi flush yang sama
+dengan SiteLatest/rollup, SEBELUM upsert_latest (timestamp SiteLatest dipakai
+untuk mengenali sample terlambat). Per batch:
+  1 SELECT state terbuka (until IS NULL) untuk site di batch
+  1 SELECT timestamp SiteLatest
+  bulk_update state yang ditutup + bulk_create state baru
+
+Hanya perubahan status yang ditulis; sample dengan status yang sama tidak
+menyentuh DB. Sample terlambat dan payload tanpa modules_status diabaikan.
+Modul yang hilang dari payload ditutup (until = timestamp sample).
+"""
+
+from .models import ModuleState, SiteLatest
+
+
+def _modules_of(row):
+    """modules_status payload -> {module_id: (status, value)} (entri rusak dilewati)"""
+    modules = {}
+    for module in row.modules_status or ():
+        if not isinstance(module, dict) or module.get('id') is None:
+            continue
+        modules[str(module['id'])[:50]] = (
+            str(module.get('status', ''))[:50],
+            str(module.get('value') or '')[:100],
+        )
+    return modules
+
+
+def apply_modules(rows):
+    """Catat transisi status modul dari list RectifierData. Return jumlah state baru."""
+    rows = [row for row in rows if row.modules_status]
+    if not rows:
+        return 0
+
+    site_ids = {row.site_id for row in rows}
+    current = {site_id: {} for site_id in site_ids}
+    for state in ModuleState.objects.filter(site_id__in=site_ids, until__isnull=True):
+        current[state.site_id][state.module_id] = state
+    newest = dict(
+        SiteLatest.objects.filter(site_id__in=site_ids).values_list('site_id', 'timestamp')
+    )
+
+    closed = {}
+    created = []
+    for row in sorted(rows, key=lambda item: item.timestamp):
+        if row.timestamp < newest.get(row.site_id, row.timestamp):
+            continue
+        modules = _modules_of(row)
+        states = current[row.site_id]
+
+        # Modul yang tidak ada lagi di payload
+        for module_id in [m for m in states if m not in modules]:
+            state = states.pop(module_id)
+            state.until = max(row.timestamp, state.since)
+            closed[id(state)] = state
+
+        for module_id, (status, value) in modules.items():
+            state = states.get(module_id)
+            if state is not None:
+                if state.status == status:
+                    continue
+                state.until = max(row.timestamp, state.since)
+                closed[id(state)] = state
+            state = ModuleState(
+                site_id=row.site_id, module_id=module_id,
+                status=status, value=value, since=row.timestamp,
+            )
+            states[module_id] = state
+            created.append(state)
+
+    # State yang dibuat dan ditutup di batch yang sama langsung ditulis lengkap
+    to_update = [state for state in closed.values() if state.pk is not None]
+    if to_update:
+        ModuleState.objects.bulk_update(to_update, ['until'])
+    if created:
+        ModuleState.objects.bulk_create(created)
+    return len(created)
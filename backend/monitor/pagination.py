@@ -0,0 +1,114 @@
+"""
+Keyset (cursor) pagination untuk RectifierData.
+
+Berbeda dengan PageNumberPagination, tidak ada COUNT(*) dan tidak ada OFFSET:
+halaman berikutnya diambil dengan kondisi
+    timestamp <= ts AND NOT (timestamp = ts AND id >= id_terakhir)
+yang memakai index (site, -timestamp) / (-timestamp) langsung, sehingga biaya
+per halaman konstan berapapun besar tabelnya.
+
+Queryset yang dipaginasi harus berupa values_list dengan 2 kolom terakhir
+= key_lookups (timestamp, id); lihat RectifierDataProjection.values().
+
+Perubahan response untuk consumer lama: 'count' tidak ada lagi dan
+'previous' selalu null (cursor hanya maju). Consumer yang masih butuh
+keduanya bisa mengirim ?page=N: halaman itu dilayani PageNumberPagination
+seperti sebelumnya ({count, next, previous, results}, dengan COUNT(*) +
+OFFSET, jadi makin lambat di halaman dalam / tabel besar).
+"""
+
+import base64
+import binascii
+from collections import OrderedDict
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class LegacyPageNumberPagination(PageNumberPagination):
+    """?page=N untuk consumer lama yang membaca 'count' / 'previous'"""
+    page_size_query_param = 'limit'
+    max_page_size = 1000
+
+
+class TimestampCursorPagination(BasePagination):
+    """Urut terbaru dulu; ?cursor= dari field 'next', ?limit= ukuran halaman (?page= -> page number)"""
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'limit'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    legacy_query_param = 'page'
+    key_lookups = ('timestamp', 'id')
+    ordering = ('-timestamp', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.next_key = None
+
+        queryset = queryset.order_by(*self.ordering)
+        self.legacy = None
+        if self.legacy_query_param in request.query_params:
+            self.legacy = LegacyPageNumberPagination()
+            return self.legacy.paginate_queryset(queryset, request, view)
+
+        key = self.decode_cursor(request)
+        if key is not None:
+            timestamp, pk = key
+            queryset = queryset.filter(timestamp__lte=timestamp).exclude(timestamp=timestamp, id__gte=pk)
+
+        rows = list(queryset[:self.page_size + 1])
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            self.next_key = tuple(rows[-1][-2:])
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', None),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_next_link(self):
+        if self.next_key is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_key))
+
+    def encode_cursor(self, key):
+        return base64.urlsafe_b64encode(f'{key[0]}:{key[1]}'.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)).decode()
+            timestamp, pk = raw.split(':')
+            return int(timestamp), int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
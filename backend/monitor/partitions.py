@@ -0,0 +1,258 @@
+"""
+Range partitioning RectifierData per hari (PostgreSQL saja, opsional).
+
+Mode ini diaktifkan sekali dengan `python manage.py manage_partitions --convert`.
+Setelah itu:
+  - tabel monitor_rectifierdata menjadi PARTITION BY RANGE ("timestamp"),
+    1 partisi per hari UTC: monitor_rectifierdata_pYYYYMMDD
+  - partisi ke depan dibuat oleh `manage_partitions --ahead N`
+  - cleanup_old_data cukup DETACH + DROP partisi lama (O(1), tanpa DELETE
+    per baris, tanpa bloat/WAL besar)
+
+Di SQLite (atau Postgres yang belum dikonversi) semua fungsi di sini no-op
+dan cleanup_old_data tetap memakai batch delete.
+"""
+
+import logging
+import re
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import connection, transaction
+
+from .models import RectifierData
+
+logger = logging.getLogger(__name__)
+
+DAY_MS = 24 * 60 * 60 * 1000
+PARENT = RectifierData._meta.db_table
+_PARTITION_RE = re.compile(rf'^{PARENT}_p(\d{{8}})$')
+_INDEX_RE = re.compile(r'^CREATE (UNIQUE )?INDEX (\S+) ON \S+ (USING .+)$')
+
+
+def _qn(name):
+    return connection.ops.quote_name(name)
+
+
+def day_start_ms(day):
+    return int(datetime(day.year, day.month, day.day, tzinfo=dt_timezone.utc).timestamp() * 1000)
+
+
+def day_of(timestamp_ms):
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=dt_timezone.utc).date()
+
+
+def partition_name(day):
+    return f'{PARENT}_p{day:%Y%m%d}'
+
+
+def is_partitioned():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = %s AND pg_table_is_visible(c.oid)
+            """,
+            [PARENT],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions():
+    """Return [(day, nama_partisi)] urut dari yang paling lama"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class child ON child.oid = i.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [PARENT],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = _PARTITION_RE.match(name)
+        if match:
+            partitions.append((datetime.strptime(match.group(1), '%Y%m%d').date(), name))
+    return sorted(partitions)
+
+
+def create_partition(day):
+    start = day_start_ms(day)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {_qn(partition_name(day))} '
+            f'PARTITION OF {_qn(PARENT)} FOR VALUES FROM ({start}) TO ({start + DAY_MS})'
+        )
+
+
+def ensure_partitions(days_ahead=7, days_back=0):
+    """Pastikan partisi hari ini - days_back s/d hari ini + days_ahead ada"""
+    if not is_partitioned():
+        return []
+    today = datetime.now(dt_timezone.utc).date()
+    existing = {day for day, _ in list_partitions()}
+    created = []
+    for offset in range(-days_back, days_ahead + 1):
+        day = today + timedelta(days=offset)
+        if day not in existing:
+            create_partition(day)
+            created.append(partition_name(day))
+    return created
+
+
+def drop_partitions_before(cutoff_ms, dry_run=False):
+    """
+    DETACH + DROP partisi yang seluruh isinya lebih lama dari cutoff_ms.
+    Return [(nama_partisi, jumlah_baris_estimasi)].
+    """
+    dropped = []
+    for day, name in list_partitions():
+        if day_start_ms(day) + DAY_MS > cutoff_ms:
+            break
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [name])
+            estimate = max(cursor.fetchone()[0], 0)
+            if not dry_run:
+                with transaction.atomic():
+                    cursor.execute(f'ALTER TABLE {_qn(PARENT)} DETACH PARTITION {_qn(name)}')
+                    cursor.execute(f'DROP TABLE {_qn(name)}')
+        dropped.append((name, estimate))
+    return dropped
+
+
+def convert_to_partitioned(days_ahead=7, days_back=31, copy_data=True):
+    """
+    Konversi 1x tabel biasa -> partitioned table. Rename + CREATE memegang
+    ACCESS EXCLUSIVE lock pada tabel: hentikan listener selama konversi, atau
+    jalankan dengan INGEST_SPOOL_DIR agar flush yang gagal di-spool dan
+    diputar ulang setelahnya (monitor/spool.py). Data lama disalin per hari
+    oleh copy_legacy() setelah tabel baru sudah bisa ditulis.
+
+    Primary key menjadi (id, timestamp) karena Postgres mewajibkan partition key
+    ada di setiap unique constraint; kolom id tetap diisi dari sequence.
+    Baris yang lebih lama dari days_back hari (atau timestamp aneh) masuk ke
+    partisi DEFAULT.
+    """
+    if connection.vendor != 'postgresql':
+        raise RuntimeError('Partitioning hanya didukung di PostgreSQL')
+    if is_partitioned():
+        if copy_data and legacy_exists():
+            copy_legacy()   # lanjutkan salinan yang sebelumnya terputus
+        return False
+
+    legacy = f'{PARENT}_legacy'
+    sequence = f'{PARENT}_part_id_seq'
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {_qn(PARENT)} RENAME TO {_qn(legacy)}')
+        cursor.execute(
+            f'CREATE TABLE {_qn(PARENT)} (LIKE {_qn(legacy)} INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE ("timestamp")'
+        )
+        cursor.execute(f'CREATE SEQUENCE {_qn(sequence)} OWNED BY {_qn(PARENT)}."id"')
+        cursor.execute(
+            f"SELECT setval('{sequence}', COALESCE((SELECT MAX(id) FROM {_qn(legacy)}), 0) + 1, false)"
+        )
+        cursor.execute(
+            f"ALTER TABLE {_qn(PARENT)} ALTER COLUMN \"id\" SET DEFAULT nextval('{sequence}')"
+        )
+        cursor.execute(f'ALTER TABLE {_qn(PARENT)} ADD PRIMARY KEY ("id", "timestamp")')
+        cursor.execute(
+            f'ALTER TABLE {_qn(PARENT)} ADD CONSTRAINT {_qn(PARENT + "_site_fk")} '
+            f'FOREIGN KEY ("site_id") REFERENCES {_qn("monitor_site")} ("id") '
+            f'DEFERRABLE INITIALLY DEFERRED'
+        )
+
+        # Index dari Meta.indexes + db_index dibuat ulang di parent (otomatis
+        # ikut ke semua partisi); index lama di-rename agar namanya bebas.
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname NOT LIKE %s",
+            [legacy, '%_pkey'],
+        )
+        for (index_def,) in cursor.fetchall():
+            match = _INDEX_RE.match(index_def)
+            if match is None:
+                logger.warning(f"Skip index yang tidak dikenali: {index_def}")
+                continue
+            unique, name, method = match.groups()
+            cursor.execute(f'ALTER INDEX {name} RENAME TO {_qn(name.strip(chr(34)) + "_legacy")}')
+            cursor.execute(f'CREATE {unique or ""}INDEX {name} ON {_qn(PARENT)} {method}')
+
+        cursor.execute(
+            f'CREATE TABLE {_qn(PARENT + "_default")} PARTITION OF {_qn(PARENT)} DEFAULT'
+        )
+
+        cursor.execute(f'SELECT MIN("timestamp"), MAX("timestamp") FROM {_qn(legacy)}')
+        oldest, newest = cursor.fetchone()
+
+    today = datetime.now(dt_timezone.utc).date()
+    first_day = max(day_of(oldest) if oldest is not None else today, today - timedelta(days=days_back))
+    last_day = max(day_of(newest) if newest is not None else today, today)
+    day = first_day
+    while day <= last_day + timedelta(days=days_ahead):
+        create_partition(day)
+        day += timedelta(days=1)
+
+    if copy_data:
+        copy_legacy()
+    return True
+
+
+def legacy_exists():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [_qn(PARENT + '_legacy')])
+        return cursor.fetchone()[0]
+
+
+def copy_legacy():
+    """
+    Salin tabel _legacy ke partitioned table per hari UTC (1 transaksi per
+    hari, bukan 1 INSERT ... SELECT untuk seluruh tabel): lock dan WAL per
+    transaksi terbatas, dan jika terputus cukup jalankan
+    `manage_partitions --convert` lagi (ON CONFLICT DO NOTHING, baris yang
+    sudah tersalin dilewati). Hari tanpa data dilompati. Tabel _legacy
+    di-DROP setelah semua hari tersalin. Return jumlah baris tersalin.
+    """
+    legacy = _qn(PARENT + '_legacy')
+    copied = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT MIN("timestamp") FROM {legacy}')
+        next_ts = cursor.fetchone()[0]
+        while next_ts is not None:
+            start = day_start_ms(day_of(next_ts))
+            with transaction.atomic():
+                cursor.execute(
+                    f'INSERT INTO {_qn(PARENT)} SELECT * FROM {legacy} '
+                    f'WHERE "timestamp" >= %s AND "timestamp" < %s ON CONFLICT DO NOTHING',
+                    [start, start + DAY_MS],
+                )
+            copied += cursor.rowcount
+            logger.info(f"✓ {day_of(next_ts)}: {cursor.rowcount} rows copied")
+            cursor.execute(f'SELECT MIN("timestamp") FROM {legacy} WHERE "timestamp" >= %s', [start + DAY_MS])
+            next_ts = cursor.fetchone()[0]
+        cursor.execute(f'DROP TABLE {legacy}')
+    return copied
+
+
+def delete_default_before(cutoff_ms):
+    """Hapus baris lama yang jatuh ke partisi DEFAULT (biasanya kosong)"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {_qn(PARENT + "_default")} WHERE "timestamp" < %s', [cutoff_ms]
+        )
+        return cursor.rowcount
+
+
+def partition_stats():
+    """[(nama, dari_hari, estimasi_baris)] untuk --status"""
+    stats = []
+    for day, name in list_partitions():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [name])
+            stats.append((name, day, max(cursor.fetchone()[0], 0)))
+    return stats
@@ -0,0 +1,104 @@
+"""
+COPY ... FROM STDIN untuk RectifierData (PostgreSQL + psycopg 3).
+
+Dipakai oleh IngestPipeline (copy_rows, koneksi Django) dan
+mqtt_listener_async.py (copy_rows_async, pool psycopg async). Di SQLite atau
+driver psycopg2 IngestPipeline tetap memakai bulk_create (lihat copy_enabled).
+
+COPY tidak mengembalikan id, padahal SiteLatest.reading_id butuh id baris.
+Karena itu id dialokasikan dulu dari sequence tabel:
+
+    SELECT nextval(pg_get_serial_sequence('monitor_rectifierdata', 'id'))
+    FROM generate_series(1, n)
+
+lalu ikut ditulis sebagai kolom biasa. created_at (auto_now_add) juga diisi
+di sini karena COPY tidak menjalankan pre_save model.
+"""
+
+import json
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import RectifierData
+
+TABLE = RectifierData._meta.db_table
+COPY_FIELDS = RectifierData._meta.concrete_fields
+_JSON_COLUMNS = {
+    index for index, field in enumerate(COPY_FIELDS)
+    if field.get_internal_type() == 'JSONField'
+}
+
+ALLOCATE_IDS_SQL = (
+    "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)"
+)
+
+
+def copy_available():
+    """COPY butuh PostgreSQL dengan driver psycopg 3 (Django otomatis memakainya jika terinstall)"""
+    if connection.vendor != 'postgresql':
+        return False
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+    return is_psycopg3
+
+
+def copy_enabled():
+    """INGEST_WRITER: auto (COPY jika tersedia) | copy | orm"""
+    if settings.INGEST_WRITER == 'orm':
+        return False
+    available = copy_available()
+    if settings.INGEST_WRITER == 'copy' and not available:
+        raise RuntimeError('INGEST_WRITER=copy butuh PostgreSQL + psycopg 3')
+    return available
+
+
+def copy_sql():
+    columns = ', '.join(f'"{field.column}"' for field in COPY_FIELDS)
+    return f'COPY "{TABLE}" ({columns}) FROM STDIN'
+
+
+def prepare_rows(rows, ids):
+    """Isi id + created_at ke instance RectifierData, return tuple per baris untuk COPY"""
+    now = timezone.now()
+    records = []
+    for row, pk in zip(rows, ids):
+        row.pk = pk
+        row.created_at = now
+        values = [getattr(row, field.attname) for field in COPY_FIELDS]
+        for index in _JSON_COLUMNS:
+            values[index] = json.dumps(values[index])
+        records.append(values)
+    return records
+
+
+def copy_rows(rows):
+    """
+    Tulis list RectifierData (belum tersimpan) lewat COPY di koneksi Django
+    (di dalam transaksi pemanggil). Return jumlah baris.
+    """
+    if not rows:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(ALLOCATE_IDS_SQL, [TABLE, len(rows)])
+        ids = [record[0] for record in cursor.fetchall()]
+        with cursor.cursor.copy(copy_sql()) as copy:
+            for values in prepare_rows(rows, ids):
+                copy.write_row(values)
+    return len(rows)
+
+
+async def copy_rows_async(conn, rows):
+    """
+    Tulis list RectifierData (belum tersimpan) lewat COPY di connection psycopg
+    async (di dalam transaksi pemanggil). Return jumlah baris.
+    """
+    if not rows:
+        return 0
+    async with conn.cursor() as cursor:
+        await cursor.execute(ALLOCATE_IDS_SQL, (TABLE, len(rows)))
+        ids = [record[0] for record in await cursor.fetchall()]
+        async with cursor.copy(copy_sql()) as copy:
+            for values in prepare_rows(rows, ids):
+                await copy.write_row(values)
+    return len(rows)
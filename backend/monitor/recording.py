@@ -0,0 +1,122 @@
+"""
+Rekaman pesan MQTT mentah (topic, payload, waktu tiba) untuk replay/benchmark.
+
+Format file (append-only, little-endian):
+
+    header : MAGIC (8 byte)
+    frame  : arrival_us (int64) | len topic (uint16) | len payload (uint32)
+             | topic (utf-8) | payload (bytes apa adanya)
+
+Overhead 14 byte per pesan, tanpa encode ulang payload. Frame terakhir yang
+terpotong (listener mati saat menulis) diabaikan oleh read_frames(), dan
+RecordWriter memotongnya saat file dibuka lagi untuk append.
+
+Direkam oleh: python mqtt_listener_multisite.py --record capture.rec
+Diputar oleh: python manage.py replay_mqtt capture.rec --speed 10
+Dipakai juga untuk segment spool listener saat DB tidak tersedia (monitor/spool.py).
+"""
+
+import logging
+import os
+import struct
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'RECMQTT1'
+FRAME = struct.Struct('<qHI')
+
+
+class RecordFormatError(Exception):
+    """File bukan rekaman MQTT (MAGIC tidak cocok)"""
+
+
+def _scan(handle):
+    """Generator (offset frame, arrival_us, topic, payload) dari posisi sekarang"""
+    while True:
+        offset = handle.tell()
+        head = handle.read(FRAME.size)
+        if len(head) < FRAME.size:
+            if head:
+                logger.warning(f"Truncated frame header at offset {offset}, ignored")
+            return
+        arrival_us, topic_len, payload_len = FRAME.unpack(head)
+        body = handle.read(topic_len + payload_len)
+        if len(body) < topic_len + payload_len:
+            logger.warning(f"Truncated frame at offset {offset}, ignored")
+            return
+        yield offset, arrival_us, body[:topic_len].decode(), body[topic_len:]
+
+
+def _check_magic(handle, path):
+    if handle.read(len(MAGIC)) != MAGIC:
+        raise RecordFormatError(f"{path} is not an MQTT recording")
+
+
+def read_frames(path):
+    """Generator (arrival_us, topic, payload) sesuai urutan direkam"""
+    with open(path, 'rb') as handle:
+        _check_magic(handle, path)
+        for _, arrival_us, topic, payload in _scan(handle):
+            yield arrival_us, topic, payload
+
+
+class RecordWriter:
+    """
+    Append frame ke file rekaman. Aman dipanggil dari thread paho; buffer
+    di-flush ke OS setiap flush_interval detik dan saat close().
+    """
+
+    def __init__(self, path, flush_interval=1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.frames = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._handle = self._open(path)
+        self._next_flush = time.monotonic() + flush_interval
+
+    @staticmethod
+    def _open(path):
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            handle = open(path, 'wb')
+            handle.write(MAGIC)
+            return handle
+        handle = open(path, 'r+b')
+        _check_magic(handle, path)
+        end = len(MAGIC)
+        for offset, _, topic, payload in _scan(handle):
+            end = offset + FRAME.size + len(topic.encode()) + len(payload)
+        handle.truncate(end)
+        handle.seek(end)
+        return handle
+
+    def write(self, topic, payload, arrival_us=None):
+        if arrival_us is None:
+            arrival_us = time.time_ns() // 1000
+        topic_bytes = topic.encode()
+        frame = FRAME.pack(arrival_us, len(topic_bytes), len(payload)) + topic_bytes + payload
+        with self._lock:
+            self._handle.write(frame)
+            self.frames += 1
+            self.bytes += len(frame)
+            now = time.monotonic()
+            if now >= self._next_flush:
+                self._handle.flush()
+                self._next_flush = now + self.flush_interval
+
+    def flush(self):
+        with self._lock:
+            self._handle.flush()
+
+    def sync(self):
+        """flush + fsync: frame yang sudah ditulis tahan crash / mati listrik"""
+        with self._lock:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+
+    def close(self):
+        with self._lock:
+            if not self._handle.closed:
+                self._handle.close()
@@ -0,0 +1,121 @@
+"""
+Renderer columnar untuk endpoint time-series (history).
+
+Dipilih lewat ?format= (URL_FORMAT_OVERRIDE bawaan DRF) atau header Accept:
+- ?format=columnar : JSON {"ts": [...], "vdc_output": [...], ...}
+- ?format=packed   : binary, kolom numerik sebagai buffer little-endian
+                     float32 / int64 (lihat PackedColumnarRenderer)
+- ?format=msgpack  : MessagePack dari dict columnar (jika msgpack terinstall)
+
+View harus sudah mengirim data dalam bentuk columnar (dict of lists);
+lihat RectifierDataProjection.columns() dan rows_to_columns().
+"""
+
+import json
+import math
+import struct
+import sys
+from array import array
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import msgpack
+except ImportError:  # msgpack optional
+    msgpack = None
+
+COLUMNAR_FORMATS = ('columnar', 'packed', 'msgpack')
+
+# Kolom integer (lainnya yang numerik dianggap float32)
+INT64_COLUMNS = {'ts', 'id', 'site', 'sample_count', 'last_timestamp',
+                 'backup_duration', 'time_remaining'}
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    format = 'columnar'
+
+
+class PackedColumnarRenderer(BaseRenderer):
+    """
+    Layout:
+        b'RCOL' | uint32 LE panjang header | header JSON (UTF-8, padding ke 8 byte)
+        | buffer kolom...
+
+    header = {"rows": n, "columns": [{"name", "dtype", "offset", "length"}],
+              "json": {nama_kolom: [...]}}
+
+    dtype 'int64' / 'float32' (None -> NaN untuk float; int None -> 0 dan
+    kolom diberi "nulls": [index]). Kolom non-numerik (string, JSON) ikut di
+    header["json"]. offset dihitung dari awal buffer kolom; setiap buffer
+    di-padding ke 8 byte sehingga offset absolut juga kelipatan 8 dan bisa
+    langsung dipakai sebagai view, mis. new BigInt64Array(buf, base + offset, rows).
+    """
+    media_type = 'application/octet-stream'
+    format = 'packed'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, dict) or 'ts' not in data:
+            # Error response (mis. ValidationError) tetap dikirim sebagai JSON
+            return json.dumps(data).encode()
+
+        rows = len(data['ts'])
+        columns = []
+        text_columns = {}
+        buffers = []
+        offset = 0
+        for name, values in data.items():
+            kind = _column_kind(name, values)
+            if kind is None:
+                text_columns[name] = values
+                continue
+
+            meta = {'name': name, 'dtype': kind}
+            if kind == 'int64':
+                nulls = [i for i, v in enumerate(values) if v is None]
+                if nulls:
+                    meta['nulls'] = nulls
+                buffer = array('q', (0 if v is None else int(v) for v in values))
+            else:
+                buffer = array('f', (math.nan if v is None else v for v in values))
+            if sys.byteorder == 'big':
+                buffer.byteswap()
+
+            raw = buffer.tobytes()
+            meta.update(offset=offset, length=len(raw))
+            columns.append(meta)
+            # float32 dengan jumlah baris ganjil: kolom berikutnya tetap rata 8 byte
+            raw += b'\0' * (-len(raw) % 8)
+            buffers.append(raw)
+            offset += len(raw)
+
+        header = json.dumps({'rows': rows, 'columns': columns, 'json': text_columns}).encode()
+        header += b' ' * (-len(header) % 8)
+        return b'RCOL' + struct.pack('<I', len(header)) + header + b''.join(buffers)
+
+
+def _column_kind(name, values):
+    if name in INT64_COLUMNS:
+        return 'int64'
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+    return 'float32'
+
+
+if msgpack is not None:
+    class MessagePackRenderer(BaseRenderer):
+        media_type = 'application/msgpack'
+        format = 'msgpack'
+        charset = None
+        render_style = 'binary'
+
+        def render(self, data, accepted_media_type=None, renderer_context=None):
+            return msgpack.packb(data, use_bin_type=True)
+
+    COLUMNAR_RENDERERS = [ColumnarJSONRenderer, PackedColumnarRenderer, MessagePackRenderer]
+else:
+    COLUMNAR_RENDERERS = [ColumnarJSONRenderer, PackedColumnarRenderer]
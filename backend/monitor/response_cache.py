@@ -0,0 +1,231 @@
+"""
+Cache response per site untuk SiteViewSet (list, dashboard, latest).
+
+Data site berubah paling cepat 1x per interval publish, tapi setiap poll
+browser menghitung ulang dari DB. Sekarang setiap response diberi versi:
+
+  site  : timestamp data terbaru site (di-SET listener setelah flush)
+  fleet : counter, di-INCR listener setiap flush yang memajukan SiteLatest
+          salah satu site (list menampilkan last_update, jadi setiap reading
+          baru mengubah isi list)
+  meta  : counter, di-INCR saat Site disimpan/dihapus (admin, metadata),
+          termasuk site baru / dihapus dari list
+
+Versi disimpan di Redis (REDIS_URL) sehingga listener di proses lain bisa
+menaikkannya. ETag = "{scope}:{site}:{versi}:{meta}:{hash host+query}", jadi
+request dengan If-None-Match yang cocok dijawab 304 hanya dengan 1 MGET
+Redis, tanpa query DB. Tanpa Redis versi dibaca dari SiteLatest (1 query
+kecil: timestamp site / created_at terbaru fleet) dan disimpan di memory
+proses selama RESPONSE_CACHE_VERSION_TTL detik; bump() di proses yang sama
+langsung memperbarui versi di memory itu.
+
+Isi response (response.data, sebelum render) disimpan 2 tingkat: cache
+local-memory proses lalu cache 'shared' (Redis, jika dikonfigurasi di
+CACHES). Key memuat versi, jadi entry lama tidak perlu dihapus; TTL
+RESPONSE_CACHE_TTL hanya membersihkan memory. Key (dan ETag) juga memuat
+scheme + Host karena response list berisi URL pagination absolut.
+"""
+
+import hashlib
+import logging
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+from django.db.models import Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import Site, SiteLatest
+
+try:
+    import redis
+except ImportError:  # Redis optional, fallback ke versi dari DB
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'rectifier:version:'
+FLEET = '*'
+
+_client = None
+_local_versions = {}
+_local_meta = 0
+
+
+def _redis():
+    global _client
+    if not settings.REDIS_URL or redis is None:
+        return None
+    if _client is None:
+        _client = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=1)
+    return _client
+
+
+def _site_key(site_code):
+    return f'{KEY_PREFIX}site:{site_code}'
+
+
+def _db_version(site_code):
+    """Versi tanpa Redis: timestamp SiteLatest site / created_at terbaru semua site"""
+    if site_code == FLEET:
+        newest = SiteLatest.objects.aggregate(newest=Max('created_at'))['newest']
+        return int(newest.timestamp() * 1000) if newest else 0
+    return (
+        SiteLatest.objects.filter(site__site_code=site_code)
+        .values_list('timestamp', flat=True).first()
+    )
+
+
+def get_version(site_code):
+    """-> (versi data, versi meta); versi data None jika site belum punya data"""
+    global _client
+    client = _redis()
+    if client is not None:
+        data_key = f'{KEY_PREFIX}fleet' if site_code == FLEET else _site_key(site_code)
+        try:
+            version, meta = client.mget([data_key, f'{KEY_PREFIX}meta'])
+        except Exception as e:
+            logger.warning(f"✗ Response cache version lookup failed: {e}")
+            _client = None
+        else:
+            if version is not None:
+                return version.decode(), (meta or b'0').decode()
+            # Belum pernah di-bump (mis. Redis baru restart): isi dari DB
+            version = _db_version(site_code)
+            if version is not None:
+                client.set(data_key, version, nx=True)
+            return (str(version) if version is not None else None), (meta or b'0').decode()
+
+    now = time.monotonic()
+    cached = _local_versions.get(site_code)
+    if cached is None or cached[1] <= now:
+        version = _db_version(site_code)
+        cached = (str(version) if version is not None else None, now + settings.RESPONSE_CACHE_VERSION_TTL)
+        _local_versions[site_code] = cached
+    return cached[0], str(_local_meta)
+
+
+def bump(rows):
+    """
+    Dipanggil listener setelah flush dengan baris yang mengubah SiteLatest
+    (row.site harus sudah di-load, mis. dari SiteCache).
+    """
+    if not rows:
+        return
+    newest = {}
+    for row in rows:
+        site_code = row.site.site_code
+        newest[site_code] = max(newest.get(site_code, row.timestamp), row.timestamp)
+
+    client = _redis()
+    if client is None:
+        # Tanpa Redis: hanya proses ini yang langsung tahu, proses lain lewat DB
+        expires = time.monotonic() + settings.RESPONSE_CACHE_VERSION_TTL
+        for site_code, timestamp in newest.items():
+            _local_versions[site_code] = (str(timestamp), expires)
+        _local_versions.pop(FLEET, None)
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        for site_code, timestamp in newest.items():
+            pipe.set(_site_key(site_code), timestamp)
+        pipe.incr(f'{KEY_PREFIX}fleet')
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"✗ Response cache bump failed: {e}")
+
+
+def bump_meta():
+    global _local_meta
+    _local_meta += 1
+    _local_versions.clear()
+    client = _redis()
+    if client is not None:
+        try:
+            client.incr(f'{KEY_PREFIX}meta')
+        except Exception as e:
+            logger.warning(f"✗ Response cache meta bump failed: {e}")
+
+
+def _caches():
+    tiers = [caches['default']]
+    try:
+        tiers.append(caches['shared'])
+    except InvalidCacheBackendError:
+        pass
+    return tiers
+
+
+def _cache_get(key):
+    tiers = _caches()
+    for index, cache in enumerate(tiers):
+        try:
+            data = cache.get(key)
+        except Exception as e:
+            logger.warning(f"✗ Response cache get failed: {e}")
+            continue
+        if data is not None:
+            for upper in tiers[:index]:
+                upper.set(key, data, settings.RESPONSE_CACHE_TTL)
+            return data
+    return None
+
+
+def _cache_set(key, data):
+    for cache in _caches():
+        try:
+            cache.set(key, data, settings.RESPONSE_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"✗ Response cache set failed: {e}")
+
+
+def cached_response(scope):
+    """
+    Decorator action SiteViewSet: ETag/304 + cache response.data per versi.
+    Action detail memakai versi site, list memakai versi fleet (+ host dan query string).
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            site_code = kwargs.get(self.lookup_field) or FLEET
+            version, meta = get_version(site_code)
+            if version is None:
+                return method(self, request, *args, **kwargs)
+
+            # Host + scheme: URL pagination next/previous dibangun dengan build_absolute_uri
+            variant = hashlib.md5(
+                f"{request.scheme}://{request.get_host()}?{request.META.get('QUERY_STRING', '')}".encode()
+            ).hexdigest()[:12]
+            etag = f'"{scope}:{site_code}:{version}:{meta}:{variant}"'
+            headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+            if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+            key = f'response:{etag}'
+            data = _cache_get(key)
+            if data is not None:
+                return Response(data, headers=headers)
+
+            response = method(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                _cache_set(key, response.data)
+                for name, value in headers.items():
+                    response[name] = value
+            return response
+        return wrapper
+    return decorator
+
+
+@receiver(post_save, sender=Site)
+def _bump_on_save(sender, instance, **kwargs):
+    bump_meta()
+
+
+@receiver(post_delete, sender=Site)
+def _bump_on_delete(sender, instance, **kwargs):
+    bump_meta()
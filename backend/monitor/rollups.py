@@ -0,0 +1,156 @@
+"""
+Incremental rollup RectifierData -> RectifierRollup.
+
+apply_rows() dipanggil oleh IngestPipeline di transaksi flush yang sama:
+baris 1 batch diagregasi di memory per (site, resolution, bucket), lalu
+digabung dengan bucket yang sudah ada di DB di dalam database sendiri,
+seperti snapshots.upsert_latest:
+
+    INSERT ... ON CONFLICT (site_id, resolution, bucket) DO UPDATE SET
+        x_min = LEAST(x_min, EXCLUDED.x_min), x_sum = x_sum + EXCLUDED.x_sum, ...
+
+Tidak ada read-modify-write di Python, jadi worker/listener paralel yang
+menulis bucket yang sama tidak saling menimpa. Karena min/max/sum/count/last
+bisa di-merge, hasilnya sama dengan agregasi ulang dari data mentah.
+"""
+
+from django.db import connection
+
+from .models import (
+    ROLLUP_FIELDS,
+    ROLLUP_RESOLUTIONS,
+    RectifierRollup,
+)
+from .snapshots import MAX_QUERY_PARAMS
+
+STAT_COLUMNS = [
+    f'{name}_{agg}'
+    for name in ROLLUP_FIELDS
+    for agg in ('min', 'max', 'sum', 'count', 'last')
+]
+
+
+def bucket_start(timestamp, resolution):
+    width = ROLLUP_RESOLUTIONS[resolution]
+    return timestamp - timestamp % width
+
+
+def _from_row(row, resolution):
+    rollup = RectifierRollup(
+        site_id=row.site_id,
+        resolution=resolution,
+        bucket=bucket_start(row.timestamp, resolution),
+        sample_count=1,
+        last_timestamp=row.timestamp,
+    )
+    for name in ROLLUP_FIELDS:
+        value = getattr(row, name)
+        # _last = nilai sample terbaru di bucket (boleh None)
+        setattr(rollup, f'{name}_last', value)
+        if value is None:
+            continue
+        setattr(rollup, f'{name}_min', value)
+        setattr(rollup, f'{name}_max', value)
+        setattr(rollup, f'{name}_sum', value)
+        setattr(rollup, f'{name}_count', 1)
+    return rollup
+
+
+def _merge(target, source):
+    """Gabungkan statistik source ke target (in-place)"""
+    newer = source.last_timestamp >= target.last_timestamp
+    for name in ROLLUP_FIELDS:
+        if newer:
+            setattr(target, f'{name}_last', getattr(source, f'{name}_last'))
+        count = getattr(source, f'{name}_count')
+        if not count:
+            continue
+        if getattr(target, f'{name}_count'):
+            setattr(target, f'{name}_min', min(getattr(target, f'{name}_min'), getattr(source, f'{name}_min')))
+            setattr(target, f'{name}_max', max(getattr(target, f'{name}_max'), getattr(source, f'{name}_max')))
+            setattr(target, f'{name}_sum', getattr(target, f'{name}_sum') + getattr(source, f'{name}_sum'))
+            setattr(target, f'{name}_count', getattr(target, f'{name}_count') + count)
+        else:
+            for agg in ('min', 'max', 'sum', 'count'):
+                setattr(target, f'{name}_{agg}', getattr(source, f'{name}_{agg}'))
+    target.sample_count += source.sample_count
+    if newer:
+        target.last_timestamp = source.last_timestamp
+
+
+def apply_rows(rows):
+    """Update semua tier rollup dari list RectifierData. Return jumlah bucket yang disentuh."""
+    pending = {}
+    for row in rows:
+        for resolution in ROLLUP_RESOLUTIONS:
+            rollup = _from_row(row, resolution)
+            key = (rollup.site_id, resolution, rollup.bucket)
+            if key in pending:
+                _merge(pending[key], rollup)
+            else:
+                pending[key] = rollup
+    if not pending:
+        return 0
+
+    # Urut key: worker paralel mengunci bucket dengan urutan yang sama
+    rollups = [pending[key] for key in sorted(pending)]
+    fields = [f for f in RectifierRollup._meta.concrete_fields if not f.primary_key]
+    batch_size = max(1, min(
+        connection.ops.bulk_batch_size(fields, rollups), MAX_QUERY_PARAMS // len(fields)
+    ))
+    for start in range(0, len(rollups), batch_size):
+        _upsert(fields, rollups[start:start + batch_size])
+    return len(rollups)
+
+
+def _merge_sql(table, column, agg):
+    """Ekspresi SET untuk 1 kolom statistik: nilai lama (table) + EXCLUDED"""
+    old, new = f'{table}.{column}', f'EXCLUDED.{column}'
+    if agg in ('min', 'max'):
+        # PostgreSQL LEAST/GREATEST mengabaikan NULL, SQLite min()/max() multi-argumen
+        # mengembalikan NULL; COALESCE menyamakan keduanya (NULL = belum ada sample).
+        if connection.vendor == 'sqlite':
+            function = agg
+        else:
+            function = 'LEAST' if agg == 'min' else 'GREATEST'
+        return f'COALESCE({function}({old}, {new}), {old}, {new})'
+    if agg == 'sum':
+        return f'COALESCE({old} + {new}, {old}, {new})'
+    if agg == 'count':
+        return f'{old} + {new}'
+    # last: ambil dari sample yang lebih baru
+    last_timestamp = connection.ops.quote_name('last_timestamp')
+    return f'CASE WHEN EXCLUDED.{last_timestamp} >= {table}.{last_timestamp} THEN {new} ELSE {old} END'
+
+
+def _upsert(fields, rollups):
+    qn = connection.ops.quote_name
+    table = qn(RectifierRollup._meta.db_table)
+    columns = [qn(f.column) for f in fields]
+    key_columns = [qn(RectifierRollup._meta.get_field(name).column) for name in ('site', 'resolution', 'bucket')]
+
+    # Semua ekspresi SET membaca nilai lama baris (PostgreSQL & SQLite), jadi
+    # urutan kolom (mis. last_timestamp sebelum *_last) tidak berpengaruh.
+    updates = [f'{qn("sample_count")} = {table}.{qn("sample_count")} + EXCLUDED.{qn("sample_count")}']
+    updates.append(
+        f'{qn("last_timestamp")} = CASE WHEN EXCLUDED.{qn("last_timestamp")} > {table}.{qn("last_timestamp")} '
+        f'THEN EXCLUDED.{qn("last_timestamp")} ELSE {table}.{qn("last_timestamp")} END'
+    )
+    for name in STAT_COLUMNS:
+        agg = name.rsplit('_', 1)[1]
+        updates.append(f'{qn(name)} = {_merge_sql(table, qn(name), agg)}')
+
+    placeholders = '(' + ', '.join(['%s'] * len(fields)) + ')'
+    sql = (
+        f'INSERT INTO {table} ({", ".join(columns)}) '
+        f'VALUES {", ".join([placeholders] * len(rollups))} '
+        f'ON CONFLICT ({", ".join(key_columns)}) DO UPDATE SET {", ".join(updates)}'
+    )
+    params = [
+        f.get_db_prep_save(getattr(rollup, f.attname), connection)
+        for rollup in rollups
+        for f in fields
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
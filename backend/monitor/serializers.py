@@ -1,5 +1,14 @@
 from rest_framework import serializers
-from .models import Site, RectifierData
+from rest_framework.exceptions import ValidationError
+from .models import (
+    ROLLUP_FIELDS,
+    ModuleState,
+    SITE_METADATA_FIELDS,
+    RectifierData,
+    RectifierRollup,
+    Site,
+    SiteLatest,
+)
 
 
 class SiteListSerializer(serializers.ModelSerializer):
@@ -22,14 +31,10 @@ class SiteListSerializer(serializers.ModelSerializer):
 
     def _get_cached_latest(self, obj):
         """
-        PERBAIKAN N+1 QUERY:
-        Cache hasil get_latest_data() per objek Site agar semua field
-        (vdc, load, temp, status, last_update) hanya trigger 1 DB query
-        per site, bukan 4 query terpisah.
+        Snapshot SiteLatest di-load lewat select_related('latest') di
+        SiteViewSet.get_queryset, jadi tidak ada query tambahan per site.
         """
-        if not hasattr(obj, '_latest_data_cache'):
-            obj._latest_data_cache = obj.get_latest_data()
-        return obj._latest_data_cache
+        return obj.get_latest_snapshot()
 
     def get_latest_vdc(self, obj):
         latest = self._get_cached_latest(obj)
@@ -59,18 +64,187 @@ class SiteDetailSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+def _with_site_metadata(names):
+    """
+    Sisipkan key metadata site di posisi lamanya (saat masih kolom telemetri),
+    agar urutan key output API tidak berubah
+    """
+    ordered = []
+    for name in names:
+        if name == 'status_realtime':
+            ordered += ['project_id', 'ladder', 'sla']
+        ordered.append(name)
+        if name == 'status_ladder':
+            ordered += ['latitude', 'longitude']
+    return ordered
+
+
+def _telemetry_names(model, exclude):
+    return [f.attname for f in model._meta.concrete_fields if f.name not in exclude]
+
+
 class RectifierDataSerializer(serializers.ModelSerializer):
-    """Serializer untuk raw rectifier data"""
+    """Serializer untuk raw rectifier data (metadata site dibaca dari Site)"""
     site_code = serializers.CharField(source='site.site_code', read_only=True)
     site_name = serializers.CharField(source='site.site_name', read_only=True)
+    project_id = serializers.CharField(source='site.project_id', read_only=True)
+    ladder = serializers.CharField(source='site.ladder', read_only=True)
+    sla = serializers.CharField(source='site.sla', read_only=True)
+    latitude = serializers.FloatField(source='site.latitude', read_only=True)
+    longitude = serializers.FloatField(source='site.longitude', read_only=True)
     
     class Meta:
         model = RectifierData
-        fields = '__all__'
+        fields = _with_site_metadata([
+            'id', 'site_code', 'site_name',
+            *_telemetry_names(RectifierData, ('id', 'site')),
+            'site',
+        ])
+
+
+# Output key RectifierDataSerializer -> lookup ORM (urutan key sama)
+RECTIFIER_FIELD_LOOKUPS = {
+    name: (
+        'site_id' if name == 'site'
+        else f'site__{name}' if name == 'site_code' or name in SITE_METADATA_FIELDS
+        else name
+    )
+    for name in RectifierDataSerializer.Meta.fields
+}
+
+_datetime_field = serializers.DateTimeField()
+
+
+def parse_fields_param(value):
+    """?fields=a,b,c -> list key output (None = semua kolom)"""
+    if not value:
+        return None
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in RECTIFIER_FIELD_LOOKUPS]
+    if unknown:
+        raise ValidationError({'fields': f"Unknown field(s): {', '.join(unknown)}"})
+    return fields
+
+
+class RectifierDataProjection:
+    """
+    Fast path pengganti RectifierDataSerializer(many=True) untuk list besar
+    (history, /api/rectifier/).
+
+    Baris diambil dengan values_list() (site_code + metadata site lewat JOIN,
+    bukan 1 query Site per baris) dan di-encode langsung ke dict, tanpa membuat
+    instance model maupun ~50 DRF field per baris. Output identik dengan
+    RectifierDataSerializer, atau subset kolom jika `fields` diisi.
+    """
+
+    def __init__(self, fields=None):
+        self.fields = fields or list(RECTIFIER_FIELD_LOOKUPS)
+        self.lookups = [RECTIFIER_FIELD_LOOKUPS[name] for name in self.fields]
+
+    def values(self, queryset, *extra):
+        """
+        Queryset lazy berisi tuple sesuai self.fields (bisa dipaginasi).
+        `extra` = lookup tambahan di akhir tuple (mis. key cursor pagination),
+        diabaikan oleh encode().
+        """
+        return queryset.values_list(*self.lookups, *extra)
+
+    def encode(self, rows):
+        fields = self.fields
+        if 'created_at' not in fields:
+            return [dict(zip(fields, row)) for row in rows]
+
+        created_index = fields.index('created_at')
+        to_representation = _datetime_field.to_representation
+        data = []
+        for row in rows:
+            item = dict(zip(fields, row))
+            if row[created_index] is not None:
+                item['created_at'] = to_representation(row[created_index])
+            data.append(item)
+        return data
+
+    def project(self, queryset):
+        return self.encode(self.values(queryset))
+
+    def columns(self, rows):
+        """
+        Tuple rows -> format columnar {'ts': [...], field: [...]}
+        (kolom timestamp diganti nama menjadi 'ts', urutan row tetap)
+        """
+        rows = list(rows)
+        if rows:
+            columns = {name: list(values) for name, values in zip(self.fields, zip(*rows))}
+        else:
+            columns = {name: [] for name in self.fields}
+
+        if 'created_at' in columns:
+            to_representation = _datetime_field.to_representation
+            columns['created_at'] = [
+                to_representation(value) if value is not None else None
+                for value in columns['created_at']
+            ]
+        return _time_first(columns, 'timestamp')
+
+
+def rows_to_columns(rows, time_key):
+    """List of dict (output serializer) -> format columnar dengan time_key sebagai 'ts'"""
+    keys = list(rows[0]) if rows else [time_key]
+    return _time_first({key: [row[key] for row in rows] for key in keys}, time_key)
+
+
+def _time_first(columns, time_key):
+    data = {'ts': columns.pop(time_key)}
+    data.update(columns)
+    return data
+
+
+class SiteLatestSerializer(RectifierDataSerializer):
+    """Snapshot SiteLatest dengan format output yang sama seperti RectifierDataSerializer"""
+    id = serializers.IntegerField(source='reading_id', read_only=True)
+
+    class Meta:
+        model = SiteLatest
+        fields = _with_site_metadata([
+            'site', 'site_code', 'site_name', 'id',
+            *_telemetry_names(SiteLatest, ('site', 'reading_id')),
+        ])
+
+
+class ModuleStateSerializer(serializers.ModelSerializer):
+    """Serializer untuk transisi status modul (until null = status saat ini)"""
+    site_code = serializers.CharField(source='site.site_code', read_only=True)
+    site_name = serializers.CharField(source='site.site_name', read_only=True)
+
+    class Meta:
+        model = ModuleState
+        fields = ['site_code', 'site_name', 'module_id', 'status', 'value', 'since', 'until']
+
+
+class RectifierRollupSerializer(serializers.ModelSerializer):
+    """Serializer untuk rollup: {field}_min/_max/_avg/_last per field numerik"""
+
+    class Meta:
+        model = RectifierRollup
+        fields = ['bucket', 'resolution', 'sample_count', 'last_timestamp']
+
+    def to_representation(self, obj):
+        data = super().to_representation(obj)
+        for name in ROLLUP_FIELDS:
+            count = getattr(obj, f'{name}_count')
+            data[f'{name}_min'] = getattr(obj, f'{name}_min')
+            data[f'{name}_max'] = getattr(obj, f'{name}_max')
+            data[f'{name}_avg'] = getattr(obj, f'{name}_sum') / count if count else None
+            data[f'{name}_last'] = getattr(obj, f'{name}_last')
+        return data
 
 
 class DashboardDataSerializer(serializers.Serializer):
-    """Serializer untuk format dashboard frontend (sama seperti single-site)"""
+    """
+    Serializer untuk format dashboard frontend (sama seperti single-site).
+    Menerima RectifierData maupun SiteLatest (kolom telemetri sama);
+    metadata site dibaca dari obj.site (harus sudah di-load lewat select_related).
+    """
     siteInfo = serializers.SerializerMethodField()
     environment = serializers.SerializerMethodField()
     modules = serializers.SerializerMethodField()
@@ -79,17 +253,17 @@ class DashboardDataSerializer(serializers.Serializer):
     
     def get_siteInfo(self, obj):
         return {
-            'siteName': obj.site_name,
+            'siteName': obj.site.site_name,
             'siteCode': obj.site.site_code,
-            'projectId': obj.project_id,
-            'ladder': obj.ladder,
-            'sla': obj.sla,
+            'projectId': obj.site.project_id,
+            'ladder': obj.site.ladder,
+            'sla': obj.site.sla,
             'statusRealtime': obj.status_realtime,
             'statusLadder': obj.status_ladder,
             'lastData': obj.created_at.strftime('%Y-%m-%d %H:%M:%S'),
             'location': {
-                'lat': obj.latitude or obj.site.latitude,
-                'lng': obj.longitude or obj.site.longitude,
+                'lat': obj.site.latitude,
+                'lng': obj.site.longitude,
             }
         }
     
@@ -0,0 +1,66 @@
+"""
+Pembagian topic rectifier/+/data ke N worker listener.
+
+Mode (LISTENER_SHARD_MODE):
+- none   : 1 worker menerima semua site (default, perilaku lama)
+- hash   : semua worker subscribe topic yang sama, tiap worker hanya memproses
+           site dengan crc32(site_code) % N == index. Deterministik, urutan per
+           site selalu terjaga (1 site = 1 worker), tapi tiap worker tetap
+           menerima semua pesan dari broker.
+- shared : MQTT shared subscription $share/<group>/<topic>; broker yang membagi
+           pesan. Urutan per site hanya terjaga jika broker membagi per topic
+           (EMQX: shared_subscription_strategy = hash_topic / sticky). Mosquitto
+           memakai round-robin per pesan -> pakai mode hash.
+
+Karena SiteLatest dan rollup di-upsert berdasarkan timestamp, pesan yang
+terlambat tidak merusak snapshot; yang dijaga sharding adalah urutan insert
+per site di satu writer.
+"""
+
+import zlib
+
+from django.conf import settings
+
+SHARD_MODES = ('none', 'hash', 'shared')
+
+
+def shard_of(site_code, workers):
+    """Index worker (0..workers-1) untuk site_code, stabil antar proses/restart"""
+    return zlib.crc32(site_code.encode()) % workers
+
+
+class ShardPlan:
+    def __init__(self, mode='none', workers=1, index=0, group=None):
+        if mode not in SHARD_MODES:
+            raise ValueError(f"Unknown shard mode {mode!r}, choose from {', '.join(SHARD_MODES)}")
+        if workers < 1 or not 0 <= index < workers:
+            raise ValueError(f'Invalid worker index {index} for {workers} worker(s)')
+        self.mode = mode if workers > 1 else 'none'
+        self.workers = workers
+        self.index = index
+        self.group = group or settings.MQTT_SHARE_GROUP
+
+    @classmethod
+    def from_settings(cls, mode=None, workers=None, index=None):
+        return cls(
+            mode=mode or settings.LISTENER_SHARD_MODE,
+            workers=workers or settings.LISTENER_WORKERS,
+            index=index if index is not None else settings.LISTENER_WORKER_INDEX,
+        )
+
+    @property
+    def label(self):
+        if self.mode == 'none':
+            return 'worker'
+        return f'worker {self.index + 1}/{self.workers} ({self.mode})'
+
+    def topic(self, topic_filter):
+        """Topic filter yang di-subscribe worker ini"""
+        if self.mode == 'shared':
+            return f'$share/{self.group}/{topic_filter}'
+        return topic_filter
+
+    def owns(self, site_code):
+        if self.mode != 'hash':
+            return True
+        return shard_of(site_code, self.workers) == self.index
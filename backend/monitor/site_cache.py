@@ -0,0 +1,163 @@
+"""
+In-process cache site_code -> Site untuk MQTT listener.
+
+Sebelumnya setiap message menjalankan Site.objects.get_or_create() sebelum
+insert (2 query per baris telemetri). Cache ini di-warm dari site aktif saat
+startup, hanya fallback ke DB untuk site_code yang belum dikenal, dan
+di-invalidate lewat:
+  - signal post_save / post_delete Site (perubahan di proses yang sama)
+  - refresh periodik setiap SITE_CACHE_REFRESH_SECONDS (perubahan dari
+    proses lain, mis. Django admin di container backend)
+
+Metadata site (SITE_METADATA_FIELDS + region) tidak lagi disimpan per baris
+telemetri. Seperti sebelumnya (nilai per baris dari payload terbaru), Site
+mengikuti payload: jika metadata payload berbeda dari Site di cache, Site
+di-UPDATE. Perbandingan dilakukan di memori, dan UPDATE per site paling
+sering 1x per SITE_METADATA_UPDATE_SECONDS (payload yang berganti-ganti nilai
+tidak menulis ke DB setiap pesan). Nilai kosong di payload diabaikan.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import response_cache
+from .models import SITE_METADATA_FIELDS, Site
+
+logger = logging.getLogger(__name__)
+
+
+# Metadata Site yang diikuti dari payload
+PAYLOAD_METADATA_FIELDS = (*SITE_METADATA_FIELDS, 'region')
+
+
+def changed_metadata(site, payload):
+    """Dict metadata dari payload yang berbeda dari kolom Site (tanpa DB)"""
+    updates = {}
+    for name in PAYLOAD_METADATA_FIELDS:
+        value = payload.get(name)
+        if value is None or value == '':
+            continue
+        try:
+            # '1.5' vs 1.5 (latitude/longitude) bukan perubahan
+            value = Site._meta.get_field(name).to_python(value)
+        except ValidationError:
+            continue
+        if value != getattr(site, name):
+            updates[name] = value
+    return updates
+
+
+class SiteCache:
+    """Mapping site_code -> Site dengan fallback get_or_create"""
+
+    def __init__(self, refresh_interval=None):
+        self.refresh_interval = refresh_interval or settings.SITE_CACHE_REFRESH_SECONDS
+        self.metadata_interval = settings.SITE_METADATA_UPDATE_SECONDS
+        self._sites = {}
+        self._metadata_due = {}   # site_code -> monotonic UPDATE metadata berikutnya boleh
+        self._lock = threading.Lock()
+        self._next_refresh = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._sites)
+
+    def warm(self):
+        """Load ulang semua site aktif (1 query)"""
+        sites = {site.site_code: site for site in Site.objects.filter(is_active=True)}
+        with self._lock:
+            self._sites = sites
+            self._next_refresh = time.monotonic() + self.refresh_interval
+        logger.info(f"✓ Site cache warmed: {len(sites)} active sites")
+
+    def invalidate(self, site_code=None):
+        """Hapus 1 site (atau semua jika site_code None) dari cache"""
+        with self._lock:
+            if site_code is None:
+                self._sites = {}
+                self._next_refresh = 0.0
+            else:
+                self._sites.pop(site_code, None)
+
+    def refresh_if_due(self):
+        if time.monotonic() >= self._next_refresh:
+            self.warm()
+
+    def peek(self, site_code):
+        """Site dari cache tanpa menyentuh DB (None jika belum dikenal), aman dari async"""
+        site = self._sites.get(site_code)
+        if site is not None:
+            self.hits += 1
+        return site
+
+    def resolve(self, site_code, payload):
+        """
+        Return (site, created). Hanya menyentuh DB jika site_code belum ada
+        di cache atau interval refresh sudah lewat.
+        """
+        self.refresh_if_due()
+
+        site = self._sites.get(site_code)
+        if site is not None:
+            self.hits += 1
+            self.update_metadata(site, self.metadata_updates(site, payload))
+            return site, False
+
+        self.misses += 1
+        site, created = Site.objects.get_or_create(
+            site_code=site_code,
+            defaults={
+                'site_name': payload.get('site_name', site_code),
+                'latitude': payload.get('latitude', 0),
+                'longitude': payload.get('longitude', 0),
+                'region': payload.get('region', ''),
+                'project_id': payload.get('project_id', ''),
+                'ladder': payload.get('ladder', ''),
+                'sla': payload.get('sla', ''),
+            }
+        )
+        if not created:
+            self.update_metadata(site, self.metadata_updates(site, payload))
+        with self._lock:
+            self._sites[site_code] = site
+        return site, created
+
+    def metadata_updates(self, site, payload):
+        """changed_metadata() jika UPDATE untuk site ini sudah boleh (tanpa DB, aman dari async)"""
+        updates = changed_metadata(site, payload)
+        if updates and time.monotonic() < self._metadata_due.get(site.site_code, 0.0):
+            return {}
+        return updates
+
+    def update_metadata(self, site, updates):
+        """Tulis metadata payload ke Site (hasil metadata_updates). Return True jika ada UPDATE."""
+        if not updates:
+            return False
+        self._metadata_due[site.site_code] = time.monotonic() + self.metadata_interval
+        # update() tidak memicu post_save, instance di cache di-update langsung
+        Site.objects.filter(pk=site.pk).update(**updates)
+        for name, value in updates.items():
+            setattr(site, name, value)
+        response_cache.bump_meta()
+        logger.info(f"✓ Site metadata updated from payload: {site.site_code} {sorted(updates)}")
+        return True
+
+
+site_cache = SiteCache()
+
+
+@receiver(post_save, sender=Site)
+def _invalidate_on_save(sender, instance, **kwargs):
+    site_cache.invalidate(instance.site_code)
+
+
+@receiver(post_delete, sender=Site)
+def _invalidate_on_delete(sender, instance, **kwargs):
+    site_cache.invalidate(instance.site_code)
@@ -0,0 +1,88 @@
+"""
+Maintain tabel SiteLatest (snapshot data terbaru per site) saat ingest.
+
+upsert_latest() dipanggil oleh IngestPipeline setelah bulk_create. Per batch
+hanya baris dengan timestamp terbesar per site yang dikirim, dalam 1 statement:
+
+    INSERT ... ON CONFLICT (site_id) DO UPDATE SET ...
+    WHERE monitor_sitelatest.timestamp < EXCLUDED.timestamp
+
+Syntax ini didukung PostgreSQL dan SQLite (>= 3.24), sehingga sample yang
+datang terlambat tidak pernah menimpa snapshot yang lebih baru.
+RETURNING site_id (SQLite >= 3.35) memberi daftar site yang benar-benar
+berubah, dipakai untuk memfilter live publish.
+
+VALUES dipecah per chunk seperti bulk_create(batch_size=...) agar jumlah
+bind parameter tidak melewati batas database (PostgreSQL 65535, ~43 kolom
+per site -> maks ~1500 site per statement).
+"""
+
+from django.db import connection
+
+from .models import SiteLatest
+
+# Batas bind parameter per statement di PostgreSQL (SQLite lewat ops.bulk_batch_size)
+MAX_QUERY_PARAMS = 65535
+
+
+def _newest_per_site(rows):
+    newest = {}
+    for row in rows:
+        current = newest.get(row.site_id)
+        if current is None or row.timestamp > current.timestamp:
+            newest[row.site_id] = row
+    return newest.values()
+
+
+def _snapshot_from(row):
+    snapshot = SiteLatest(site_id=row.site_id, reading_id=row.pk)
+    for field in SiteLatest._meta.concrete_fields:
+        if field.attname not in ('site_id', 'reading_id'):
+            setattr(snapshot, field.attname, getattr(row, field.attname))
+    return snapshot
+
+
+def upsert_latest(rows):
+    """Upsert SiteLatest dari list RectifierData. Return set site_id yang berubah."""
+    # Urut site_id: worker paralel mengunci baris SiteLatest dengan urutan yang sama
+    snapshots = sorted(
+        (_snapshot_from(row) for row in _newest_per_site(rows)), key=lambda snapshot: snapshot.site_id
+    )
+    if not snapshots:
+        return set()
+
+    fields = SiteLatest._meta.concrete_fields
+    batch_size = max(1, min(
+        connection.ops.bulk_batch_size(fields, snapshots), MAX_QUERY_PARAMS // len(fields)
+    ))
+    changed = set()
+    for start in range(0, len(snapshots), batch_size):
+        changed |= _upsert(fields, snapshots[start:start + batch_size])
+    return changed
+
+
+def _upsert(fields, snapshots):
+    qn = connection.ops.quote_name
+    table = qn(SiteLatest._meta.db_table)
+    columns = [qn(f.column) for f in fields]
+    updates = ', '.join(
+        f'{col} = EXCLUDED.{col}' for f, col in zip(fields, columns) if not f.primary_key
+    )
+    placeholders = '(' + ', '.join(['%s'] * len(fields)) + ')'
+
+    sql = (
+        f'INSERT INTO {table} ({", ".join(columns)}) '
+        f'VALUES {", ".join([placeholders] * len(snapshots))} '
+        f'ON CONFLICT ({qn(SiteLatest._meta.pk.column)}) DO UPDATE SET {updates} '
+        f'WHERE {table}.{qn("timestamp")} < EXCLUDED.{qn("timestamp")} '
+        f'RETURNING {qn(SiteLatest._meta.pk.column)}'
+    )
+    params = [
+        f.get_db_prep_save(getattr(snapshot, f.attname), connection)
+        for snapshot in snapshots
+        for f in fields
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return {record[0] for record in cursor.fetchall()}
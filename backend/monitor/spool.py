@@ -0,0 +1,173 @@
+"""
+Spool lokal (write-ahead, bersegmen) untuk listener saat DB tidak tersedia.
+
+Sebelumnya jika PostgreSQL restart, flush writer gagal dan 1 batch hilang,
+lalu setiap pesan berikutnya mencoba DB lagi. Sekarang IngestPipeline
+(monitor/ingestion.py) beralih ke mode spool saat flush gagal karena koneksi
+(OperationalError / InterfaceError) atau queue penuh karena DB lambat:
+
+  - pesan mentah (topic, payload, waktu tiba) di-append ke segment file
+    dengan format rekaman monitor/recording.py, fsync per
+    INGEST_SPOOL_FSYNC_MS (bukan per pesan)
+  - segment baru setiap INGEST_SPOOL_SEGMENT_MB; total dibatasi
+    INGEST_SPOOL_MAX_MB, pesan yang tidak muat dihitung 'spool_full'
+  - writer thread mengecek DB setiap INGEST_SPOOL_RETRY_SECONDS; jika sudah
+    bisa diakses, segment diputar ulang dari yang tertua per INGEST_BATCH_SIZE
+    baris dan dihapus setelah commit, lalu pipeline kembali menulis langsung
+
+Listener mati di tengah drain: segment yang belum dihapus diputar ulang saat
+start berikutnya, baris yang sudah tersimpan dibuang drop_existing() (at least
+once). Segment yang header-nya kosong/terpotong (mati tepat setelah segment
+dibuat) dibuang saat start; header yang bukan MAGIC disimpan sebagai .failed. Kedalaman spool diekspos di /metrics (rectifier_spool_*).
+"""
+
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+from .recording import FRAME, MAGIC, RecordFormatError, RecordWriter, read_frames
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = 'segment-'
+SEGMENT_SUFFIX = '.rec'
+
+
+class Spool:
+    """Segment file di 1 direktori (1 per worker listener). Aman dipakai dari beberapa thread."""
+
+    def __init__(self, directory, segment_bytes=None, max_bytes=None, fsync_interval_ms=None):
+        self.directory = directory
+        self.segment_bytes = segment_bytes or settings.INGEST_SPOOL_SEGMENT_MB * 1024 * 1024
+        self.max_bytes = max_bytes or settings.INGEST_SPOOL_MAX_MB * 1024 * 1024
+        fsync_ms = fsync_interval_ms if fsync_interval_ms is not None else settings.INGEST_SPOOL_FSYNC_MS
+        self.fsync_interval = fsync_ms / 1000.0
+        self._lock = threading.Lock()
+        self._writer = None
+        self._dirty = False
+        self._next_sync = 0.0
+
+        os.makedirs(directory, exist_ok=True)
+        self._segments = {}   # path -> [bytes, frames]
+        for name in sorted(os.listdir(directory)):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                self._load(os.path.join(directory, name))
+        self._next_seq = max((self._seq(path) for path in self._segments), default=0) + 1
+        if self.messages:
+            logger.info(f"Spool {directory}: {self.messages} messages left from previous run")
+
+    def _load(self, path):
+        """Segment sisa run sebelumnya. Header kosong/terpotong (mati tepat setelah _roll) dibuang."""
+        size = os.path.getsize(path)
+        if size < len(MAGIC):
+            logger.warning(f"Spool segment {path} has a truncated header ({size} bytes), discarded")
+            os.remove(path)
+            return
+        try:
+            frames = sum(1 for _ in read_frames(path))
+        except RecordFormatError as e:
+            logger.error(f"✗ {e}, moved to {path}.failed")
+            os.replace(path, path + '.failed')
+            return
+        self._segments[path] = [size, frames]
+
+    @staticmethod
+    def _seq(path):
+        return int(os.path.basename(path)[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+
+    def _total_bytes(self):
+        return sum(size for size, _ in self._segments.values())
+
+    @property
+    def bytes(self):
+        with self._lock:
+            return self._total_bytes()
+
+    @property
+    def messages(self):
+        with self._lock:
+            return sum(frames for _, frames in self._segments.values())
+
+    @property
+    def segment_count(self):
+        with self._lock:
+            return len(self._segments)
+
+    def append(self, topic, payload, arrival_us=None):
+        """Return False jika spool penuh (INGEST_SPOOL_MAX_MB)"""
+        size = FRAME.size + len(topic.encode()) + len(payload)
+        with self._lock:
+            if self._total_bytes() + size + len(MAGIC) > self.max_bytes:
+                return False
+            if self._writer is None or self._segments[self._writer.path][0] + size > self.segment_bytes:
+                self._roll()
+            self._writer.write(topic, payload, arrival_us)
+            segment = self._segments[self._writer.path]
+            segment[0] += size
+            segment[1] += 1
+            self._dirty = True
+            if time.monotonic() >= self._next_sync:
+                self._sync()
+        return True
+
+    def _roll(self):
+        if self._writer is not None:
+            self._close_writer()
+        path = os.path.join(self.directory, f'{SEGMENT_PREFIX}{self._next_seq:010d}{SEGMENT_SUFFIX}')
+        self._next_seq += 1
+        # flush_interval besar: Spool sendiri yang menentukan kapan flush + fsync
+        self._writer = RecordWriter(path, flush_interval=3600)
+        self._segments[path] = [len(MAGIC), 0]
+
+    def _sync(self):
+        if self._writer is not None and self._dirty:
+            self._writer.sync()
+        self._dirty = False
+        self._next_sync = time.monotonic() + self.fsync_interval
+
+    def _close_writer(self):
+        self._sync()
+        self._writer.close()
+        self._writer = None
+
+    def sync_if_due(self):
+        """Dipanggil berkala writer thread: fsync frame terakhir walaupun tidak ada append baru"""
+        with self._lock:
+            if self._dirty and time.monotonic() >= self._next_sync:
+                self._sync()
+
+    def seal(self):
+        """Tutup segment aktif (append berikutnya membuat segment baru). Return segment urut tertua."""
+        with self._lock:
+            if self._writer is not None:
+                self._close_writer()
+            for path, (_, frames) in list(self._segments.items()):
+                if not frames:
+                    self._discard(path)
+            return sorted(self._segments, key=self._seq)
+
+    def _discard(self, path):
+        self._segments.pop(path, None)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def remove(self, path):
+        """Hapus segment yang sudah diputar ulang dan di-commit"""
+        with self._lock:
+            self._discard(path)
+
+    def quarantine(self, path):
+        """Segment yang gagal diputar bukan karena DB: simpan sebagai .failed untuk diperiksa manual"""
+        with self._lock:
+            self._segments.pop(path, None)
+            os.replace(path, path + '.failed')
+
+    def close(self):
+        with self._lock:
+            if self._writer is not None:
+                self._close_writer()
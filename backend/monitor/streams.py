@@ -0,0 +1,83 @@
+"""
+Server-Sent Events endpoint (butuh ASGI: rectifier_monitor.asgi:application)
+
+Endpoints:
+- GET /api/stream/sites/{site_code}/  - event 'snapshot' (format dashboard),
+                                        lalu 'delta' berisi section yang berubah
+- GET /api/stream/summary/            - event 'site' (field latest_* per site)
+                                        untuk halaman map
+
+Stream ditutup setelah LIVE_STREAM_MAX_SECONDS; EventSource di browser akan
+reconnect otomatis (dan menerima snapshot baru).
+"""
+
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from .live import SUMMARY, latest_events, live_hub
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _subscribe(key, initial, render):
+    queue = live_hub.subscribe(key)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.LIVE_STREAM_MAX_SECONDS
+    try:
+        yield f"retry: {settings.LIVE_RETRY_MS}\n\n"
+        for event in await sync_to_async(initial)():
+            chunk = render(event, True)
+            if chunk:
+                yield chunk
+
+        while loop.time() < deadline:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=settings.LIVE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            chunk = render(event, False)
+            if chunk:
+                yield chunk
+    finally:
+        live_hub.unsubscribe(key, queue)
+
+
+def _event_response(stream):
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def site_stream(request, site_code):
+    """Dashboard 1 site: snapshot penuh sekali, lalu hanya section yang berubah"""
+    last = {}
+
+    def render(event, initial):
+        dashboard = event['dashboard']
+        if initial:
+            last.update(dashboard)
+            return _sse('snapshot', dashboard)
+        delta = {key: value for key, value in dashboard.items() if last.get(key) != value}
+        last.update(delta)
+        return _sse('delta', delta) if delta else None
+
+    return _event_response(
+        _subscribe(site_code, lambda: latest_events(site_code), render)
+    )
+
+
+async def summary_stream(request):
+    """Ringkasan semua site untuk map (1 event per site yang berubah)"""
+
+    def render(event, initial):
+        return _sse('site', event['summary'])
+
+    return _event_response(_subscribe(SUMMARY, latest_events, render))
@@ -0,0 +1,50 @@
+import shutil
+import tempfile
+from datetime import date
+from unittest import skipIf
+
+from django.test import TestCase, override_settings
+
+from monitor import archive
+from monitor.models import ArchiveFile, RectifierData, Site
+from monitor.partitions import day_start_ms
+
+DAY = date(2023, 11, 14)
+START = day_start_ms(DAY)
+
+
+@skipIf(archive.pa is None, 'pyarrow belum terinstall')
+class ArchiveDayTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        settings = override_settings(ARCHIVE_ROOT=root, ARCHIVE_CHUNK_SIZE=2)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.site = Site.objects.create(site_code='SITE01', site_name='Site 1', latitude=0, longitude=0)
+
+    def ingest(self, *offsets):
+        RectifierData.objects.bulk_create([
+            RectifierData(site=self.site, timestamp=START + offset, vdc_output=53.5) for offset in offsets
+        ])
+
+    def archived_timestamps(self):
+        return [row['timestamp'] for row in archive.read_rows(self.site, START, START + 86400000)]
+
+    def test_unchanged_day_is_not_rewritten(self):
+        self.ingest(1000, 2000, 3000)
+        self.assertEqual(archive.archive_day(self.site, DAY).row_count, 3)
+        self.assertIsNone(archive.archive_day(self.site, DAY))
+
+    def test_late_rows_after_cleanup_are_merged(self):
+        self.ingest(1000, 3000)
+        archive.archive_day(self.site, DAY)
+        RectifierData.objects.all().delete()   # cleanup_old_data
+
+        # Sample terlambat untuk hari yang sudah diarsip + dihapus
+        self.ingest(2000)
+        archived = archive.archive_day(self.site, DAY)
+        self.assertEqual(archived.row_count, 3)
+        self.assertEqual((archived.start_ts, archived.end_ts), (START + 1000, START + 3000))
+        self.assertEqual(ArchiveFile.objects.count(), 1)
+        self.assertEqual(self.archived_timestamps(), [START + 3000, START + 2000, START + 1000])
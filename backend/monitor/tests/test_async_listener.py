@@ -0,0 +1,63 @@
+import asyncio
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+import mqtt_listener_async
+from mqtt_listener_async import AsyncIngestService
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class FlushRetryTests(SimpleTestCase):
+    def setUp(self):
+        self.service = AsyncIngestService(writers=1, batch_size=10)
+        self.batch = [object(), object()]
+        sleep = mock.patch('mqtt_listener_async.asyncio.sleep', new=mock.AsyncMock())
+        self.sleep = sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def test_connection_error_retries_same_batch_with_backoff(self):
+        lost = mqtt_listener_async.psycopg.OperationalError('server closed the connection')
+        copy = mock.AsyncMock(side_effect=[lost, lost, []])
+        with mock.patch.object(self.service, '_copy', copy):
+            run(self.service._flush(None, self.batch, 0))
+        self.assertEqual(copy.await_count, 3)
+        self.assertTrue(all(call.args[1] is self.batch for call in copy.await_args_list))
+        self.assertEqual([call.args[0] for call in self.sleep.await_args_list], [1.0, 2.0])
+        self.assertEqual(self.service.stats.dropped, 0)
+
+    def test_connection_error_during_shutdown_counts_dropped(self):
+        self.service.stopping = True
+        copy = mock.AsyncMock(side_effect=mqtt_listener_async.PoolTimeout('no connection'))
+        with mock.patch.object(self.service, '_copy', copy):
+            run(self.service._flush(None, self.batch, 0))
+        self.assertEqual(self.service.stats.dropped, 2)
+        self.sleep.assert_not_awaited()
+
+
+class UpdateLatestTests(SimpleTestCase):
+    def setUp(self):
+        self.service = AsyncIngestService(writers=1, batch_size=10, queue_size=4)
+
+    def update(self, rows, after_copy):
+        with mock.patch('mqtt_listener_async._after_copy', after_copy):
+            run(self.service._update_latest(0, rows))
+
+    def test_failed_rows_are_retried_with_next_flush(self):
+        first, second = [object()], [object()]
+        self.update(first, mock.Mock(side_effect=RuntimeError('deadlock detected')))
+        self.assertEqual(self.service.latest_pending[0], first)
+
+        after_copy = mock.Mock()
+        self.update(second, after_copy)
+        after_copy.assert_called_once_with(first + second)
+        self.assertEqual(self.service.latest_pending[0], [])
+
+    def test_pending_rows_are_bounded(self):
+        failing = mock.Mock(side_effect=RuntimeError('deadlock detected'))
+        self.update([object()] * 3, failing)
+        self.update([object()] * 3, failing)
+        self.assertEqual(self.service.latest_pending[0], [])
@@ -0,0 +1,83 @@
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from monitor.deadband import DeadbandFilter, forward_fill
+from monitor.models import RectifierData, Site
+
+TS = 1700000000000
+
+
+def row(ts, vdc_output=53.5, site_id=1, door_cabinet='closed'):
+    return RectifierData(site_id=site_id, timestamp=ts, vdc_output=vdc_output, door_cabinet=door_cabinet)
+
+
+class DeadbandFilterTests(SimpleTestCase):
+    def setUp(self):
+        self.deadband = DeadbandFilter(thresholds={'vdc_output': 0.1}, heartbeat_seconds=60)
+
+    def kept(self, rows):
+        keep, pending = self.deadband.select(rows)
+        self.deadband.commit(pending)
+        return [item.timestamp for item in keep]
+
+    def test_keeps_first_change_heartbeat_and_late_rows(self):
+        rows = [
+            row(TS),                                  # baris pertama site
+            row(TS + 3000, vdc_output=53.55),         # di dalam deadband
+            row(TS + 6000, vdc_output=53.7),          # > threshold dari baris TERSIMPAN
+            row(TS + 9000, vdc_output=53.7, door_cabinet='open'),   # field non-numerik berubah
+            row(TS + 69000, vdc_output=53.7, door_cabinet='open'),  # heartbeat
+            row(TS + 1000, vdc_output=53.5),          # terlambat
+        ]
+        self.assertEqual(self.kept(rows), [TS, TS + 6000, TS + 9000, TS + 69000, TS + 1000])
+        # Sample terlambat tidak menggeser state: pembanding tetap baris terbaru
+        self.assertEqual(self.kept([row(TS + 72000, vdc_output=53.7, door_cabinet='open')]), [])
+
+    def test_slow_drift_is_compared_with_stored_row(self):
+        rows = [row(TS + step * 3000, vdc_output=53.5 + step * 0.04) for step in range(5)]
+        self.assertEqual(self.kept(rows), [TS, TS + 9000])
+
+    def test_select_without_commit_keeps_state(self):
+        keep, _ = self.deadband.select([row(TS)])
+        self.assertEqual(len(keep), 1)
+        # Batch gagal (tidak di-commit) dikirim ulang: tetap disimpan
+        self.assertEqual(self.kept([row(TS)]), [TS])
+        self.assertEqual(self.kept([row(TS + 3000)]), [])
+
+    def test_sites_are_independent(self):
+        self.assertEqual(self.kept([row(TS, site_id=1), row(TS + 3000, site_id=2)]), [TS, TS + 3000])
+
+
+class ForwardFillTests(SimpleTestCase):
+    def test_grid_uses_last_row_at_or_before_each_point(self):
+        rows = [(TS - 500, 1.0), (TS + 1500, 2.0), (TS + 2000, 3.0)]
+        filled = forward_fill(rows, TS, TS + 4000, 1000, 0, hold=5000)
+        self.assertEqual(filled, [(TS, 1.0), (TS + 1000, 1.0), (TS + 2000, 3.0), (TS + 3000, 3.0)])
+
+    def test_points_older_than_hold_are_gaps(self):
+        rows = [(TS, 1.0), (TS + 5000, 2.0)]
+        filled = forward_fill(rows, TS, TS + 6000, 1000, 0, hold=2000)
+        self.assertEqual([point for point, _ in filled], [TS, TS + 1000, TS + 2000, TS + 5000])
+
+    def test_no_rows_before_start(self):
+        self.assertEqual(forward_fill([(TS + 1000, 1.0)], TS, TS + 2000, 1000, 0, hold=1000), [(TS + 1000, 1.0)])
+
+
+class StorageModeHeaderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        site = Site.objects.create(site_code='SITE01', site_name='Site 1', latitude=0, longitude=0)
+        RectifierData.objects.create(site=site, timestamp=TS, vdc_output=53.5)
+
+    def test_full_mode_has_no_hint(self):
+        response = self.client.get('/api/rectifier/?site_code=SITE01')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Storage-Mode', response)
+
+    @override_settings(INGEST_STORAGE_MODE='deadband')
+    def test_deadband_list_and_export_point_to_history_step(self):
+        for url in ['/api/rectifier/?site_code=SITE01', '/api/rectifier/?site_code=SITE01&export=ndjson']:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['X-Storage-Mode'], 'deadband')
+                self.assertIn('history/?from=<ms>&step=<ms>', response['X-Storage-Hint'])
@@ -0,0 +1,40 @@
+import json
+from unittest import mock
+
+from django.db import connection
+from django.db.backends.base.operations import BaseDatabaseOperations
+from django.test import SimpleTestCase
+
+from monitor import decoder
+from monitor.decoder import PayloadError, decode_message
+
+
+def raw(**payload):
+    return json.dumps({'ts': 1700000000000, **payload}).encode()
+
+
+class DecodeMessageTests(SimpleTestCase):
+    def test_valid_payload(self):
+        ts, fields, payload = decode_message(raw(vdc_output='53.5', backup_duration=120))
+        self.assertEqual(ts, 1700000000000)
+        self.assertEqual(fields['vdc_output'], 53.5)
+        self.assertEqual(fields['backup_duration'], 120)
+
+    def test_overflowing_timestamp_is_rejected(self):
+        for value in ('inf', '-inf', '1e400'):
+            with self.subTest(ts=value), self.assertRaises(PayloadError):
+                decode_message(json.dumps({'ts': value}).encode())
+
+    def test_overflowing_integer_field_is_rejected(self):
+        with self.assertRaises(PayloadError):
+            decode_message(raw(backup_duration='inf'))
+
+    def test_integer_out_of_database_range_is_rejected(self):
+        # Range PostgreSQL (SQLite tidak membatasi integer)
+        specs = decoder.build_field_specs(BaseDatabaseOperations(connection))
+        with mock.patch.object(decoder, 'FIELD_SPECS', specs):
+            decode_message(raw(backup_duration=2147483647))
+            with self.assertRaises(PayloadError):
+                decode_message(raw(backup_duration=99999999999))
+            with self.assertRaises(PayloadError):
+                decode_message(raw(time_remaining='-3000000000'))
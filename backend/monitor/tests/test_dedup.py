@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from monitor import dedup
+from monitor.dedup import DUPLICATE, LATE, NEW, RecentWindowFilter, drop_existing
+from monitor.models import RectifierData, Site
+
+TS = 1700000000000
+
+
+class RecentWindowFilterTests(SimpleTestCase):
+    def test_repeat_is_duplicate(self):
+        recent = RecentWindowFilter(window=4)
+        self.assertEqual(recent.check('SITE01', TS), NEW)
+        self.assertEqual(recent.check('SITE01', TS), DUPLICATE)
+        # Window per site: timestamp sama di site lain bukan duplikat
+        self.assertEqual(recent.check('SITE02', TS), NEW)
+
+    def test_older_than_newest_is_late(self):
+        recent = RecentWindowFilter(window=4)
+        recent.check('SITE01', TS + 2000)
+        self.assertEqual(recent.check('SITE01', TS + 1000), LATE)
+        self.assertEqual(recent.check('SITE01', TS + 1000), DUPLICATE)
+        self.assertEqual(recent.check('SITE01', TS + 3000), NEW)
+
+    def test_window_evicts_oldest_timestamp(self):
+        recent = RecentWindowFilter(window=2)
+        for offset in (0, 1000, 2000):
+            recent.check('SITE01', TS + offset)
+        # TS sudah keluar dari window: tidak dikenali sebagai duplikat lagi (drop_existing yang menangkapnya)
+        self.assertEqual(recent.check('SITE01', TS), LATE)
+        self.assertEqual(recent.check('SITE01', TS + 2000), DUPLICATE)
+
+    def test_zero_window_disables_filter(self):
+        recent = RecentWindowFilter(window=0)
+        self.assertEqual(recent.check('SITE01', TS), NEW)
+        self.assertEqual(recent.check('SITE01', TS), NEW)
+
+
+class DropExistingTests(TestCase):
+    def setUp(self):
+        self.site = Site.objects.create(site_code='SITE01', site_name='Site 1', latitude=0, longitude=0)
+        self.other = Site.objects.create(site_code='SITE02', site_name='Site 2', latitude=0, longitude=0)
+        RectifierData.objects.create(site=self.site, timestamp=TS)
+
+    def row(self, site, ts):
+        return RectifierData(site=site, timestamp=ts)
+
+    def test_drops_rows_already_in_db_and_in_batch(self):
+        rows = [
+            self.row(self.site, TS),
+            self.row(self.site, TS + 1000),
+            self.row(self.site, TS + 1000),
+            self.row(self.other, TS),
+        ]
+        kept = drop_existing(rows)
+        self.assertEqual(kept, [rows[1], rows[3]])
+
+    def test_empty_batch_without_query(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(drop_existing([]), [])
+
+    def test_large_batch_is_looked_up_in_chunks(self):
+        sites = [self.site, self.other]
+        RectifierData.objects.bulk_create([
+            RectifierData(site=site, timestamp=TS + offset * 1000) for site in sites for offset in range(1, 20, 2)
+        ])
+        rows = [self.row(site, TS + offset * 1000) for site in sites for offset in range(40)]
+        with mock.patch.object(dedup, 'MAX_QUERY_PARAMS', 10), self.assertNumQueries(10):
+            kept = drop_existing(rows)
+        # Per site: TS (site pertama saja) + 10 timestamp ganjil sudah ada
+        self.assertEqual(len(kept), 80 - 11 - 10)
+        self.assertEqual(
+            {(row.site_id, row.timestamp) for row in kept} & set(RectifierData.objects.values_list('site_id', 'timestamp')),
+            set(),
+        )
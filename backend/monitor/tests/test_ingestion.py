@@ -0,0 +1,33 @@
+from django.test import TestCase, override_settings
+
+from monitor.decoder import decode_fields
+from monitor.ingestion import IngestPipeline
+from monitor.models import RectifierData, Site
+
+TS = 1700000000000
+
+
+def make_site(code='SITE01'):
+    return Site.objects.create(site_code=code, site_name=code, latitude=0, longitude=0)
+
+
+def make_row(site, ts, **payload):
+    timestamp, fields = decode_fields({'ts': ts, 'vdc_output': 53.5, **payload})
+    return RectifierData(site=site, timestamp=timestamp, **fields)
+
+
+@override_settings(REDIS_URL='')
+class StoreIsolationTests(TestCase):
+    def test_poisoned_row_loses_only_itself(self):
+        site = make_site()
+        rows = [make_row(site, TS + i * 1000) for i in range(10)]
+        rows[6].vdc_output = None   # NOT NULL -> IntegrityError untuk seluruh batch
+        pipeline = IngestPipeline(batch_size=10)
+
+        pipeline._store(rows)
+
+        stored = set(RectifierData.objects.filter(site=site).values_list('timestamp', flat=True))
+        self.assertEqual(stored, {TS + i * 1000 for i in range(10) if i != 6})
+        snapshot = pipeline.stats.snapshot()
+        self.assertEqual(snapshot['failed'], 1)
+        self.assertEqual(snapshot['stored'], 9)
@@ -0,0 +1,61 @@
+import asyncio
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from monitor import live
+from monitor.live import SUMMARY, LiveHub
+from monitor.models import RectifierData, Site
+
+TS = 1700000000000
+
+
+def event(site_code, timestamp):
+    return {'site_code': site_code, 'timestamp': timestamp}
+
+
+@override_settings(REDIS_URL='', LIVE_POLL_INTERVAL=0)
+class FeederRestartTests(SimpleTestCase):
+    def test_poll_error_restarts_feeder_and_keeps_clients_fed(self):
+        hub = LiveHub()
+        calls = []
+
+        def changed_since(since):
+            calls.append(since)
+            if len(calls) == 1:
+                raise RuntimeError('server closed the connection unexpectedly')
+            if len(calls) == 2:
+                return [event('SITE01', TS)]
+            hub.unsubscribe(SUMMARY, queue)   # feeder berhenti
+            return []
+
+        async def scenario():
+            nonlocal queue
+            queue = hub.subscribe(SUMMARY)
+            await hub._feeder
+            return queue.get_nowait()
+
+        queue = None
+        with mock.patch.object(live, '_changed_since', changed_since), \
+                mock.patch.object(live.asyncio, 'sleep', mock.AsyncMock()):
+            received = asyncio.run(scenario())
+        self.assertEqual(received, event('SITE01', TS))
+        # Setelah restart diambil ulang dari posisi yang sama (tidak ada update yang terlewat)
+        self.assertEqual(calls[0], calls[1])
+
+
+@override_settings(REDIS_URL='redis://localhost:6379/0', LIVE_CHANNEL='test:live')
+class PublishTests(SimpleTestCase):
+    def test_inactive_sites_are_not_published(self):
+        active = Site(pk=1, site_code='SITE01', is_active=True)
+        inactive = Site(pk=2, site_code='SITE02', is_active=False)
+        rows = [RectifierData(site=site, timestamp=TS) for site in (active, inactive)]
+
+        publisher = mock.Mock()
+        with mock.patch.object(live, 'redis', mock.Mock()), \
+                mock.patch.object(live, '_publisher', publisher), \
+                mock.patch.object(live, 'build_event', lambda row: event(row.site.site_code, row.timestamp)):
+            self.assertEqual(live.publish(rows), 1)
+        publisher.pipeline.return_value.publish.assert_called_once_with(
+            'test:live', '{"site_code": "SITE01", "timestamp": 1700000000000}'
+        )
@@ -0,0 +1,36 @@
+from django.test import TestCase, override_settings
+from prometheus_client import REGISTRY
+
+from monitor.models import Site
+
+
+def observed(name, view):
+    labels = {'view': view}
+    return (
+        REGISTRY.get_sample_value(f'rectifier_http_request_queries_{name}', labels) or 0
+    )
+
+
+@override_settings(REDIS_URL='')
+class MetricsMiddlewareTests(TestCase):
+    def setUp(self):
+        Site.objects.create(site_code='SITE01', site_name='Site 1', latitude=0, longitude=0)
+
+    def test_sync_request_counts_queries(self):
+        count, total = observed('count', 'site-list'), observed('sum', 'site-list')
+        response = self.client.get('/api/sites/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(observed('count', 'site-list'), count + 1)
+        self.assertGreater(observed('sum', 'site-list'), total)
+
+    async def test_async_request_counts_queries(self):
+        count, total = observed('count', 'site-list'), observed('sum', 'site-list')
+        response = await self.async_client.get('/api/sites/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(observed('count', 'site-list'), count + 1)
+        self.assertGreater(observed('sum', 'site-list'), total)
+
+    def test_metrics_endpoint(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'rectifier_http_request_duration_seconds', response.content)
@@ -0,0 +1,70 @@
+from django.test import TestCase
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from monitor.models import RectifierData, Site
+from monitor.pagination import TimestampCursorPagination
+
+TS = 1700000000000
+
+
+class CursorEncodingTests(TestCase):
+    def decode(self, cursor):
+        request = Request(APIRequestFactory().get('/api/rectifier/', {'cursor': cursor}))
+        return TimestampCursorPagination().decode_cursor(request)
+
+    def test_round_trip(self):
+        paginator = TimestampCursorPagination()
+        for key in [(TS, 1), (TS, 123456789), (0, 7)]:
+            with self.subTest(key=key):
+                self.assertEqual(self.decode(paginator.encode_cursor(key)), key)
+
+    def test_garbage_cursor_is_rejected(self):
+        paginator = TimestampCursorPagination()
+        for cursor in ['!!!', 'Zm9v', paginator.encode_cursor(('x', 1))]:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(NotFound):
+                    self.decode(cursor)
+
+
+class RectifierListPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        sites = Site.objects.bulk_create([
+            Site(site_code=f'PG{index:02d}', site_name=f'Paging {index}', latitude=0, longitude=0)
+            for index in range(5)
+        ])
+        # 5 site dengan timestamp identik (batas halaman jatuh di tengahnya) + 3 baris lebih lama
+        RectifierData.objects.bulk_create(
+            [RectifierData(site=site, timestamp=TS) for site in sites]
+            + [RectifierData(site=sites[0], timestamp=TS - step * 1000) for step in range(1, 4)]
+        )
+        cls.expected = list(
+            RectifierData.objects.order_by('-timestamp', '-id').values_list('timestamp', 'id')
+        )
+
+    def walk(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.json())
+            url = pages[-1]['next']
+        return pages
+
+    def test_cursor_walks_ties_without_gaps_or_duplicates(self):
+        pages = self.walk('/api/rectifier/?limit=2&fields=timestamp,id')
+        rows = [(row['timestamp'], row['id']) for page in pages for row in page['results']]
+        self.assertEqual(rows, self.expected)
+        self.assertEqual(len(pages), 4)
+        self.assertTrue(all(page['previous'] is None and 'count' not in page for page in pages))
+
+    def test_page_param_keeps_page_number_response(self):
+        response = self.client.get('/api/rectifier/?page=2&limit=3&fields=timestamp,id')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['count'], len(self.expected))
+        self.assertIsNotNone(data['previous'])
+        self.assertIsNotNone(data['next'])
+        self.assertEqual([(row['timestamp'], row['id']) for row in data['results']], self.expected[3:6])
@@ -0,0 +1,81 @@
+"""
+Budget query SQL per endpoint API: regresi N+1 (mis. serializer yang
+mengakses relasi per baris) langsung gagal di CI. Data seed berisi beberapa
+site dan beberapa baris per site sehingga query per baris terlihat.
+
+Latency diukur terpisah dengan `python manage.py bench_api`.
+"""
+
+import random
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from monitor import response_cache
+from monitor.decoder import decode_fields
+from monitor.management.commands.bench_ingest import sample_payload
+from monitor.models import RectifierData, Site
+from monitor.rollups import apply_rows
+from monitor.snapshots import upsert_latest
+
+END = 1700000000000
+STEP = 60 * 1000
+SINCE = END - 6 * 3600 * 1000
+
+# Query SQL per request (termasuk lookup versi response cache tanpa Redis)
+QUERY_BUDGETS = {
+    'sites.list': ('/api/sites/', 3),
+    'sites.dashboard': ('/api/sites/QB01/dashboard/', 2),
+    'sites.latest': ('/api/sites/QB01/latest/', 2),
+    'sites.history': ('/api/sites/QB01/history/?limit=1000', 2),
+    'sites.history.1h': (f'/api/sites/QB01/history/?resolution=1h&from={SINCE}', 2),
+    'sites.history.step': (f'/api/sites/QB01/history/?from={SINCE}&step=60000&limit=360', 2),
+    'rectifier.list': ('/api/rectifier/?limit=100', 1),
+    'rectifier.list.site': ('/api/rectifier/?site_code=QB01&limit=500', 1),
+}
+
+
+@override_settings(
+    REDIS_URL='',
+    RESPONSE_CACHE_VERSION_TTL=0,
+    CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'test-query-budgets',
+    }},
+)
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(42)
+        sites = Site.objects.bulk_create([
+            Site(site_code=f'QB{index:02d}', site_name=f'Budget {index}', region='Test', latitude=0, longitude=0)
+            for index in range(1, 6)
+        ])
+        newest = []
+        for site in sites:
+            rows = []
+            for ts in range(END - 119 * STEP, END + 1, STEP):
+                timestamp, fields = decode_fields(sample_payload(rng, ts))
+                rows.append(RectifierData(site=site, timestamp=timestamp, **fields))
+            RectifierData.objects.bulk_create(rows)
+            apply_rows(rows)
+            newest.append(rows[-1])
+        upsert_latest(newest)
+        cls.reading_id = RectifierData.objects.filter(site=sites[0]).values_list('id', flat=True).first()
+
+    def assertWithinBudget(self, url, budget):
+        # Response cache (termasuk versi per proses dari test lain) dikosongkan:
+        # yang diukur selalu jalur DB
+        caches['default'].clear()
+        response_cache._local_versions.clear()
+        with self.assertNumQueries(budget):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+
+    def test_endpoints(self):
+        for name, (url, budget) in QUERY_BUDGETS.items():
+            with self.subTest(name):
+                self.assertWithinBudget(url, budget)
+
+    def test_rectifier_retrieve(self):
+        self.assertWithinBudget(f'/api/rectifier/{self.reading_id}/', 1)
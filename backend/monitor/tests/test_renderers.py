@@ -0,0 +1,46 @@
+import json
+import math
+import struct
+
+from django.test import SimpleTestCase
+
+from monitor.renderers import PackedColumnarRenderer
+
+
+def unpack(body):
+    """-> (header, awal buffer kolom)"""
+    assert body[:4] == b'RCOL'
+    (length,) = struct.unpack_from('<I', body, 4)
+    return json.loads(body[8:8 + length]), 8 + length
+
+
+class PackedColumnarRendererTests(SimpleTestCase):
+    def test_columns_are_8_byte_aligned(self):
+        data = {
+            'ts': [1, 2, 3],
+            'vdc_output': [53.1, 53.2, None],
+            'backup_duration': [10, None, 30],
+            'status_realtime': ['Normal', 'Normal', 'Alarm'],
+        }
+        body = PackedColumnarRenderer().render(data)
+        header, base = unpack(body)
+
+        self.assertEqual(base % 8, 0)
+        columns = {column['name']: column for column in header['columns']}
+        for column in columns.values():
+            self.assertEqual((base + column['offset']) % 8, 0, column['name'])
+
+        backup = columns['backup_duration']
+        values = struct.unpack_from('<3q', body, base + backup['offset'])
+        self.assertEqual(values, (10, 0, 30))
+        self.assertEqual(backup['nulls'], [1])
+
+        vdc = columns['vdc_output']
+        self.assertEqual(vdc['length'], 12)
+        floats = struct.unpack_from('<3f', body, base + vdc['offset'])
+        self.assertAlmostEqual(floats[0], 53.1, places=4)
+        self.assertTrue(math.isnan(floats[2]))
+        self.assertEqual(header['json'], {'status_realtime': ['Normal', 'Normal', 'Alarm']})
+
+    def test_error_response_is_json(self):
+        self.assertEqual(json.loads(PackedColumnarRenderer().render({'detail': 'bad'})), {'detail': 'bad'})
@@ -0,0 +1,88 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from monitor import response_cache
+from monitor.models import RectifierData, Site
+from monitor.snapshots import upsert_latest
+
+TS = 1700000000000
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-response-cache'}}
+
+
+@override_settings(REDIS_URL='', CACHES=LOCMEM, ALLOWED_HOSTS=['a.example', 'b.example'])
+class CachedResponseTests(TestCase):
+    def setUp(self):
+        Site.objects.bulk_create([
+            Site(site_code=f'SITE{index:02d}', site_name=f'Site {index:02d}', latitude=0, longitude=0)
+            for index in range(25)
+        ])
+
+    def test_cached_list_is_per_host(self):
+        first = self.client.get('/api/sites/', HTTP_HOST='a.example')
+        second = self.client.get('/api/sites/', HTTP_HOST='b.example')
+        self.assertTrue(first.json()['next'].startswith('http://a.example/'))
+        self.assertTrue(second.json()['next'].startswith('http://b.example/'))
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+    def test_matching_etag_returns_304(self):
+        etag = self.client.get('/api/sites/', HTTP_HOST='a.example')['ETag']
+        response = self.client.get('/api/sites/', HTTP_HOST='a.example', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+class FakeRedis:
+    """Subset perintah Redis yang dipakai response_cache"""
+
+    def __init__(self):
+        self.data = {}
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value, nx=False):
+        if not (nx and key in self.data):
+            self.data[key] = str(value).encode()
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, b'0')) + 1).encode()
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        pass
+
+
+@override_settings(REDIS_URL='', CACHES=LOCMEM, RESPONSE_CACHE_VERSION_TTL=60)
+class FleetVersionTests(TestCase):
+    def setUp(self):
+        self.site = Site.objects.create(site_code='SITE01', site_name='Site 1', latitude=0, longitude=0)
+        patcher = mock.patch.object(response_cache, '_local_versions', {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def ingest(self, ts):
+        # Seperti writer listener: SiteLatest di-upsert lalu versi cache di-bump
+        rows = [RectifierData(site=self.site, timestamp=ts, vdc_output=53.5, status_realtime='Normal')]
+        upsert_latest(rows)
+        response_cache.bump(rows)
+
+    def assertNewReadingChangesListEtag(self):
+        self.ingest(TS)
+        etag = self.client.get('/api/sites/')['ETag']
+        self.assertEqual(self.client.get('/api/sites/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Nilai list sama, hanya timestamp (last_update) yang maju
+        self.ingest(TS + 1000)
+        response = self.client.get('/api/sites/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_new_reading_changes_list_etag_without_redis(self):
+        self.assertNewReadingChangesListEtag()
+
+    def test_new_reading_changes_list_etag_with_redis(self):
+        with mock.patch.object(response_cache, '_redis', return_value=FakeRedis()):
+            self.assertNewReadingChangesListEtag()
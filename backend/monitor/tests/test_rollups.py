@@ -0,0 +1,52 @@
+from django.test import TestCase
+
+from monitor.models import RectifierData, RectifierRollup, Site
+from monitor.rollups import apply_rows
+
+BUCKET = 1700000000000 - 1700000000000 % (60 * 1000)
+
+
+class ApplyRowsTests(TestCase):
+    def setUp(self):
+        self.site = Site.objects.create(site_code='SITE01', site_name='Site 1', latitude=0, longitude=0)
+
+    def row(self, offset, vdc_output, temperature=None):
+        return RectifierData(
+            site=self.site, timestamp=BUCKET + offset, vdc_output=vdc_output, temperature=temperature
+        )
+
+    def bucket(self):
+        return RectifierRollup.objects.get(site=self.site, resolution='1m', bucket=BUCKET)
+
+    def test_batches_merge_into_existing_bucket(self):
+        apply_rows([self.row(1000, 53.0), self.row(2000, 54.0)])
+        # Batch berikutnya (mis. dari worker lain) untuk bucket yang sama, termasuk sample terlambat
+        apply_rows([self.row(3000, 52.0, temperature=30.0), self.row(500, 55.0)])
+
+        rollup = self.bucket()
+        self.assertEqual(RectifierRollup.objects.filter(resolution='1m').count(), 1)
+        self.assertEqual(rollup.sample_count, 4)
+        self.assertEqual(rollup.last_timestamp, BUCKET + 3000)
+        self.assertEqual(
+            (rollup.vdc_output_min, rollup.vdc_output_max, rollup.vdc_output_sum, rollup.vdc_output_count),
+            (52.0, 55.0, 214.0, 4),
+        )
+        self.assertEqual(rollup.vdc_output_last, 52.0)
+        # Field yang baru terisi di batch kedua: NULL lama tidak menghapus min/max/sum
+        self.assertEqual(
+            (rollup.temperature_min, rollup.temperature_max, rollup.temperature_sum, rollup.temperature_count),
+            (30.0, 30.0, 30.0, 1),
+        )
+
+    def test_late_batch_keeps_newest_last_value(self):
+        apply_rows([self.row(3000, 52.0)])
+        apply_rows([self.row(1000, 53.0)])
+        rollup = self.bucket()
+        self.assertEqual(rollup.last_timestamp, BUCKET + 3000)
+        self.assertEqual(rollup.vdc_output_last, 52.0)
+        self.assertIsNone(rollup.temperature_min)
+        self.assertEqual(rollup.temperature_count, 0)
+
+    def test_single_statement_per_batch(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(apply_rows([self.row(1000, 53.0), self.row(61000, 54.0)]), 4)
@@ -0,0 +1,79 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from monitor.models import Site
+from monitor.site_cache import SiteCache, changed_metadata, site_cache
+
+
+class ChangedMetadataTests(TestCase):
+    def setUp(self):
+        self.site = Site(site_code='SITE01', site_name='Old name', latitude=-6.2, longitude=106.8, ladder='L1')
+
+    def test_only_differing_values(self):
+        payload = {'site_name': 'New name', 'ladder': 'L1', 'latitude': '-6.2', 'region': 'Jakarta'}
+        self.assertEqual(changed_metadata(self.site, payload), {'site_name': 'New name', 'region': 'Jakarta'})
+
+    def test_empty_and_invalid_values_are_ignored(self):
+        payload = {'site_name': '', 'sla': None, 'latitude': 'north'}
+        self.assertEqual(changed_metadata(self.site, payload), {})
+
+
+@override_settings(SITE_METADATA_UPDATE_SECONDS=60, REDIS_URL='')
+class SiteCacheTests(TestCase):
+    def setUp(self):
+        Site.objects.create(site_code='SITE01', site_name='Site 1', latitude=0, longitude=0, sla='Gold')
+        self.cache = SiteCache()
+        self.cache.warm()
+
+    def test_resolve_from_cache_without_queries(self):
+        with self.assertNumQueries(0):
+            site, created = self.cache.resolve('SITE01', {})
+        self.assertFalse(created)
+        self.assertEqual(site.site_code, 'SITE01')
+
+    def test_unknown_site_is_created_once(self):
+        site, created = self.cache.resolve('SITE02', {'site_name': 'Site 2', 'region': 'Bandung'})
+        self.assertTrue(created)
+        self.assertEqual((site.site_name, site.region), ('Site 2', 'Bandung'))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.cache.resolve('SITE02', {})[0].pk, site.pk)
+
+    def test_payload_metadata_change_updates_site(self):
+        site, _ = self.cache.resolve('SITE01', {'sla': 'Platinum', 'ladder': 'L2'})
+        self.assertEqual((site.sla, site.ladder), ('Platinum', 'L2'))
+        stored = Site.objects.get(site_code='SITE01')
+        self.assertEqual((stored.sla, stored.ladder), ('Platinum', 'L2'))
+
+    def test_metadata_updates_are_throttled_per_site(self):
+        self.cache.resolve('SITE01', {'sla': 'Platinum'})
+        with self.assertNumQueries(0):
+            self.cache.resolve('SITE01', {'sla': 'Silver'})
+        self.assertEqual(Site.objects.get(site_code='SITE01').sla, 'Platinum')
+
+        with mock.patch('monitor.site_cache.time.monotonic', return_value=10 ** 9):
+            self.cache.resolve('SITE01', {'sla': 'Silver'})
+        self.assertEqual(Site.objects.get(site_code='SITE01').sla, 'Silver')
+
+    def test_refresh_picks_up_changes_from_other_processes(self):
+        # update() tanpa signal, seperti perubahan dari proses lain (admin)
+        Site.objects.filter(site_code='SITE01').update(site_name='Renamed')
+        self.assertEqual(self.cache.resolve('SITE01', {})[0].site_name, 'Site 1')
+
+        with mock.patch('monitor.site_cache.time.monotonic', return_value=10 ** 9):
+            self.assertEqual(self.cache.resolve('SITE01', {})[0].site_name, 'Renamed')
+
+    def test_save_invalidates_cached_site(self):
+        # Cache global (yang di-invalidate signal); dikosongkan lagi agar tidak bocor ke test lain
+        self.addCleanup(site_cache.invalidate)
+        site_cache.warm()
+        site = Site.objects.get(site_code='SITE01')
+        site.site_name = 'Renamed'
+        site.save()
+        self.assertIsNone(site_cache.peek('SITE01'))
+        self.assertEqual(site_cache.resolve('SITE01', {})[0].site_name, 'Renamed')
+
+    def test_deactivated_site_leaves_cache_on_refresh(self):
+        Site.objects.filter(site_code='SITE01').update(is_active=False)
+        self.cache.warm()
+        self.assertIsNone(self.cache.peek('SITE01'))
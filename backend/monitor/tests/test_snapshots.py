@@ -0,0 +1,40 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from monitor import snapshots
+from monitor.models import RectifierData, Site, SiteLatest
+from monitor.snapshots import upsert_latest
+
+TS = 1700000000000
+
+
+class UpsertLatestTests(TestCase):
+    def setUp(self):
+        self.sites = Site.objects.bulk_create([
+            Site(site_code=f'SITE{index:03d}', site_name=f'Site {index}', latitude=0, longitude=0)
+            for index in range(60)
+        ])
+
+    def rows(self, ts, sites=None):
+        return [RectifierData(site=site, timestamp=ts, vdc_output=ts % 1000) for site in sites or self.sites]
+
+    def test_many_sites_are_upserted_in_chunks(self):
+        # 60 site x 43 kolom melewati batas parameter yang dipaksa kecil ini
+        with mock.patch.object(snapshots, 'MAX_QUERY_PARAMS', 43 * 7):
+            changed = upsert_latest(self.rows(TS))
+        self.assertEqual(changed, {site.pk for site in self.sites})
+        self.assertEqual(SiteLatest.objects.filter(timestamp=TS).count(), 60)
+
+    def test_late_sample_does_not_overwrite_newer_snapshot(self):
+        upsert_latest(self.rows(TS + 1000))
+        late, fresh = self.sites[0], self.sites[1]
+        changed = upsert_latest(self.rows(TS, [late]) + self.rows(TS + 2000, [fresh]))
+        self.assertEqual(changed, {fresh.pk})
+        self.assertEqual(SiteLatest.objects.get(site=late).timestamp, TS + 1000)
+        self.assertEqual(SiteLatest.objects.get(site=fresh).timestamp, TS + 2000)
+
+    def test_newest_row_per_site_wins_within_batch(self):
+        site = self.sites[0]
+        upsert_latest(self.rows(TS + 3000, [site]) + self.rows(TS + 1000, [site]))
+        self.assertEqual(SiteLatest.objects.get(site=site).timestamp, TS + 3000)
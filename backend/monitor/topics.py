@@ -0,0 +1,23 @@
+"""
+Mapping topic MQTT -> site_code, dipakai listener sync
+(mqtt_listener_multisite.py) dan async (mqtt_listener_async.py).
+
+Modul ini sengaja tanpa side effect saat di-import (tidak seperti modul
+listener yang membuat pipeline global), sehingga aman di-import dari proses
+lain dan dari worker ProcessPoolExecutor.
+"""
+
+# Real device topic mapping
+# Topic 'rectifier/data' (real device from Node-RED) -> mapped to NYK Workshop
+REAL_DEVICE_TOPIC = 'rectifier/data'
+REAL_DEVICE_SITE_CODE = 'NYK'
+
+
+def site_code_from_topic(topic):
+    """rectifier/{site_code}/data -> site_code, rectifier/data -> NYK, selain itu None"""
+    if topic == REAL_DEVICE_TOPIC:
+        return REAL_DEVICE_SITE_CODE
+    topic_parts = topic.split('/')
+    if len(topic_parts) == 3:
+        return topic_parts[1]
+    return None
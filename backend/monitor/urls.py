@@ -1,11 +1,16 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import SiteViewSet, RectifierDataViewSet
+from .views import FleetViewSet, ModuleStateViewSet, SiteViewSet, RectifierDataViewSet
+from .streams import site_stream, summary_stream
 
 router = DefaultRouter()
 router.register(r'sites', SiteViewSet, basename='site')
 router.register(r'rectifier', RectifierDataViewSet, basename='rectifier')
+router.register(r'modules', ModuleStateViewSet, basename='module-state')
+router.register(r'fleet', FleetViewSet, basename='fleet')
 
 urlpatterns = [
+    path('stream/sites/<str:site_code>/', site_stream, name='site-stream'),
+    path('stream/summary/', summary_stream, name='summary-stream'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
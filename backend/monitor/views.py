@@ -1,14 +1,79 @@
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import parse_etags
+from django.utils.text import get_valid_filename
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from .models import Site, RectifierData
+from rest_framework.settings import api_settings
+from . import archive, fleet
+from .deadband import forward_fill, hold_ms, mark_storage
+from .exports import EXPORT_FORMATS, export_response
+from .models import (
+    MODULE_FAULT_STATUSES,
+    ROLLUP_RESOLUTIONS,
+    ModuleState,
+    RectifierData,
+    RectifierRollup,
+    Site,
+    SiteLatest,
+)
+from .pagination import TimestampCursorPagination
+from .renderers import COLUMNAR_FORMATS, COLUMNAR_RENDERERS
+from .response_cache import cached_response
 from .serializers import (
     SiteListSerializer,
     SiteDetailSerializer,
+    ModuleStateSerializer,
+    RectifierDataProjection,
     RectifierDataSerializer,
+    RectifierRollupSerializer,
+    SiteLatestSerializer,
     DashboardDataSerializer,
+    parse_fields_param,
+    rows_to_columns,
 )
 
+# Maksimum bucket rollup per request history
+HISTORY_MAX_BUCKETS = 5000
+
+
+def parse_time_param(value, name):
+    """Query param waktu: epoch ms atau ISO datetime -> epoch ms"""
+    if value is None or value == '':
+        return None
+    if value.lstrip('-').isdigit():
+        return int(value)
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValidationError({name: 'Use epoch milliseconds or an ISO 8601 datetime.'})
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return int(parsed.timestamp() * 1000)
+
+
+def parse_step_param(value):
+    """?step=<ms> -> int > 0 (None jika tidak diisi)"""
+    if value is None or value == '':
+        return None
+    if not value.isdigit() or int(value) <= 0:
+        raise ValidationError({'step': 'Use a positive number of milliseconds.'})
+    return int(value)
+
+
+def auto_resolution(start, end):
+    """Pilih tier rollup berdasarkan rentang waktu (target < ~1000 titik)"""
+    span = end - start
+    if span <= 6 * ROLLUP_RESOLUTIONS['1h']:
+        return '1m'
+    if span <= 7 * 24 * ROLLUP_RESOLUTIONS['1h']:
+        return '15m'
+    return '1h'
+
 
 class SiteViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -18,8 +83,11 @@ class SiteViewSet(viewsets.ReadOnlyModelViewSet):
     - GET /api/sites/                         - List semua site dengan latest data
     - GET /api/sites/{site_code}/             - Detail site
     - GET /api/sites/{site_code}/dashboard/   - Dashboard data
-    - GET /api/sites/{site_code}/history/     - Historical data
+    - GET /api/sites/{site_code}/history/     - Historical data (raw / rollup)
     - GET /api/sites/{site_code}/latest/      - Data terbaru saja
+
+    list, dashboard dan latest di-cache per versi data site dan mendukung
+    ETag / If-None-Match (lihat monitor/response_cache.py).
     """
     queryset = Site.objects.filter(is_active=True)
     lookup_field = 'site_code'
@@ -35,11 +103,10 @@ class SiteViewSet(viewsets.ReadOnlyModelViewSet):
         Sebelumnya menggunakan prefetch_related('rectifier_data') yang memuat
         SELURUH histori data ke memory → menyebabkan OOM dan WORKER TIMEOUT.
 
-        Sekarang: hanya filter site yang aktif, tanpa prefetch apapun.
-        SiteListSerializer akan fetch 1 row terbaru per site secara efisien
-        menggunakan _latest_data_cache.
+        Sekarang: hanya filter site yang aktif, dan join ke snapshot SiteLatest
+        (1 row per site) sehingga list tetap 1 query berapapun ukuran histori.
         """
-        queryset = Site.objects.filter(is_active=True)
+        queryset = Site.objects.filter(is_active=True).select_related('latest')
 
         # Filter by region
         region = self.request.query_params.get('region')
@@ -48,11 +115,23 @@ class SiteViewSet(viewsets.ReadOnlyModelViewSet):
 
         return queryset
 
+    def _get_latest_snapshot(self, site_code):
+        """SiteLatest + Site dalam 1 query (None jika site tidak ada / belum ada data)"""
+        return (
+            SiteLatest.objects.select_related('site')
+            .filter(site__site_code=site_code, site__is_active=True)
+            .first()
+        )
+
+    @cached_response('list')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     @action(detail=True, methods=['get'])
+    @cached_response('dashboard')
     def dashboard(self, request, site_code=None):
         """Get dashboard data untuk specific site"""
-        site = self.get_object()
-        latest_data = site.get_latest_data()
+        latest_data = self._get_latest_snapshot(site_code)
 
         if not latest_data:
             return Response(
@@ -63,24 +142,105 @@ class SiteViewSet(viewsets.ReadOnlyModelViewSet):
         serializer = DashboardDataSerializer(latest_data)
         return Response(serializer.data)
 
-    @action(detail=True, methods=['get'])
+    @action(
+        detail=True,
+        methods=['get'],
+        renderer_classes=[*api_settings.DEFAULT_RENDERER_CLASSES, *COLUMNAR_RENDERERS],
+    )
     def history(self, request, site_code=None):
-        """Get historical data untuk specific site (max 1000 row)"""
+        """
+        Get historical data untuk specific site
+
+        Query params:
+        - resolution: raw (default, max 1000 row) | 1m | 15m | 1h | auto
+                      (raw + from: rentang yang sudah diarsip dibaca dari Parquet)
+        - from, to  : epoch ms atau ISO datetime
+        - limit     : jumlah row/bucket terbaru jika from tidak diisi
+        - fields    : (raw) subset kolom, mis. fields=timestamp,vdc_output
+        - step      : (raw, butuh from) ms antar titik; nilai step-wise dari baris
+                      tersimpan terakhir (untuk data INGEST_STORAGE_MODE=deadband),
+                      maks `limit` titik
+        - format    : columnar -> {"ts": [...], "vdc_output": [...], ...}
+                      packed   -> binary float32/int64 (lihat renderers.py)
+                      msgpack  -> MessagePack columnar (jika msgpack terinstall)
+        """
         site = self.get_object()
+        columnar = request.accepted_renderer.format in COLUMNAR_FORMATS
+
+        start = parse_time_param(request.query_params.get('from'), 'from')
+        end = parse_time_param(request.query_params.get('to'), 'to')
+        resolution = request.query_params.get('resolution', 'raw')
+
+        if resolution == 'auto':
+            if start is None:
+                raise ValidationError({'resolution': "'auto' requires 'from'."})
+            resolution = auto_resolution(start, end or int(time.time() * 1000))
+        elif resolution != 'raw' and resolution not in ROLLUP_RESOLUTIONS:
+            raise ValidationError({
+                'resolution': f"Choose from raw, auto, {', '.join(ROLLUP_RESOLUTIONS)}."
+            })
 
         limit = int(request.query_params.get('limit', 100))
-        if limit > 1000:
-            limit = 1000
 
-        data = RectifierData.objects.filter(site=site).order_by('-timestamp')[:limit]
-        serializer = RectifierDataSerializer(data, many=True)
+        if resolution == 'raw':
+            if limit > 1000:
+                limit = 1000
+            data = RectifierData.objects.filter(site=site)
+            if start is not None:
+                data = data.filter(timestamp__gte=start)
+            if end is not None:
+                data = data.filter(timestamp__lt=end)
+            fields = parse_fields_param(request.query_params.get('fields'))
+            step = parse_step_param(request.query_params.get('step'))
+            if (columnar or step) and fields and 'timestamp' not in fields:
+                fields = ['timestamp', *fields]
+            projection = RectifierDataProjection(fields)
+
+            if step is not None:
+                if start is None:
+                    raise ValidationError({'step': "'step' requires 'from'."})
+                end = min(end or int(time.time() * 1000), start + step * limit)
+                hold = hold_ms()
+                source = projection.values(
+                    RectifierData.objects
+                    .filter(site=site, timestamp__gte=start - hold, timestamp__lt=end)
+                    .order_by('timestamp')
+                ).iterator()
+                rows = forward_fill(source, start, end, step, projection.fields.index('timestamp'), hold)
+                if columnar:
+                    return Response(projection.columns(rows))
+                return Response(projection.encode(rows))
+
+            rows = list(projection.values(data.order_by('-timestamp')[:limit]))
+
+            # Rentang yang sudah dihapus dari tabel live dibaca dari arsip Parquet
+            if start is not None and len(rows) < limit and archive.pa is not None:
+                oldest = data.order_by('timestamp').values_list('timestamp', flat=True).first()
+                boundary = oldest if oldest is not None else (end or int(time.time() * 1000) + 1)
+                archived = archive.read_rows(site, start, boundary, limit=limit - len(rows))
+                rows += [tuple(row[name] for name in projection.fields) for row in archived]
+
+            if columnar:
+                return Response(projection.columns(rows))
+            return Response(projection.encode(rows))
+
+        buckets = RectifierRollup.objects.filter(site=site, resolution=resolution)
+        if start is not None:
+            buckets = buckets.filter(bucket__gte=start - start % ROLLUP_RESOLUTIONS[resolution])
+            limit = HISTORY_MAX_BUCKETS
+        if end is not None:
+            buckets = buckets.filter(bucket__lt=end)
+        buckets = buckets.order_by('-bucket')[:min(limit, HISTORY_MAX_BUCKETS)]
+        serializer = RectifierRollupSerializer(buckets, many=True)
+        if columnar:
+            return Response(rows_to_columns(serializer.data, 'bucket'))
         return Response(serializer.data)
 
     @action(detail=True, methods=['get'])
+    @cached_response('latest')
     def latest(self, request, site_code=None):
         """Get latest data saja untuk specific site"""
-        site = self.get_object()
-        latest_data = site.get_latest_data()
+        latest_data = self._get_latest_snapshot(site_code)
 
         if not latest_data:
             return Response(
@@ -88,26 +248,133 @@ class SiteViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        serializer = RectifierDataSerializer(latest_data)
+        serializer = SiteLatestSerializer(latest_data)
         return Response(serializer.data)
 
 
 class RectifierDataViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet untuk RectifierData (backward compatibility)
+
+    Query params (list):
+    - site_code : filter site
+    - from, to  : epoch ms atau ISO datetime
+    - fields    : subset kolom, mis. fields=timestamp,vdc_output
+    - limit     : ukuran halaman (max 1000); halaman berikutnya lewat 'next'
+                  (keyset cursor, tanpa COUNT(*)); response tanpa 'count'
+                  dan 'previous' selalu null
+    - page      : page number lama ({count, next, previous, results}) untuk
+                  consumer yang masih membutuhkannya (COUNT(*) + OFFSET)
+    - export    : ndjson | csv -> streaming semua row dalam filter (tanpa limit)
+
+    Dengan INGEST_STORAGE_MODE=deadband hanya baris tersimpan (change-only) yang
+    dikembalikan; response list/export membawa header X-Storage-Mode: deadband
+    dan X-Storage-Hint yang menunjuk ke /api/sites/{code}/history/?step=<ms>.
     """
     queryset = RectifierData.objects.all()
     serializer_class = RectifierDataSerializer
+    pagination_class = TimestampCursorPagination
+
+    def get_queryset(self):
+        queryset = RectifierData.objects.select_related('site')
+
+        site_code = self.request.query_params.get('site_code')
+        if site_code:
+            queryset = queryset.filter(site__site_code=site_code)
+
+        if self.action == 'list':
+            start = parse_time_param(self.request.query_params.get('from'), 'from')
+            end = parse_time_param(self.request.query_params.get('to'), 'to')
+            if start is not None:
+                queryset = queryset.filter(timestamp__gte=start)
+            if end is not None:
+                queryset = queryset.filter(timestamp__lt=end)
+
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        projection = RectifierDataProjection(parse_fields_param(request.query_params.get('fields')))
+        queryset = self.filter_queryset(self.get_queryset())
+
+        export_format = request.query_params.get('export')
+        if export_format:
+            if export_format not in EXPORT_FORMATS:
+                raise ValidationError({'export': f"Choose from {', '.join(EXPORT_FORMATS)}."})
+            filename = get_valid_filename('rectifier_{}_{}'.format(
+                request.query_params.get('site_code') or 'all',
+                request.query_params.get('from') or 'all',
+            ))
+            return mark_storage(export_response(request, projection, queryset, export_format, filename))
+
+        values = projection.values(queryset, *self.paginator.key_lookups)
+        page = self.paginate_queryset(values)
+        return mark_storage(self.get_paginated_response(projection.encode(page)))
+
+
+class ModuleStateViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet untuk transisi status modul (ModuleState)
+
+    Endpoints:
+    - GET /api/modules/          - riwayat transisi, terbaru dulu
+    - GET /api/modules/faults/   - modul yang SAAT INI fault di semua site
+                                   (dari partial index until IS NULL, bukan
+                                   scan modules_status di RectifierData)
+
+    Query params:
+    - site_code : filter site
+    - module_id : (list) filter modul
+    - status    : daftar status dipisah koma (faults default: Fault,Protect)
+    """
+    queryset = ModuleState.objects.all()
+    serializer_class = ModuleStateSerializer
 
     def get_queryset(self):
-        queryset = RectifierData.objects.all()
+        queryset = ModuleState.objects.select_related('site').filter(site__is_active=True)
 
         site_code = self.request.query_params.get('site_code')
         if site_code:
             queryset = queryset.filter(site__site_code=site_code)
 
-        limit = int(self.request.query_params.get('limit', 100))
-        if limit > 1000:
-            limit = 1000
+        module_id = self.request.query_params.get('module_id')
+        if module_id:
+            queryset = queryset.filter(module_id=module_id)
+
+        statuses = self.request.query_params.get('status')
+        if statuses:
+            queryset = queryset.filter(status__in=[name.strip() for name in statuses.split(',')])
+        elif self.action == 'faults':
+            queryset = queryset.filter(status__in=MODULE_FAULT_STATUSES)
+
+        return queryset.order_by('-since')
+
+    @action(detail=False, methods=['get'])
+    def faults(self, request):
+        """Status modul saat ini (until IS NULL) yang termasuk fault"""
+        queryset = self.get_queryset().filter(until__isnull=True)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+
+class FleetViewSet(viewsets.ViewSet):
+    """
+    Agregat semua site aktif (untuk halaman map)
+
+    Endpoints:
+    - GET /api/fleet/summary/ - jumlah site per status & region, min/avg/max
+                                vdc_output dan temperature (1 query, cache
+                                FLEET_SUMMARY_TTL detik, ETag / 304)
+    """
 
-        return queryset.order_by('-timestamp')[:limit]
\ No newline at end of file
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        data, etag = fleet.cached_summary()
+        headers = {
+            'ETag': etag,
+            'Cache-Control': f'max-age={settings.FLEET_SUMMARY_TTL}',
+        }
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(data, headers=headers)
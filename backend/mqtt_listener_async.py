@@ -0,0 +1,461 @@
+"""
+MQTT Listener Multi-Site (asyncio) - alternatif mqtt_listener_multisite.py
+
+Alur:
+  aiomqtt (async for)  --raw queue (bounded)-->  batcher
+  batcher : potong per INGEST_DECODE_CHUNK pesan, decode JSON di ProcessPoolExecutor
+  router  : ambil hasil decode sesuai urutan, buang redelivery (RecentWindowFilter),
+            resolve site (SiteCache), bagi ke
+            ASYNC_INGEST_WRITERS writer berdasarkan crc32(site_code), sehingga
+            1 site selalu ditulis oleh writer yang sama (urutan per site terjaga)
+  writer  : batch per INGEST_BATCH_SIZE / INGEST_FLUSH_INTERVAL_MS -> COPY lewat
+            psycopg AsyncConnectionPool (monitor/pgcopy.py) setelah baris yang
+            sudah ada di DB dibuang (monitor/dedup.py), lalu SiteLatest +
+            rollup + live publish di thread Django (sync_to_async)
+
+Metrics (monitor/metrics.py) di http://<host>:LISTENER_METRICS_PORT/metrics.
+
+Writer berjalan paralel, jadi 1 insert yang lambat tidak menahan site lain.
+Batch yang ditolak karena 1 baris rusak dibagi 2 sampai baris itu ketemu.
+Koneksi DB putus: batch dicoba ulang dengan backoff (tidak di-spool seperti
+IngestPipeline; pesan tertahan di queue writer/aiomqtt).
+SiteLatest/rollup ditulis di transaksi terpisah setelah COPY commit; jika
+gagal, baris tersebut diulang bersama flush berikutnya writer yang sama
+(lihat _update_latest). Listener mati sebelum itu berhasil: rollup bisa
+dibangun ulang dengan `python manage.py rebuild_rollups`.
+
+Butuh PostgreSQL, aiomqtt dan psycopg[binary,pool]. Untuk SQLite/dev pakai
+mqtt_listener_multisite.py.
+
+Cara pakai:
+    python mqtt_listener_async.py
+"""
+
+import os
+import sys
+import time
+import django
+import asyncio
+import logging
+import random
+import signal
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rectifier_monitor.settings')
+django.setup()
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from monitor import live, response_cache
+from monitor.decoder import PayloadError, decode_message
+from monitor.deadband import DeadbandFilter, storage_enabled
+from monitor.dedup import DUPLICATE, LATE, RecentWindowFilter, drop_existing_async
+from monitor.ingestion import IngestStats
+from monitor.metrics import INGEST_QUEUE_DEPTH, start_http_server
+from monitor.models import RectifierData
+from monitor.module_states import apply_modules
+from monitor.pgcopy import copy_rows_async
+from monitor.rollups import apply_rows
+from monitor.sharding import shard_of
+from monitor.site_cache import site_cache
+from monitor.snapshots import upsert_latest
+from monitor.topics import REAL_DEVICE_TOPIC, site_code_from_topic
+
+try:
+    import aiomqtt
+    import psycopg
+    from psycopg.conninfo import make_conninfo
+    from psycopg_pool import AsyncConnectionPool, PoolTimeout
+except ImportError:
+    aiomqtt = None
+    AsyncConnectionPool = None
+
+# Koneksi / pool bermasalah: batch gagal utuh. Error lain (data) -> batch dibagi 2.
+CONNECTION_ERRORS = (
+    (psycopg.OperationalError, psycopg.InterfaceError, PoolTimeout) if AsyncConnectionPool else ()
+)
+
+logging.basicConfig(
+    level=settings.LISTENER_LOG_LEVEL,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+# Field payload yang dipakai saat site_code baru dibuat (SiteCache.resolve)
+SITE_KEYS = ('site_name', 'latitude', 'longitude', 'region', 'project_id', 'ladder', 'sla')
+
+
+def decode_messages(messages):
+    """
+    Dijalankan di process pool: [(topic, payload bytes)] ->
+    ([(site_code, ts, kolom telemetri, info site)], [(site_code, alasan reject)], total decode us)
+    """
+    decoded = []
+    rejected = []
+    start = time.perf_counter()
+    for topic, raw in messages:
+        site_code = site_code_from_topic(topic)
+        if site_code is None:
+            rejected.append((None, f'invalid topic {topic}'))
+            continue
+        try:
+            ts, fields, payload = decode_message(raw)
+        except PayloadError as e:
+            rejected.append((site_code, f'{site_code}: {e}'))
+            continue
+        site_info = {key: payload[key] for key in SITE_KEYS if key in payload}
+        decoded.append((site_code, ts, fields, site_info))
+    return decoded, rejected, (time.perf_counter() - start) * 1e6
+
+
+def _after_copy(rows):
+    """ModuleState + SiteLatest + rollup + live publish + versi cache response (thread Django)"""
+    close_old_connections()
+    with transaction.atomic():
+        apply_modules(rows)
+        changed = upsert_latest(rows)
+        apply_rows(rows)
+    fresh = [row for row in rows if row.site_id in changed]
+    live.publish(fresh)
+    response_cache.bump(fresh)
+
+
+def _conninfo():
+    db = settings.DATABASES['default']
+    return make_conninfo(
+        dbname=db['NAME'], user=db['USER'], password=db['PASSWORD'],
+        host=db['HOST'], port=db['PORT'],
+    )
+
+
+class AsyncIngestService:
+    def __init__(self, writers=None, batch_size=None, flush_interval_ms=None,
+                 queue_size=None, decode_workers=None, decode_chunk=None):
+        self.writers = writers or settings.ASYNC_INGEST_WRITERS
+        self.batch_size = batch_size or settings.INGEST_BATCH_SIZE
+        self.flush_interval = (flush_interval_ms or settings.INGEST_FLUSH_INTERVAL_MS) / 1000.0
+        self.decode_workers = decode_workers or settings.INGEST_DECODE_WORKERS
+        self.decode_chunk = decode_chunk or settings.INGEST_DECODE_CHUNK
+        self.retry_interval = settings.INGEST_SPOOL_RETRY_SECONDS
+        self.stopping = False
+        queue_size = self.queue_size = queue_size or settings.INGEST_QUEUE_SIZE
+
+        self.stats = IngestStats()
+        self.recent = RecentWindowFilter()
+        self.raw_queue = asyncio.Queue(maxsize=queue_size)
+        self.decoded = asyncio.Queue(maxsize=self.decode_workers * 2)
+        # 1 filter per writer: site selalu ditulis writer yang sama
+        self.deadbands = [
+            DeadbandFilter() if storage_enabled() else None
+            for _ in range(self.writers)
+        ]
+        # Baris yang sudah di-COPY tapi _after_copy-nya gagal (per writer)
+        self.latest_pending = [[] for _ in range(self.writers)]
+        self.writer_queues = [
+            asyncio.Queue(maxsize=max(queue_size // self.writers, self.batch_size))
+            for _ in range(self.writers)
+        ]
+
+    @property
+    def depth(self):
+        return self.raw_queue.qsize() + sum(q.qsize() for q in self.writer_queues)
+
+    async def run(self, stop):
+        pool = AsyncConnectionPool(_conninfo(), min_size=1, max_size=self.writers, open=False)
+        await pool.open()
+        executor = ProcessPoolExecutor(
+            self.decode_workers, mp_context=multiprocessing.get_context('spawn')
+        )
+        await sync_to_async(site_cache.warm)()
+        INGEST_QUEUE_DEPTH.set_function(lambda: self.depth)
+        start_http_server(settings.LISTENER_METRICS_PORT)
+
+        tasks = [
+            asyncio.create_task(self._batch(executor)),
+            asyncio.create_task(self._route()),
+            *[asyncio.create_task(self._write(index, pool)) for index in range(self.writers)],
+        ]
+        reporter = asyncio.create_task(self._report())
+        logger.info(
+            f"✓ Async ingest started (writers={self.writers}, decode_workers={self.decode_workers}, "
+            f"batch={self.batch_size}, interval={int(self.flush_interval * 1000)}ms)"
+        )
+
+        try:
+            await self._consume(stop)
+        finally:
+            # Drain: sentinel mengalir batcher -> router -> semua writer
+            self.stopping = True
+            await self.raw_queue.put(_DONE)
+            await asyncio.gather(*tasks, return_exceptions=True)
+            reporter.cancel()
+            executor.shutdown()
+            await pool.close()
+            logger.info(f"Async ingest stopped: {self.stats.snapshot()}")
+
+    async def _consume(self, stop):
+        client_id = f"{settings.MQTT_CLIENT_ID}_async_{random.randint(1000, 9999)}"
+        while not stop.is_set():
+            try:
+                async with aiomqtt.Client(
+                    hostname=settings.MQTT_BROKER,
+                    port=settings.MQTT_PORT,
+                    username=settings.MQTT_USERNAME or None,
+                    password=settings.MQTT_PASSWORD or None,
+                    client_id=client_id,
+                ) as client:
+                    async with client.messages(queue_maxsize=settings.INGEST_QUEUE_SIZE) as messages:
+                        await client.subscribe(settings.MQTT_TOPIC_PATTERN)
+                        await client.subscribe(REAL_DEVICE_TOPIC)
+                        logger.info(f"✓ Connected to MQTT Broker: {settings.MQTT_BROKER}")
+                        reader = asyncio.create_task(self._read(messages))
+                        waiter = asyncio.create_task(stop.wait())
+                        await asyncio.wait({reader, waiter}, return_when=asyncio.FIRST_COMPLETED)
+                        waiter.cancel()
+                        if not reader.done():
+                            reader.cancel()
+                        elif reader.exception() is not None:
+                            raise reader.exception()
+            except aiomqtt.MqttError as e:
+                logger.error(f"✗ MQTT connection lost: {e}, reconnecting in 5s")
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _read(self, messages):
+        async for message in messages:
+            self.stats.incr('received', site=site_code_from_topic(message.topic.value))
+            # Raw queue penuh -> pesan menunggu di queue aiomqtt (maks INGEST_QUEUE_SIZE,
+            # setelah itu di-drop oleh aiomqtt)
+            await self.raw_queue.put((message.topic.value, message.payload))
+
+    async def _batch(self, executor):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self.raw_queue.get()
+            done = item is _DONE
+            chunk = [] if done else [item]
+            while not done and len(chunk) < self.decode_chunk:
+                try:
+                    item = self.raw_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is _DONE:
+                    done = True
+                else:
+                    chunk.append(item)
+            if chunk:
+                await self.decoded.put(loop.run_in_executor(executor, decode_messages, chunk))
+            if done:
+                await self.decoded.put(_DONE)
+                return
+
+    async def _route(self):
+        while True:
+            future = await self.decoded.get()
+            if future is _DONE:
+                for queue in self.writer_queues:
+                    await queue.put(_DONE)
+                return
+
+            try:
+                decoded, rejected, elapsed_us = await future
+            except Exception as e:
+                logger.error(f"✗ Decode failed: {e}")
+                continue
+            if rejected:
+                for site_code, _ in rejected:
+                    self.stats.incr('rejected', site=site_code)
+                logger.warning(f"✗ {len(rejected)} payload(s) rejected, e.g. {rejected[0][1]}")
+            self.stats.record_decode(elapsed_us, len(decoded) + len(rejected))
+
+            for site_code, ts, fields, site_info in decoded:
+                verdict = self.recent.check(site_code, ts)
+                if verdict == DUPLICATE:
+                    self.stats.incr('duplicates')
+                    continue
+                if verdict == LATE:
+                    self.stats.incr('late')
+                site = site_cache.peek(site_code)
+                if site is None:
+                    site, created = await sync_to_async(site_cache.resolve)(site_code, site_info)
+                    if created:
+                        logger.info(f"✓ New site created: {site_code}")
+                else:
+                    updates = site_cache.metadata_updates(site, site_info)
+                    if updates:
+                        await sync_to_async(site_cache.update_metadata)(site, updates)
+                row = RectifierData(site=site, timestamp=ts, **fields)
+                await self.writer_queues[shard_of(site_code, self.writers)].put(row)
+
+    async def _write(self, index, pool):
+        loop = asyncio.get_running_loop()
+        queue = self.writer_queues[index]
+        batch = []
+        deadline = None
+        while True:
+            timeout = max(deadline - loop.time(), 0) if batch else None
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                item = None
+
+            if item is _DONE:
+                if batch:
+                    await self._flush(pool, batch, index)
+                else:
+                    await self._update_latest(index, [])
+                return
+
+            if item is not None:
+                if not batch:
+                    deadline = loop.time() + self.flush_interval
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+            elif not batch:
+                continue
+
+            await self._flush(pool, batch, index)
+            batch = []
+
+    async def _flush(self, pool, batch, index):
+        """
+        COPY 1 batch lalu ModuleState/SiteLatest/rollup (_after_copy).
+
+        Koneksi DB putus (CONNECTION_ERRORS): batch yang sama dicoba ulang
+        dengan backoff (1s, 2s, ... maks INGEST_SPOOL_RETRY_SECONDS),
+        sementara queue writer menahan pesan berikutnya (backpressure ke
+        router / aiomqtt). Baris yang sudah tersimpan sebelum koneksi putus
+        dibuang drop_existing saat percobaan ulang. Saat shutdown batch yang
+        masih gagal dihitung 'dropped'.
+        """
+        delay = 1.0
+        while True:
+            start = time.perf_counter()
+            try:
+                rows = await self._copy(pool, batch, self.deadbands[index])
+                break
+            except CONNECTION_ERRORS as e:
+                self.stats.record_flush(len(batch), (time.perf_counter() - start) * 1000, ok=False)
+                if self.stopping:
+                    self.stats.incr('dropped', len(batch))
+                    logger.error(f"✗ COPY failed during shutdown, {len(batch)} rows dropped: {e}")
+                    return
+                logger.error(f"✗ COPY failed ({len(batch)} rows), retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.retry_interval)
+        await self._update_latest(index, rows)
+
+    async def _update_latest(self, index, rows):
+        """
+        _after_copy untuk baris yang baru di-COPY plus baris writer ini yang
+        sebelumnya gagal. COPY dan _after_copy tidak bisa 1 transaksi
+        (koneksi psycopg async vs ORM Django), jadi jika _after_copy gagal
+        barisnya disimpan dan diulang di flush berikutnya (1 transaksi,
+        all-or-nothing, sehingga rollup tidak terhitung 2x). Lebih dari
+        INGEST_QUEUE_SIZE baris tertunda -> dibuang dengan error (jalankan
+        `python manage.py rebuild_rollups`).
+        """
+        rows = self.latest_pending[index] + rows
+        if not rows:
+            return
+        try:
+            await sync_to_async(_after_copy, thread_sensitive=False)(rows)
+        except Exception as e:
+            if len(rows) > self.queue_size:
+                self.latest_pending[index] = []
+                logger.error(
+                    f"✗ SiteLatest/rollup update failed ({len(rows)} rows pending), giving up - "
+                    f"run rebuild_rollups: {e}"
+                )
+            else:
+                self.latest_pending[index] = rows
+                logger.error(f"✗ SiteLatest/rollup update failed ({len(rows)} rows), retried with next flush: {e}")
+        else:
+            self.latest_pending[index] = []
+
+    async def _copy(self, pool, batch, deadband=None):
+        """
+        COPY dalam 1 transaksi, return baris non-duplikat (input _after_copy).
+        Jika ditolak karena data (DataError, IntegrityError, ...) batch dibagi
+        2 dan di-COPY ulang sampai baris rusak ketemu, jadi hanya baris itu
+        yang hilang. CONNECTION_ERRORS diteruskan ke _flush.
+        """
+        start = time.perf_counter()
+        try:
+            async with pool.connection() as conn:
+                async with conn.transaction():
+                    rows = await drop_existing_async(conn, batch)
+                    stored = rows
+                    if deadband is not None:
+                        stored, pending = deadband.select(rows)
+                    await copy_rows_async(conn, stored)
+        except CONNECTION_ERRORS:
+            raise
+        except Exception as e:
+            if len(batch) == 1:
+                row = batch[0]
+                self.stats.incr('failed')
+                logger.error(f"✗ Row rejected by database - {row.site.site_code} ts={row.timestamp}: {e}")
+                return []
+            middle = len(batch) // 2
+            logger.warning(f"✗ COPY failed ({len(batch)} rows), retrying in halves: {e}")
+            return (
+                await self._copy(pool, batch[:middle], deadband)
+                + await self._copy(pool, batch[middle:], deadband)
+            )
+
+        if deadband is not None:
+            deadband.commit(pending)
+        if len(rows) < len(batch):
+            self.stats.incr('duplicates', len(batch) - len(rows))
+        if len(stored) < len(rows):
+            self.stats.incr('suppressed', len(rows) - len(stored))
+        self.stats.record_flush(len(stored), (time.perf_counter() - start) * 1000)
+        self.stats.record_rows(rows, stored)
+        return rows
+
+    async def _report(self):
+        interval = settings.INGEST_STATS_INTERVAL
+        last_stored = 0
+        while True:
+            await asyncio.sleep(interval)
+            snapshot = self.stats.snapshot()
+            rate = (snapshot['stored'] - last_stored) / interval
+            last_stored = snapshot['stored']
+            logger.info(f"[async] Ingest stats: depth={self.depth} rows/s={rate:.1f} {snapshot}")
+            await sync_to_async(site_cache.refresh_if_due)()
+
+
+async def _main():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+    await AsyncIngestService().run(stop)
+
+
+def main():
+    logger.info("=" * 50)
+    logger.info("MQTT Listener Multi-Site (asyncio) Starting...")
+    logger.info("=" * 50)
+
+    if aiomqtt is None or AsyncConnectionPool is None:
+        logger.error("✗ aiomqtt / psycopg_pool belum terinstall (pip install aiomqtt 'psycopg[binary,pool]')")
+        sys.exit(1)
+    if connection.vendor != 'postgresql':
+        logger.error("✗ Async listener butuh PostgreSQL, pakai mqtt_listener_multisite.py untuk SQLite")
+        sys.exit(1)
+
+    asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    main()
@@ -4,14 +4,40 @@ Subscribe ke:
   - rectifier/+/data   (simulated sites)
   - rectifier/data      (real device -> mapped to JKT)
 Parse site_code dari topic
+
+Penulisan ke DB dilakukan oleh IngestPipeline (monitor/ingestion.py):
+on_message hanya parse + enqueue, writer thread melakukan bulk_create.
+Pesan yang dikirim ulang broker (QoS 1) dibuang oleh RecentWindowFilter
+sebelum masuk queue (monitor/dedup.py).
+
+Metrics (monitor/metrics.py) di http://<host>:LISTENER_METRICS_PORT/metrics
+(worker ke-i: port + i). Log per pesan hanya jika LISTENER_LOG_LEVEL=DEBUG,
+atau 1 dari INGEST_LOG_SAMPLE pesan.
+
+DB tidak tersedia / lambat: pesan mentah ditulis ke spool lokal
+INGEST_SPOOL_DIR/worker-<index> dan diputar ulang otomatis setelah DB
+kembali (monitor/spool.py).
+
+Multi-worker (lihat monitor/sharding.py):
+  python mqtt_listener_multisite.py --workers 4               # 4 proses, mode hash
+  python mqtt_listener_multisite.py --workers 4 --mode shared # $share/<group>/...
+  python mqtt_listener_multisite.py --workers 4 --worker-index 0  # 1 worker saja
+
+Rekam pesan mentah untuk replay (monitor/recording.py, 1 file per worker
+jika --workers > 1: capture.rec.0, capture.rec.1, ...):
+  python mqtt_listener_multisite.py --record capture.rec
+  python manage.py replay_mqtt capture.rec --speed max
 """
 
 import os
 import sys
-import json
+import time
 import django
 import logging
+import argparse
+import multiprocessing
 import random
+import signal
 
 # Setup Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rectifier_monitor.settings')
@@ -19,137 +45,142 @@ django.setup()
 
 import paho.mqtt.client as mqtt
 from django.conf import settings
-from monitor.models import Site, RectifierData
+from django.db import DatabaseError
+from monitor.models import RectifierData
+from monitor.decoder import PayloadError, decode_message
+from monitor.dedup import DUPLICATE, LATE, RecentWindowFilter
+from monitor.ingestion import IngestPipeline
+from monitor.metrics import LogSampler, start_http_server
+from monitor.recording import RecordWriter
+from monitor.sharding import SHARD_MODES, ShardPlan
+from monitor.site_cache import site_cache
+from monitor.spool import Spool
+from monitor.topics import REAL_DEVICE_SITE_CODE, REAL_DEVICE_TOPIC, site_code_from_topic
 
 logging.basicConfig(
-    level=logging.INFO,
+    level=settings.LISTENER_LOG_LEVEL,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
-# Real device topic mapping
-# Topic 'rectifier/data' (real device from Node-RED) -> mapped to NYK Workshop
-REAL_DEVICE_TOPIC = 'rectifier/data'
-REAL_DEVICE_SITE_CODE = 'NYK'
+shard = ShardPlan()
+pipeline = IngestPipeline()
+recent = RecentWindowFilter()
+recorder = None
+message_log = LogSampler(logger, settings.INGEST_LOG_SAMPLE)
 
 
 def on_connect(client, userdata, flags, rc):
     if rc == 0:
-        logger.info(f"✓ Connected to MQTT Broker: {settings.MQTT_BROKER}")
+        logger.info(f"✓ Connected to MQTT Broker: {settings.MQTT_BROKER} as {shard.label}")
         # Subscribe to simulated multi-site topics
-        client.subscribe(settings.MQTT_TOPIC_PATTERN)
-        logger.info(f"✓ Subscribed to: {settings.MQTT_TOPIC_PATTERN}")
+        client.subscribe(shard.topic(settings.MQTT_TOPIC_PATTERN))
+        logger.info(f"✓ Subscribed to: {shard.topic(settings.MQTT_TOPIC_PATTERN)}")
         # Subscribe to real device topic
-        client.subscribe(REAL_DEVICE_TOPIC)
+        client.subscribe(shard.topic(REAL_DEVICE_TOPIC))
         logger.info(f"✓ Subscribed to real device: {REAL_DEVICE_TOPIC} -> site {REAL_DEVICE_SITE_CODE}")
     else:
         logger.error(f"✗ Connection failed, rc: {rc}")
 
 
+def spooled_row(topic, payload):
+    """
+    Frame spool -> RectifierData untuk drain di writer thread. Tanpa
+    RecentWindowFilter (hanya untuk thread paho); duplikat dibuang drop_existing.
+    """
+    site_code = site_code_from_topic(topic)
+    ts, fields, payload = decode_message(payload)
+    site, _ = site_cache.resolve(site_code, payload)
+    return RectifierData(site=site, timestamp=ts, **fields)
+
+
 def on_message(client, userdata, msg):
+    raw = (msg.topic, msg.payload, time.time_ns() // 1000)
     try:
         # Determine site_code based on topic
-        topic_parts = msg.topic.split('/')
-        
-        if msg.topic == REAL_DEVICE_TOPIC:
-            # Real device: rectifier/data -> map to JKT
-            site_code = REAL_DEVICE_SITE_CODE
-            logger.info(f"📡 REAL DEVICE data received -> mapped to site: {site_code}")
-        elif len(topic_parts) == 3:
-            # Simulated: rectifier/{site_code}/data
-            site_code = topic_parts[1]
-            logger.info(f"Received simulated data for site: {site_code}")
-        else:
+        site_code = site_code_from_topic(msg.topic)
+        if site_code is None:
             logger.error(f"Invalid topic format: {msg.topic}")
             return
+
+        # Mode hash: site milik worker lain cukup dihitung
+        if not shard.owns(site_code):
+            pipeline.stats.incr('skipped')
+            return
+
+        if recorder is not None:
+            recorder.write(msg.topic, msg.payload)
+
+        # Log per pesan di-sample (lihat LogSampler), biayanya besar di ribuan site
+        log_message = message_log.hit()
+        if log_message:
+            if msg.topic == REAL_DEVICE_TOPIC:
+                logger.info(f"📡 REAL DEVICE data received -> mapped to site: {site_code}")
+            else:
+                logger.info(f"Received simulated data for site: {site_code}")
+        
+        # Decode + validasi payload langsung dari bytes (monitor/decoder.py)
+        start = time.perf_counter()
+        try:
+            ts, fields, payload = decode_message(msg.payload)
+        except PayloadError as e:
+            pipeline.stats.incr('rejected', site=site_code)
+            logger.warning(f"✗ Payload rejected - {site_code}: {e}")
+            return
+        finally:
+            pipeline.stats.record_decode((time.perf_counter() - start) * 1e6)
         
-        # Parse payload
-        payload = json.loads(msg.payload.decode())
+        # Redelivery: (site, ts) yang baru saja diterima tidak di-queue lagi
+        verdict = recent.check(site_code, ts)
+        if verdict == DUPLICATE:
+            pipeline.stats.incr('duplicates')
+            logger.debug(f"Duplicate reading ignored - {site_code} ts={ts}")
+            return
+        if verdict == LATE:
+            # Tetap disimpan untuk history/rollup, SiteLatest tidak ditimpa
+            pipeline.stats.incr('late')
         
-        # Get or create site
-        site, created = Site.objects.get_or_create(
-            site_code=site_code,
-            defaults={
-                'site_name': payload.get('site_name', site_code),
-                'latitude': payload.get('latitude', 0),
-                'longitude': payload.get('longitude', 0),
-                'region': payload.get('region', ''),
-                'project_id': payload.get('project_id', ''),
-                'ladder': payload.get('ladder', ''),
-                'sla': payload.get('sla', ''),
-            }
-        )
+        # Resolve site dari cache (DB hanya untuk site_code baru). Saat mode
+        # spool site baru tidak dicoba ke DB; pesannya di-resolve saat drain.
+        if pipeline.spooling and site_cache.peek(site_code) is None:
+            pipeline.spool_message(raw)
+            return
+        try:
+            site, created = site_cache.resolve(site_code, payload)
+        except DatabaseError as e:
+            if pipeline.spool_message(raw, reason=e):
+                return
+            raise
         
         if created:
             logger.info(f"✓ New site created: {site_code}")
         
-        # Save data
-        ts = payload.get('ts', 0)
-        
-        RectifierData.objects.create(
-            site=site,
-            timestamp=ts,
-            site_name=payload.get('site_name', site_code),
-            project_id=payload.get('project_id', ''),
-            ladder=payload.get('ladder', ''),
-            sla=payload.get('sla', ''),
-            status_realtime=payload.get('status_realtime', 'Normal'),
-            status_ladder=payload.get('status_ladder', 'Normal'),
-            latitude=payload.get('latitude'),
-            longitude=payload.get('longitude'),
-            door_cabinet=payload.get('door_cabinet', 'Close'),
-            battery_stolen=payload.get('battery_stolen', 'Close'),
-            temperature=payload.get('temperature', 0),
-            humidity=payload.get('humidity', 0),
-            vac_input_l1=payload.get('vac_input_l1', 0),
-            vac_input_l2=payload.get('vac_input_l2', 0),
-            vac_input_l3=payload.get('vac_input_l3'),
-            vdc_output=payload.get('vdc_output', 0),
-            battery_current=payload.get('battery_current', 0),
-            iac_input_l1=payload.get('iac_input_l1'),
-            iac_input_l2=payload.get('iac_input_l2'),
-            iac_input_l3=payload.get('iac_input_l3'),
-            load_current=payload.get('load_current', 0),
-            load_power=payload.get('load_power', 0),
-            pac_load_l1=payload.get('pac_load_l1', 0),
-            pac_load_l2=payload.get('pac_load_l2', 0),
-            pac_load_l3=payload.get('pac_load_l3', 0),
-            rectifier_current=payload.get('rectifier_current', 0),
-            total_power=payload.get('total_power', 0),
-            battery_bank_1_voltage=payload.get('battery_bank_1_voltage', 0),
-            battery_bank_1_current=payload.get('battery_bank_1_current', 0),
-            battery_bank_1_soc=payload.get('battery_bank_1_soc', 100),
-            battery_bank_1_soh=payload.get('battery_bank_1_soh', 100),
-            battery_bank_2_voltage=payload.get('battery_bank_2_voltage', 0),
-            battery_bank_2_current=payload.get('battery_bank_2_current', 0),
-            battery_bank_2_soc=payload.get('battery_bank_2_soc', 100),
-            battery_bank_2_soh=payload.get('battery_bank_2_soh', 100),
-            battery_bank_3_voltage=payload.get('battery_bank_3_voltage', 0),
-            battery_bank_3_current=payload.get('battery_bank_3_current', 0),
-            battery_bank_3_soc=payload.get('battery_bank_3_soc', 100),
-            battery_bank_3_soh=payload.get('battery_bank_3_soh', 100),
-            backup_duration=payload.get('backup_duration'),
-            time_remaining=payload.get('time_remaining'),
-            battery_status=payload.get('battery_status', 'Standby'),
-            start_backup=payload.get('start_backup', 'No data'),
-            soc_avg=payload.get('soc_avg', 100),
-            modules_status=payload.get('modules_status', []),
-        )
+        # Queue data (disimpan oleh writer thread via COPY / bulk_create)
+        row = RectifierData(site=site, timestamp=ts, **fields)
         
-        logger.info(f"✓ Data saved - {site_code}: VDC={payload.get('vdc_output')}V")
+        if pipeline.submit(row, raw) and log_message:
+            logger.info(f"✓ Data queued - {site_code}: VDC={payload.get('vdc_output')}V")
         
-    except json.JSONDecodeError as e:
-        logger.error(f"✗ JSON decode error: {e}")
     except Exception as e:
         logger.error(f"✗ Error: {e}")
 
 
-def main():
+def run_worker(plan, record=None):
+    global shard, pipeline, recorder
+    shard = plan
+    spool = None
+    if settings.INGEST_SPOOL_DIR:
+        spool = Spool(os.path.join(settings.INGEST_SPOOL_DIR, f'worker-{plan.index}'))
+    pipeline = IngestPipeline(name=plan.label, spool=spool, spool_decoder=spooled_row)
+    if record:
+        recorder = RecordWriter(record)
+        logger.info(f"✓ Recording raw messages to {record}")
+
     logger.info("=" * 50)
-    logger.info("MQTT Listener Multi-Site Starting...")
+    logger.info(f"MQTT Listener Multi-Site Starting ({plan.label})...")
     logger.info("=" * 50)
     
-    client_id = f"{settings.MQTT_CLIENT_ID}_{random.randint(1000,9999)}"
+    client_id = f"{settings.MQTT_CLIENT_ID}_{plan.index}_{random.randint(1000,9999)}"
     client = mqtt.Client(client_id=client_id)
     
     if settings.MQTT_USERNAME:
@@ -158,6 +189,12 @@ def main():
     client.on_connect = on_connect
     client.on_message = on_message
     
+    # docker stop -> SIGTERM: disconnect agar loop_forever selesai dan queue di-drain
+    signal.signal(signal.SIGTERM, lambda signum, frame: client.disconnect())
+    
+    site_cache.warm()
+    pipeline.start()
+    start_http_server(settings.LISTENER_METRICS_PORT and settings.LISTENER_METRICS_PORT + plan.index)
     try:
         logger.info(f"Connecting to {settings.MQTT_BROKER}:{settings.MQTT_PORT}...")
         client.connect(settings.MQTT_BROKER, settings.MQTT_PORT, 60)
@@ -167,8 +204,66 @@ def main():
         client.disconnect()
     except Exception as e:
         logger.error(f"Fatal error: {e}")
+        pipeline.stop()
+        sys.exit(1)
+    finally:
+        if recorder is not None:
+            recorder.close()
+            logger.info(f"Recorded {recorder.frames} messages ({recorder.bytes} bytes) to {record}")
+    pipeline.stop()
+
+
+def _spawn_worker(mode, workers, index, record=None):
+    run_worker(ShardPlan(mode=mode, workers=workers, index=index), record)
+
+
+def supervise(mode, workers, record=None):
+    """Jalankan N worker sebagai proses terpisah; SIGTERM diteruskan ke semua worker"""
+    context = multiprocessing.get_context('spawn')
+    processes = [
+        context.Process(target=_spawn_worker, args=(mode, workers, index, record and f'{record}.{index}'), name=f'listener-{index}')
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    logger.info(f"✓ Started {workers} listener workers (mode={mode})")
+
+    def stop_workers(signum, frame):
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, stop_workers)
+    for process in processes:
+        while process.is_alive():
+            try:
+                process.join()
+            except KeyboardInterrupt:
+                # Ctrl+C juga diterima worker (process group sama), tunggu drain
+                continue
+
+    failed = [p.name for p in processes if p.exitcode not in (0, -signal.SIGTERM)]
+    if failed:
+        logger.error(f"✗ Worker(s) exited with error: {', '.join(failed)}")
         sys.exit(1)
 
 
+def main():
+    parser = argparse.ArgumentParser(description='MQTT Listener Multi-Site')
+    parser.add_argument('--workers', type=int, default=settings.LISTENER_WORKERS,
+                        help='jumlah worker (default LISTENER_WORKERS)')
+    parser.add_argument('--worker-index', type=int, default=settings.LISTENER_WORKER_INDEX,
+                        help='jalankan 1 worker ini saja (mis. 1 container per worker)')
+    parser.add_argument('--mode', choices=SHARD_MODES, default=settings.LISTENER_SHARD_MODE)
+    parser.add_argument('--record', metavar='PATH',
+                        help='rekam (topic, payload, waktu tiba) ke file untuk replay_mqtt')
+    args = parser.parse_args()
+
+    if args.workers > 1 and args.worker_index is None:
+        supervise(args.mode, args.workers, args.record)
+    else:
+        run_worker(ShardPlan(mode=args.mode, workers=args.workers, index=args.worker_index or 0), args.record)
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,5 +1,9 @@
 """
 ASGI config for rectifier_monitor project.
+
+Dipakai di production (gunicorn + uvicorn worker) karena endpoint
+/api/stream/... adalah async StreamingHttpResponse (Server-Sent Events)
+yang tidak bisa dilayani oleh sync worker WSGI.
 """
 
 import os
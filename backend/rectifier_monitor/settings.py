@@ -34,6 +34,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'monitor.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -63,6 +64,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'rectifier_monitor.wsgi.application'
+ASGI_APPLICATION = 'rectifier_monitor.asgi.application'
 
 # Database - PostgreSQL in production, SQLite for local dev
 _db_host = os.environ.get('DB_HOST', '')
@@ -126,3 +128,94 @@ MQTT_TOPIC_PATTERN = os.environ.get('MQTT_TOPIC_PATTERN', 'rectifier/+/data')
 MQTT_CLIENT_ID = os.environ.get('MQTT_CLIENT_ID', 'django_multisite_local')
 MQTT_USERNAME = os.environ.get('MQTT_USERNAME', '')
 MQTT_PASSWORD = os.environ.get('MQTT_PASSWORD', '')
+
+# Ingestion pipeline (MQTT listener)
+INGEST_BATCH_SIZE = int(os.environ.get('INGEST_BATCH_SIZE', 500))
+INGEST_FLUSH_INTERVAL_MS = int(os.environ.get('INGEST_FLUSH_INTERVAL_MS', 1000))
+INGEST_QUEUE_SIZE = int(os.environ.get('INGEST_QUEUE_SIZE', 20000))
+INGEST_PUT_TIMEOUT = float(os.environ.get('INGEST_PUT_TIMEOUT', 5))
+INGEST_STATS_INTERVAL = int(os.environ.get('INGEST_STATS_INTERVAL', 60))
+# auto = COPY di PostgreSQL + psycopg 3, bulk_create selain itu | copy | orm
+INGEST_WRITER = os.environ.get('INGEST_WRITER', 'auto')
+SITE_CACHE_REFRESH_SECONDS = int(os.environ.get('SITE_CACHE_REFRESH_SECONDS', 300))
+# UPDATE metadata Site dari payload (site_name, ladder, sla, region, ...) maks 1x per N detik per site
+SITE_METADATA_UPDATE_SECONDS = int(os.environ.get('SITE_METADATA_UPDATE_SECONDS', 60))
+# Jumlah timestamp terakhir per site yang diingat listener untuk membuang redelivery (0 = off)
+INGEST_DEDUP_WINDOW = int(os.environ.get('INGEST_DEDUP_WINDOW', 1024))
+# full = simpan setiap sample | deadband = hanya jika berubah > threshold / heartbeat (monitor/deadband.py)
+INGEST_STORAGE_MODE = os.environ.get('INGEST_STORAGE_MODE', 'full')
+INGEST_HEARTBEAT_SECONDS = int(os.environ.get('INGEST_HEARTBEAT_SECONDS', 300))
+INGEST_DEADBAND = os.environ.get('INGEST_DEADBAND', '')
+# Spool lokal saat DB tidak tersedia / lambat (monitor/spool.py), '' = off (default).
+# docker-compose mengaktifkan spool di volume spool_data.
+INGEST_SPOOL_DIR = os.environ.get('INGEST_SPOOL_DIR', '')
+INGEST_SPOOL_SEGMENT_MB = int(os.environ.get('INGEST_SPOOL_SEGMENT_MB', 16))
+INGEST_SPOOL_MAX_MB = int(os.environ.get('INGEST_SPOOL_MAX_MB', 1024))
+INGEST_SPOOL_FSYNC_MS = int(os.environ.get('INGEST_SPOOL_FSYNC_MS', 200))
+INGEST_SPOOL_RETRY_SECONDS = float(os.environ.get('INGEST_SPOOL_RETRY_SECONDS', 5))
+# Log per pesan listener: 1 dari N pesan di level INFO (0 = hanya saat LISTENER_LOG_LEVEL=DEBUG)
+INGEST_LOG_SAMPLE = int(os.environ.get('INGEST_LOG_SAMPLE', 0))
+LISTENER_LOG_LEVEL = os.environ.get('LISTENER_LOG_LEVEL', 'INFO').upper()
+# GET /metrics listener (monitor/metrics.py), worker ke-i memakai port + i (0 = off)
+LISTENER_METRICS_PORT = int(os.environ.get('LISTENER_METRICS_PORT', 9108))
+
+# Multi-worker listener (lihat monitor/sharding.py)
+LISTENER_WORKERS = int(os.environ.get('LISTENER_WORKERS', 1))
+LISTENER_WORKER_INDEX = (
+    int(os.environ['LISTENER_WORKER_INDEX']) if os.environ.get('LISTENER_WORKER_INDEX') else None
+)
+LISTENER_SHARD_MODE = os.environ.get('LISTENER_SHARD_MODE', 'hash')
+MQTT_SHARE_GROUP = os.environ.get('MQTT_SHARE_GROUP', 'rectifier_listener')
+
+# Async listener (mqtt_listener_async.py, PostgreSQL + COPY)
+ASYNC_INGEST_WRITERS = int(os.environ.get('ASYNC_INGEST_WRITERS', 4))
+INGEST_DECODE_WORKERS = int(os.environ.get('INGEST_DECODE_WORKERS', 2))
+INGEST_DECODE_CHUNK = int(os.environ.get('INGEST_DECODE_CHUNK', 200))
+
+# Live stream (SSE) - lihat monitor/live.py
+REDIS_URL = os.environ.get('REDIS_URL', '')
+LIVE_CHANNEL = os.environ.get('LIVE_CHANNEL', 'rectifier:live')
+LIVE_POLL_INTERVAL = float(os.environ.get('LIVE_POLL_INTERVAL', 1))
+LIVE_POLL_OVERLAP = float(os.environ.get('LIVE_POLL_OVERLAP', 5))
+LIVE_QUEUE_SIZE = int(os.environ.get('LIVE_QUEUE_SIZE', 100))
+LIVE_HEARTBEAT_SECONDS = float(os.environ.get('LIVE_HEARTBEAT_SECONDS', 15))
+LIVE_STREAM_MAX_SECONDS = float(os.environ.get('LIVE_STREAM_MAX_SECONDS', 300))
+LIVE_RETRY_MS = int(os.environ.get('LIVE_RETRY_MS', 3000))
+
+# /api/fleet/summary/ di-cache sekian detik (lihat monitor/fleet.py)
+FLEET_SUMMARY_TTL = int(os.environ.get('FLEET_SUMMARY_TTL', 5))
+
+# Cache response per site (monitor/response_cache.py): local-memory, plus
+# Redis sebagai tingkat kedua jika REDIS_URL di-set
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'rectifier-monitor',
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 5000))},
+    },
+}
+if REDIS_URL:
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'KEY_PREFIX': 'rectifier',
+    }
+RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 300))
+# Tanpa Redis: versi site dibaca dari DB paling sering 1x per sekian detik
+RESPONSE_CACHE_VERSION_TTL = float(os.environ.get('RESPONSE_CACHE_VERSION_TTL', 1))
+
+# Retensi rollup per resolution (hari, None = simpan selamanya)
+ROLLUP_RETENTION_DAYS = {
+    '1m': int(os.environ.get('ROLLUP_RETENTION_DAYS_1M', 7)),
+    '15m': int(os.environ.get('ROLLUP_RETENTION_DAYS_15M', 90)),
+    '1h': None,
+}
+
+# Arsip Parquet sebelum retensi (butuh pyarrow) - lihat monitor/archive.py
+ARCHIVE_ROOT = os.environ.get('ARCHIVE_ROOT', str(BASE_DIR / 'archive'))
+ARCHIVE_CHUNK_SIZE = int(os.environ.get('ARCHIVE_CHUNK_SIZE', 5000))
+ARCHIVE_COMPRESSION = os.environ.get('ARCHIVE_COMPRESSION', 'zstd')
+ARCHIVE_BEFORE_CLEANUP = os.environ.get('ARCHIVE_BEFORE_CLEANUP', 'False') == 'True'
+
+# Export streaming /api/rectifier/?export=ndjson|csv - lihat monitor/exports.py
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 2000))
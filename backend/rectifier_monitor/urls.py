@@ -4,7 +4,10 @@ URL configuration for rectifier_monitor project
 from django.contrib import admin
 from django.urls import path, include
 
+from monitor.metrics import metrics_view
+
 urlpatterns = [
+    path('metrics', metrics_view, name='metrics'),
     path('admin/', admin.site.urls),
     path('api/', include('monitor.urls')),
 ]
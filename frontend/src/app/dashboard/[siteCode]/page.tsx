@@ -42,8 +42,27 @@ export default function SiteDashboard({
 
   useEffect(() => {
     fetchData();
-    const interval = setInterval(fetchData, 5000); // Refresh every 5 seconds
-    return () => clearInterval(interval);
+
+    // Live updates via server push; fall back to polling if the stream fails
+    let interval: ReturnType<typeof setInterval> | null = null;
+    const unsubscribe = RectifierAPI.subscribeDashboard(
+      resolvedParams.siteCode,
+      (dashboardData) => {
+        setData(dashboardData);
+        setError(null);
+        setIsLoading(false);
+      },
+      () => {
+        if (!interval) {
+          interval = setInterval(fetchData, 5000); // Refresh every 5 seconds
+        }
+      }
+    );
+
+    return () => {
+      unsubscribe();
+      if (interval) clearInterval(interval);
+    };
   }, [resolvedParams.siteCode]);
 
   if (isLoading) {
@@ -5,7 +5,7 @@ import { useRouter } from 'next/navigation';
 import dynamic from 'next/dynamic';
 import { SiteMapHeader } from "@/components/site-monitoring/SiteMapHeader";
 import { SiteSidebar } from "@/components/site-monitoring/SiteSidebar";
-import { RectifierAPI, Site } from "@/services/api";
+import { FleetSummary, RectifierAPI, Site } from "@/services/api";
 
 // Dynamically import the map component to avoid SSR issues with Leaflet
 const SiteMap = dynamic(
@@ -25,6 +25,7 @@ export default function RectifierSiteMapMonitoringPage() {
   const [isSidebarOpen, setIsSidebarOpen] = useState(false);
   const [selectedSite, setSelectedSite] = useState<Site | null>(null);
   const [sites, setSites] = useState<Site[]>([]);
+  const [fleetSummary, setFleetSummary] = useState<FleetSummary | null>(null);
   const [isLoading, setIsLoading] = useState(true);
   const [isAuthed, setIsAuthed] = useState(false);
 
@@ -50,12 +51,42 @@ export default function RectifierSiteMapMonitoringPage() {
     }
   };
 
+  const fetchFleetSummary = async () => {
+    const summary = await RectifierAPI.getFleetSummary();
+    if (summary) setFleetSummary(summary);
+  };
+
+  // Header cards: aggregated server-side (/api/fleet/summary/, cached + ETag)
   useEffect(() => {
-    fetchSites();
-    const interval = setInterval(fetchSites, 5000); // Poll every 5 seconds
+    fetchFleetSummary();
+    const interval = setInterval(fetchFleetSummary, 30000);
     return () => clearInterval(interval);
   }, []);
 
+  useEffect(() => {
+    fetchSites();
+
+    // Live per-site updates via server push; fall back to polling if the stream fails
+    let interval: ReturnType<typeof setInterval> | null = null;
+    const unsubscribe = RectifierAPI.subscribeSiteSummaries(
+      (summary) => {
+        setSites(prev =>
+          prev.map(site => (site.site_code === summary.site_code ? { ...site, ...summary } : site))
+        );
+      },
+      () => {
+        if (!interval) {
+          interval = setInterval(fetchSites, 5000); // Poll every 5 seconds
+        }
+      }
+    );
+
+    return () => {
+      unsubscribe();
+      if (interval) clearInterval(interval);
+    };
+  }, []);
+
   // Don't render map until auth is confirmed
   if (!isAuthed) {
     return <div className="min-h-screen bg-gray-900" />;
@@ -63,7 +94,7 @@ export default function RectifierSiteMapMonitoringPage() {
 
   return (
     <div className="flex flex-col h-screen w-full bg-gray-900 overflow-hidden">
-      <SiteMapHeader />
+      <SiteMapHeader summary={fleetSummary} />
       <div className="flex-1 relative z-0 flex overflow-hidden">
         {/* Sidebar */}
         <div
@@ -1,10 +1,17 @@
 import { Building2, Satellite } from "lucide-react";
-import { SITES } from "../../data/sites";
+import { FleetSummary } from "@/services/api";
 
-export function SiteMapHeader() {
-  const totalSites = SITES.length;
-  const onlineSites = SITES.filter(s => s.status === 'online').length;
-  const offlineSites = SITES.filter(s => s.status === 'offline').length;
+// Active sites without a SiteLatest snapshot are counted by the backend as 'Unknown'
+const OFFLINE_STATUS = 'Unknown';
+
+interface SiteMapHeaderProps {
+  summary: FleetSummary | null;
+}
+
+export function SiteMapHeader({ summary }: SiteMapHeaderProps) {
+  const totalSites = summary?.total_sites;
+  const offlineSites = summary ? summary.status[OFFLINE_STATUS] ?? 0 : undefined;
+  const onlineSites = summary ? summary.total_sites - (offlineSites ?? 0) : undefined;
 
   return (
     <div className="bg-[#0f172a] text-white p-4 flex justify-between items-center shadow-md z-50 relative shrink-0">
@@ -26,7 +33,7 @@ export function SiteMapHeader() {
           </div>
           <div>
             <p className="text-[10px] text-gray-400 font-medium uppercase tracking-wider">Total Sites</p>
-            <p className="text-xl font-bold">{totalSites}</p>
+            <p className="text-xl font-bold">{totalSites ?? '-'}</p>
           </div>
         </div>
 
@@ -37,7 +44,7 @@ export function SiteMapHeader() {
           </div>
           <div>
             <p className="text-[10px] text-gray-400 font-medium uppercase tracking-wider">Online</p>
-            <p className="text-xl font-bold text-emerald-400">{onlineSites}</p>
+            <p className="text-xl font-bold text-emerald-400">{onlineSites ?? '-'}</p>
           </div>
         </div>
 
@@ -48,7 +55,7 @@ export function SiteMapHeader() {
           </div>
           <div>
             <p className="text-[10px] text-gray-400 font-medium uppercase tracking-wider">Offline</p>
-            <p className="text-xl font-bold">{offlineSites}</p>
+            <p className="text-xl font-bold">{offlineSites ?? '-'}</p>
           </div>
         </div>
       </div>
@@ -22,6 +22,32 @@ export interface Site {
   is_active: boolean;
 }
 
+export type SiteSummary = Pick<
+  Site,
+  'site_code' | 'latest_vdc' | 'latest_load' | 'latest_temp' | 'latest_status' | 'last_update'
+>;
+
+export interface FleetStats {
+  min: number | null;
+  avg: number | null;
+  max: number | null;
+}
+
+export interface FleetSummary {
+  total_sites: number;
+  status: Record<string, number>;
+  vdc_output: FleetStats;
+  temperature: FleetStats;
+  regions: {
+    region: string;
+    sites: number;
+    status: Record<string, number>;
+    vdc_output: FleetStats;
+    temperature: FleetStats;
+  }[];
+  generated_at: string;
+}
+
 export class RectifierAPI {
   /**
    * Get all sites with latest data
@@ -123,6 +149,78 @@ export class RectifierAPI {
       return null;
     }
   }
+
+  /**
+   * Get fleet-wide aggregates (status counts, region totals, vdc/temperature
+   * min/avg/max) in one request instead of paging through /sites/.
+   */
+  static async getFleetSummary(): Promise<FleetSummary | null> {
+    try {
+      const response = await fetch(`${API_BASE_URL}/fleet/summary/`);
+
+      if (!response.ok) {
+        throw new Error('Failed to fetch fleet summary');
+      }
+
+      return await response.json();
+    } catch (error) {
+      console.error('Error fetching fleet summary:', error);
+      return null;
+    }
+  }
+
+  /**
+   * Subscribe to live dashboard updates (Server-Sent Events).
+   * The server sends one full 'snapshot' and then 'delta' events containing
+   * only the sections that changed. Returns an unsubscribe function.
+   */
+  static subscribeDashboard(
+    siteCode: string,
+    onData: (data: DashboardData) => void,
+    onError?: () => void
+  ): () => void {
+    const source = new EventSource(`${API_BASE_URL}/stream/sites/${siteCode}/`);
+    let current: DashboardData | null = null;
+
+    source.addEventListener('snapshot', (event) => {
+      current = JSON.parse((event as MessageEvent).data) as DashboardData;
+      onData(current);
+    });
+    source.addEventListener('delta', (event) => {
+      if (!current) return;
+      current = { ...current, ...JSON.parse((event as MessageEvent).data) };
+      onData(current as DashboardData);
+    });
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) {
+        onError?.();
+      }
+    };
+
+    return () => source.close();
+  }
+
+  /**
+   * Subscribe to the all-sites summary feed used by the map page.
+   * Returns an unsubscribe function.
+   */
+  static subscribeSiteSummaries(
+    onSite: (summary: SiteSummary) => void,
+    onError?: () => void
+  ): () => void {
+    const source = new EventSource(`${API_BASE_URL}/stream/summary/`);
+
+    source.addEventListener('site', (event) => {
+      onSite(JSON.parse((event as MessageEvent).data) as SiteSummary);
+    });
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) {
+        onError?.();
+      }
+    };
+
+    return () => source.close();
+  }
 }
 
 export default RectifierAPI;
\ No newline at end of file
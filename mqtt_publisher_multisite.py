@@ -1,11 +1,27 @@
 """
 MQTT Publisher untuk Multi-Site Testing
 Publish data ke 3 sites: NYK, BSD, JKT
+
+Mode load (--load) untuk capacity test listener + DB: N site sintetis,
+target message/detik, seed deterministik, dibagi ke beberapa proses.
+Payload di-render sekali per site (beberapa varian) sebagai template bytes;
+saat publish hanya "ts" yang disisipkan. Di akhir dilaporkan rate yang
+tercapai dan latency publish (publish() -> PUBACK untuk QoS 1) p50/p90/p99.
+
+Cara pakai:
+    python mqtt_publisher_multisite.py
+    python mqtt_publisher_multisite.py --load --sites 2000 --rate 2000 --duration 60
+    python mqtt_publisher_multisite.py --load --sites 500 --rate 500 --workers 4 --seed 7 --broker localhost
 """
 
+import argparse
 import json
+import multiprocessing
+import os
 import time
 import random
+from collections import deque
+from queue import Empty
 import paho.mqtt.client as mqtt
 from datetime import datetime
 
@@ -113,13 +129,13 @@ SITES = [
 SIMULATED_SITES = [s for s in SITES if not s.get('real_device')]
 
 
-def generate_data_for_site(site):
-    """Generate realistic data untuk site"""
+def generate_data_for_site(site, rng=random):
+    """Generate realistic data untuk site (rng: rng.Random untuk hasil deterministik)"""
     timestamp = int(time.time() * 1000)
     
     # Randomize status untuk testing
     statuses = ['Normal', 'Normal', 'Normal', 'Warning', 'Alarm']
-    status = random.choice(statuses)
+    status = rng.choice(statuses)
     
     data = {
         "ts": timestamp,
@@ -129,68 +145,68 @@ def generate_data_for_site(site):
         "ladder": "Ladder-1",
         "sla": "2 Hour",
         "status_realtime": status,
-        "status_ladder": random.choice(["Normal", "Over", "Under"]),
+        "status_ladder": rng.choice(["Normal", "Over", "Under"]),
         "latitude": site['latitude'],
         "longitude": site['longitude'],
         "region": site['region'],
         
         # Environment
-        "door_cabinet": random.choice(["Close", "Close", "Close", "Open"]),
+        "door_cabinet": rng.choice(["Close", "Close", "Close", "Open"]),
         "battery_stolen": "Close",
-        "temperature": round(random.uniform(28.0, 38.0), 1),
-        "humidity": round(random.uniform(50.0, 75.0), 1),
+        "temperature": round(rng.uniform(28.0, 38.0), 1),
+        "humidity": round(rng.uniform(50.0, 75.0), 1),
         
         # Rectifier - vary by status
-        "vac_input_l1": round(random.uniform(200.0, 230.0), 2),
-        "vac_input_l2": round(random.uniform(200.0, 230.0), 2),
+        "vac_input_l1": round(rng.uniform(200.0, 230.0), 2),
+        "vac_input_l2": round(rng.uniform(200.0, 230.0), 2),
         "vac_input_l3": None,
         
-        "vdc_output": round(random.uniform(48.0 if status == 'Alarm' else 52.0, 55.0), 2),
-        "battery_current": round(random.uniform(-2.0, 2.0), 2),
+        "vdc_output": round(rng.uniform(48.0 if status == 'Alarm' else 52.0, 55.0), 2),
+        "battery_current": round(rng.uniform(-2.0, 2.0), 2),
         
         "iac_input_l1": None,
         "iac_input_l2": None,
         "iac_input_l3": None,
         
-        "load_current": round(random.uniform(45.0, 75.0), 1),
-        "load_power": round(random.uniform(2.0, 4.5), 2),
+        "load_current": round(rng.uniform(45.0, 75.0), 1),
+        "load_power": round(rng.uniform(2.0, 4.5), 2),
         
-        "pac_load_l1": round(random.uniform(0.5, 2.0), 2),
-        "pac_load_l2": round(random.uniform(0.5, 2.0), 2),
-        "pac_load_l3": round(random.uniform(0.5, 2.0), 2),
+        "pac_load_l1": round(rng.uniform(0.5, 2.0), 2),
+        "pac_load_l2": round(rng.uniform(0.5, 2.0), 2),
+        "pac_load_l3": round(rng.uniform(0.5, 2.0), 2),
         
-        "rectifier_current": round(random.uniform(45.0, 75.0), 1),
-        "total_power": round(random.uniform(2.0, 4.5), 2),
+        "rectifier_current": round(rng.uniform(45.0, 75.0), 1),
+        "total_power": round(rng.uniform(2.0, 4.5), 2),
         
         # Battery Banks
-        "battery_bank_1_voltage": round(random.uniform(51.5, 54.5), 2),
-        "battery_bank_1_current": round(random.uniform(-0.5, 0.5), 2),
-        "battery_bank_1_soc": round(random.uniform(90.0, 100.0), 1),
-        "battery_bank_1_soh": round(random.uniform(95.0, 100.0), 1),
+        "battery_bank_1_voltage": round(rng.uniform(51.5, 54.5), 2),
+        "battery_bank_1_current": round(rng.uniform(-0.5, 0.5), 2),
+        "battery_bank_1_soc": round(rng.uniform(90.0, 100.0), 1),
+        "battery_bank_1_soh": round(rng.uniform(95.0, 100.0), 1),
         
-        "battery_bank_2_voltage": round(random.uniform(51.5, 54.5), 2),
-        "battery_bank_2_current": round(random.uniform(-0.5, 0.5), 2),
-        "battery_bank_2_soc": round(random.uniform(90.0, 100.0), 1),
-        "battery_bank_2_soh": round(random.uniform(95.0, 100.0), 1),
+        "battery_bank_2_voltage": round(rng.uniform(51.5, 54.5), 2),
+        "battery_bank_2_current": round(rng.uniform(-0.5, 0.5), 2),
+        "battery_bank_2_soc": round(rng.uniform(90.0, 100.0), 1),
+        "battery_bank_2_soh": round(rng.uniform(95.0, 100.0), 1),
         
-        "battery_bank_3_voltage": round(random.uniform(51.5, 54.5), 2),
-        "battery_bank_3_current": round(random.uniform(-0.5, 0.5), 2),
-        "battery_bank_3_soc": round(random.uniform(90.0, 100.0), 1),
-        "battery_bank_3_soh": round(random.uniform(95.0, 100.0), 1),
+        "battery_bank_3_voltage": round(rng.uniform(51.5, 54.5), 2),
+        "battery_bank_3_current": round(rng.uniform(-0.5, 0.5), 2),
+        "battery_bank_3_soc": round(rng.uniform(90.0, 100.0), 1),
+        "battery_bank_3_soh": round(rng.uniform(95.0, 100.0), 1),
         
         "backup_duration": None,
         "time_remaining": None,
-        "battery_status": random.choice(["Standby", "Standby", "Charging"]),
+        "battery_status": rng.choice(["Standby", "Standby", "Charging"]),
         "start_backup": "No data",
-        "soc_avg": round(random.uniform(90.0, 100.0), 1),
+        "soc_avg": round(rng.uniform(90.0, 100.0), 1),
         
         # Modules
         "modules_status": [
-            {"id": 1, "status": random.choice(["Normal", "Fault", "Protect"]), "value": "LK23290..."},
-            {"id": 2, "status": random.choice(["Normal", "Fault"]), "value": "LK23140..."},
+            {"id": 1, "status": rng.choice(["Normal", "Fault", "Protect"]), "value": "LK23290..."},
+            {"id": 2, "status": rng.choice(["Normal", "Fault"]), "value": "LK23140..."},
             {"id": 3, "status": "Normal", "value": "LK23140..."},
             {"id": 4, "status": "Normal", "value": "LK23290..."},
-            {"id": 5, "status": random.choice(["Normal", "AC Off"]), "value": "-"},
+            {"id": 5, "status": rng.choice(["Normal", "AC Off"]), "value": "-"},
             {"id": 6, "status": "AC Off", "value": "-"},
         ]
     }
@@ -212,6 +228,11 @@ def on_connect(client, userdata, flags, rc):
 
 
 def main():
+    args = parse_args()
+    if args.load:
+        run_load(args)
+        return
+
     print("\n" + "=" * 70)
     print("Multi-Site MQTT Publisher")
     print("=" * 70)
@@ -260,5 +281,224 @@ def main():
         print("Disconnected from MQTT broker\n")
 
 
+# ---------------------------------------------------------------------------
+# Mode load
+# ---------------------------------------------------------------------------
+
+def synthetic_sites(count, seed):
+    """Site sintetis LOAD00000.. dengan metadata deterministik dari seed"""
+    rng = random.Random(f"{seed}:sites")
+    regions = [site['region'] for site in SITES]
+    return [
+        {
+            'site_code': f"LOAD{index:05d}",
+            'site_name': f"Load Test Site {index}",
+            'latitude': round(rng.uniform(-8.5, 3.5), 6),
+            'longitude': round(rng.uniform(95.5, 140.5), 6),
+            'region': rng.choice(regions),
+            'project_id': f"LOAD{index:07d}",
+        }
+        for index in range(count)
+    ]
+
+
+def render_templates(site, seed, variants):
+    """
+    -> list (prefix, suffix) bytes; payload = prefix + ts + suffix.
+    rng per site (seed + site_code) sehingga hasil tidak tergantung jumlah worker.
+    """
+    rng = random.Random(f"{seed}:{site['site_code']}")
+    templates = []
+    for _ in range(variants):
+        data = generate_data_for_site(site, rng)
+        del data['ts']
+        body = json.dumps(data, separators=(',', ':'))
+        templates.append((b'{"ts":', b',' + body[1:].encode()))
+    return templates
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile dari list yang sudah urut"""
+    if not values:
+        return None
+    index = max(0, min(len(values) - 1, int(round(pct / 100 * len(values))) - 1))
+    return values[index]
+
+
+def _load_worker(worker, args, results):
+    """Publish untuk site[worker::workers] dengan rate / workers msg/detik"""
+    sites = synthetic_sites(args.sites, args.seed)[worker::args.workers]
+    templates = [
+        (f"rectifier/{site['site_code']}/data", render_templates(site, args.seed, args.variants))
+        for site in sites
+    ]
+    rate = args.rate / args.workers
+    last_ts = [0] * len(templates)
+    stats = {'worker': worker, 'sent': 0, 'failed': 0, 'latencies': [], 'elapsed': 0.0}
+
+    # on_publish jalan di thread network paho: hanya append ke deque,
+    # pencocokan mid -> waktu kirim dilakukan di thread ini (tanpa lock)
+    sent_at = {}
+    acks = deque()
+    connected = multiprocessing.Event()
+
+    def drain():
+        while acks:
+            mid, acked = acks.popleft()
+            started = sent_at.pop(mid, None)
+            if started is not None:
+                stats['latencies'].append((acked - started) * 1000)
+
+    client = mqtt.Client(client_id=f"load_publisher_{args.seed}_{worker}_{os.getpid()}")
+    client.max_inflight_messages_set(args.inflight)
+    client.max_queued_messages_set(0)
+    client.on_connect = lambda c, u, f, rc: rc == 0 and connected.set()
+    client.on_publish = lambda c, u, mid: acks.append((mid, time.perf_counter()))
+
+    try:
+        client.connect(args.broker, args.port, 60)
+        client.loop_start()
+        if not connected.wait(10):
+            print(f"✗ [worker {worker}] Connection to {args.broker}:{args.port} timed out")
+            results.put(stats)
+            return
+
+        start = time.perf_counter()
+        deadline = start + args.duration
+        next_report = start + args.report_interval
+        count = 0
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            target = start + count / rate
+            if target > now:
+                drain()
+                if target - now > 0.001:
+                    time.sleep(target - now)
+                continue
+
+            index = count % len(templates)
+            topic, variants = templates[index]
+            prefix, suffix = variants[(count // len(templates)) % len(variants)]
+            # ts unik per site (dedup listener membuang (site, ts) yang sama)
+            ts = max(int(time.time() * 1000), last_ts[index] + 1)
+            last_ts[index] = ts
+
+            started = time.perf_counter()
+            info = client.publish(topic, prefix + str(ts).encode() + suffix, qos=args.qos)
+            if info.rc == mqtt.MQTT_ERR_SUCCESS:
+                sent_at[info.mid] = started
+                stats['sent'] += 1
+            else:
+                stats['failed'] += 1
+            count += 1
+
+            if now >= next_report:
+                elapsed = now - start
+                print(f"  [worker {worker}] {stats['sent']} sent, {stats['sent'] / elapsed:.0f} msg/s, "
+                      f"{len(sent_at)} in flight")
+                next_report += args.report_interval
+
+        stats['elapsed'] = time.perf_counter() - start
+        # Tunggu PUBACK yang masih in flight
+        wait_until = time.perf_counter() + args.drain_timeout
+        while sent_at and time.perf_counter() < wait_until:
+            drain()
+            time.sleep(0.01)
+        drain()
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"✗ [worker {worker}] {e}")
+    finally:
+        client.loop_stop()
+        client.disconnect()
+    results.put(stats)
+
+
+def run_load(args):
+    if args.rate is None:
+        args.rate = args.sites / 3  # sama dengan interval publish 3 detik
+    args.workers = max(1, min(args.workers, args.sites))
+
+    print("\n" + "=" * 70)
+    print("MQTT Load Generator")
+    print("=" * 70)
+    print(f"  Broker : {args.broker}:{args.port} (QoS {args.qos})")
+    print(f"  Sites  : {args.sites} synthetic (seed {args.seed}, {args.variants} payload variants)")
+    print(f"  Target : {args.rate:.1f} msg/s for {args.duration}s, {args.workers} worker process(es)")
+    print("=" * 70 + "\n")
+
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=_load_worker, args=(worker, args, results))
+        for worker in range(args.workers)
+    ]
+    for process in workers:
+        process.start()
+
+    collected = []
+    while len(collected) < len(workers):
+        try:
+            collected.append(results.get(timeout=1))
+        except Empty:
+            if not any(process.is_alive() for process in workers):
+                break
+        except KeyboardInterrupt:
+            print("\nStopping workers...")
+    for process in workers:
+        process.join()
+
+    sent = sum(stats['sent'] for stats in collected)
+    failed = sum(stats['failed'] for stats in collected)
+    elapsed = max((stats['elapsed'] for stats in collected), default=0.0)
+    latencies = sorted(value for stats in collected for value in stats['latencies'])
+
+    print("\n" + "=" * 70)
+    print("Load test result")
+    print("=" * 70)
+    print(f"  Sent      : {sent} messages in {elapsed:.1f}s ({failed} failed)")
+    if elapsed:
+        print(f"  Rate      : {sent / elapsed:.1f} msg/s (target {args.rate:.1f})")
+    print(f"  Acked     : {len(latencies)} ({sent - len(latencies)} without ack)")
+    if latencies:
+        print("  Latency   : p50={:.2f}ms p90={:.2f}ms p99={:.2f}ms max={:.2f}ms".format(
+            percentile(latencies, 50), percentile(latencies, 90),
+            percentile(latencies, 99), latencies[-1],
+        ))
+    print("=" * 70 + "\n")
+
+
+def parse_args():
+    global MQTT_BROKER, MQTT_PORT
+    parser = argparse.ArgumentParser(description="Multi-site MQTT publisher / load generator")
+    parser.add_argument('--load', action='store_true',
+                        help='Mode load test dengan site sintetis (default: simulasi SITES)')
+    parser.add_argument('--broker', default=None,
+                        help=f'MQTT broker (default: {MQTT_BROKER}, mode load: localhost)')
+    parser.add_argument('--port', type=int, default=MQTT_PORT)
+    parser.add_argument('--sites', type=int, default=2000, help='Jumlah site sintetis (mode load)')
+    parser.add_argument('--rate', type=float, default=None,
+                        help='Target message/detik total (default: sites / 3)')
+    parser.add_argument('--duration', type=float, default=60, help='Durasi load test (detik)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=1, help='Jumlah proses publisher')
+    parser.add_argument('--qos', type=int, choices=(0, 1), default=1)
+    parser.add_argument('--variants', type=int, default=4,
+                        help='Jumlah varian payload pre-rendered per site')
+    parser.add_argument('--inflight', type=int, default=1000,
+                        help='Maksimal message QoS 1 in flight per worker')
+    parser.add_argument('--report-interval', type=float, default=5)
+    parser.add_argument('--drain-timeout', type=float, default=5,
+                        help='Waktu tunggu PUBACK setelah durasi selesai (detik)')
+    args = parser.parse_args()
+
+    if args.broker is None:
+        args.broker = 'localhost' if args.load else MQTT_BROKER
+    MQTT_BROKER, MQTT_PORT = args.broker, args.port
+    return args
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file